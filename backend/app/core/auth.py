@@ -2,11 +2,17 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from pydantic import BaseModel
+import asyncio
+import hashlib
 import os
+import time
+from collections import OrderedDict
 from functools import lru_cache
 import httpx
 import logging
 
+from app.core.metrics import AUTH0_SECONDS
+
 logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
@@ -35,24 +41,118 @@ def get_token_config() -> TokenConfig:
     )
 
 
-@lru_cache()
+class JWKSCache:
+    """Async JWKS cache with a TTL and a single in-flight refresh.
+
+    A token signed with an unknown kid triggers a refetch (key rotation), at
+    most once per *min_refresh_interval* so bogus kids can't hammer Auth0.
+    """
+
+    def __init__(self, ttl: float = 3600.0, min_refresh_interval: float = 30.0):
+        self._ttl = ttl
+        self._min_refresh_interval = min_refresh_interval
+        self._jwks: dict = {"keys": []}
+        self._fetched_at: float | None = None  # monotonic time; None until the first fetch
+        self._refreshing: asyncio.Task | None = None
+
+    async def _fetch(self) -> dict:
+        config = get_token_config()
+        async with httpx.AsyncClient() as client:
+            with AUTH0_SECONDS.labels("jwks").time():
+                response = await client.get(
+                    f"https://{config.auth0_domain}/.well-known/jwks.json",
+                    timeout=10.0
+                )
+            response.raise_for_status()
+            self._jwks = response.json()
+            self._fetched_at = time.monotonic()
+            return self._jwks
+
+    async def _refresh(self) -> dict:
+        if self._refreshing is None:
+            self._refreshing = asyncio.create_task(self._fetch())
+        task = self._refreshing
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done() and self._refreshing is task:
+                self._refreshing = None
+
+    async def get_jwks(self) -> dict:
+        if self._fetched_at is None or time.monotonic() - self._fetched_at >= self._ttl:
+            return await self._refresh()
+        return self._jwks
+
+    async def get_key(self, kid: str) -> dict:
+        jwks = await self.get_jwks()
+        key = _find_key(kid, jwks)
+        if key is None and (
+            self._fetched_at is None or time.monotonic() - self._fetched_at >= self._min_refresh_interval
+        ):
+            key = _find_key(kid, await self._refresh())
+        if key is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Unable to find a signing key that matches",
+            )
+        return key
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of already-verified tokens, keyed by SHA-256 of the token.
+
+    Entries are dropped once the token's own exp passes.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, "TokenData"]] = OrderedDict()
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> "TokenData | None":
+        digest = self._digest(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        expires_at, token_data = entry
+        if expires_at <= time.time():
+            del self._entries[digest]
+            return None
+        self._entries.move_to_end(digest)
+        return token_data
+
+    def put(self, token: str, token_data: "TokenData", expires_at: float) -> None:
+        digest = self._digest(token)
+        self._entries[digest] = (expires_at, token_data)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+_jwks_cache = JWKSCache()
+_verified_tokens = VerifiedTokenCache()
+
+
 async def get_jwks():
-    """Fetch JSON Web Key Set from Auth0"""
-    config = get_token_config()
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"https://{config.auth0_domain}/.well-known/jwks.json",
-            timeout=10.0
-        )
-        response.raise_for_status()
-        return response.json()
+    """Fetch JSON Web Key Set from Auth0 (cached, see JWKSCache)"""
+    return await _jwks_cache.get_jwks()
 
 
-def get_rsa_key(kid: str, jwks: dict):
-    """Extract RSA public key from JWKS using key ID"""
+def _find_key(kid: str, jwks: dict) -> dict | None:
     for key in jwks.get("keys", []):
         if key.get("kid") == kid:
             return key
+    return None
+
+
+def get_rsa_key(kid: str, jwks: dict):
+    """Extract RSA public key from JWKS using key ID"""
+    key = _find_key(kid, jwks)
+    if key is not None:
+        return key
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Unable to find a signing key that matches",
@@ -74,7 +174,21 @@ async def verify_token(
     Raises:
         HTTPException: If token is invalid, expired, or malformed
     """
-    token = credentials.credentials
+    return await verify_access_token(credentials.credentials)
+
+
+async def verify_access_token(token: str) -> TokenData:
+    """
+    Verify a raw JWT access token. Shared by the REST dependency and the
+    Socket.IO connect handler.
+
+    Tokens verified before are answered from a bounded cache until they
+    expire, so only the first use pays for RS256 verification.
+    """
+    cached = _verified_tokens.get(token)
+    if cached is not None:
+        return cached
+
     config = get_token_config()
 
     try:
@@ -88,9 +202,8 @@ async def verify_token(
                 detail="Token missing key ID (kid) in header",
             )
 
-        # Fetch JWKS from Auth0
-        jwks = await get_jwks()
-        rsa_key = get_rsa_key(kid, jwks)
+        # Look up the signing key (cached JWKS, refetched on unknown kid)
+        rsa_key = await _jwks_cache.get_key(kid)
 
         # Verify and decode the token
         payload = jwt.decode(
@@ -111,12 +224,17 @@ async def verify_token(
                 detail="Token missing required player identifier",
             )
 
-        return TokenData(
+        token_data = TokenData(
             player_id=player_id,
             sub=payload.get("sub"),
             email=email,
         )
+        if payload.get("exp"):
+            _verified_tokens.put(token, token_data, float(payload["exp"]))
+        return token_data
 
+    except HTTPException:
+        raise
     except JWTError as e:
         logger.error(f"JWT validation error: {str(e)}")
         raise HTTPException(
@@ -1,26 +1,101 @@
-from datetime import datetime, timezone
-from typing import Dict, Optional, Tuple
-
-from app.models.showdown_state import QueueTicket
+import time
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+from app.models.live_state import LiveTicket
+
+# Index entries are (elo, seq, player_id). seq is a monotonically increasing
+# join counter so equal-elo tickets stay ordered by who has waited longest.
+_IndexKey = Tuple[int, int, str]
+
+
+def dynamic_range(
+    wait_seconds: float, base_range: int = 150, expansion_rate: int = 50, expansion_interval: int = 10
+) -> int:
+    """Allowed elo gap after waiting *wait_seconds*: widens by *expansion_rate* each interval."""
+    expansions = int(wait_seconds // expansion_interval)
+    return base_range + expansions * expansion_rate
+
+
+def plan_pairs(elos: List[int], ranges: List[int]) -> List[Tuple[int, int]]:
+    """Choose which neighbours to pair in an elo-sorted line of tickets.
+
+    A neighbour heuristic: a small DP over the sorted order picks between
+    "leave ticket i alone" and "pair i with i-1", maximising the number of
+    adjacent pairs and, among those, minimising the total elo gap. A pair is
+    allowed when the gap fits the wider of the two tickets' *ranges*.
+    Returns (i, i+1) index pairs in ascending order.
+
+    Pair count comes first because the total gap alone is smallest when
+    nobody plays: for elos 0, 100, 120, 220 and a range of 100 it would
+    pair only (100, 120), gap 20, and leave two players waiting, where this
+    pairs (0, 100) + (120, 220), gap 200.
+
+    Only adjacent tickets are considered. With one shared range that loses
+    nothing, but with per-ticket ranges a wide-ranged ticket could pair past
+    a neighbour: for elos 0, 100, 120, 300 with ranges 300, 150, 150, 150 this
+    finds one pair where (0, 120) + (100, 300) would make two. Tickets left
+    over are retried on the next tick, as their ranges keep widening.
+    """
+    n = len(elos)
+    # best[i] = (pairs, -total_gap) over the first i entries
+    best = [(0, 0)] * (n + 1)
+    paired = [False] * (n + 1)
+    for i in range(2, n + 1):
+        best[i] = best[i - 1]
+        gap = elos[i - 1] - elos[i - 2]
+        if gap <= max(ranges[i - 1], ranges[i - 2]):
+            pairs, neg_gap = best[i - 2]
+            candidate = (pairs + 1, neg_gap - gap)
+            if candidate > best[i]:
+                best[i] = candidate
+                paired[i] = True
+
+    chosen: List[Tuple[int, int]] = []
+    i = n
+    while i >= 2:
+        if paired[i]:
+            chosen.append((i - 2, i - 1))
+            i -= 2
+        else:
+            i -= 1
+    chosen.reverse()
+    return chosen
 
 
 class EloMatchmaker:
     def __init__(self, base_range: int = 150, expansion_rate: int = 50, expansion_interval: int = 10):
-        self._queue: Dict[str, QueueTicket] = {}  # player_id -> QueueTicket
+        self._queue: Dict[str, LiveTicket] = {}  # player_id -> LiveTicket
+        self._index: SortedList = SortedList()  # elo-ordered _IndexKey entries
+        self._keys: Dict[str, _IndexKey] = {}  # player_id -> its entry in _index
+        self._sid_to_player: Dict[str, str] = {}  # sid -> player_id
+        self._seq = count()
         self._base_range = base_range
         self._expansion_rate = expansion_rate        # elo points added per interval
         self._expansion_interval = expansion_interval  # seconds between expansions
 
-    def add_to_queue(self, ticket: QueueTicket) -> None:
+    def add_to_queue(self, ticket: LiveTicket) -> None:
+        self.remove_from_queue(ticket.player_id)
+        key = (ticket.elo, next(self._seq), ticket.player_id)
         self._queue[ticket.player_id] = ticket
+        self._keys[ticket.player_id] = key
+        self._sid_to_player[ticket.sid] = ticket.player_id
+        self._index.add(key)
 
     def remove_from_queue(self, player_id: str) -> None:
-        self._queue.pop(player_id, None)
+        ticket = self._queue.pop(player_id, None)
+        if ticket is None:
+            return
+        self._index.remove(self._keys.pop(player_id))
+        if self._sid_to_player.get(ticket.sid) == player_id:
+            del self._sid_to_player[ticket.sid]
 
     def remove_by_sid(self, sid: str) -> None:
-        player_id = next((pid for pid, t in self._queue.items() if t.sid == sid), None)
+        player_id = self._sid_to_player.get(sid)
         if player_id:
-            self._queue.pop(player_id)
+            self.remove_from_queue(player_id)
 
     def is_in_queue(self, player_id: str) -> bool:
         return player_id in self._queue
@@ -28,14 +103,32 @@ class EloMatchmaker:
     def queue_size(self) -> int:
         return len(self._queue)
 
-    def _dynamic_range(self, ticket: QueueTicket) -> int:
-        wait_seconds = (datetime.now(timezone.utc) - ticket.joined_at).total_seconds()
-        expansions = int(wait_seconds // self._expansion_interval)
-        return self._base_range + expansions * self._expansion_rate
-
-    def find_match(self, player_id: str) -> Optional[Tuple[QueueTicket, QueueTicket]]:
+    def _dynamic_range(self, ticket: LiveTicket, now: Optional[float] = None) -> int:
+        if now is None:
+            now = time.time()
+        return dynamic_range(
+            now - ticket.joined_at,
+            self._base_range,
+            self._expansion_rate,
+            self._expansion_interval,
+        )
+
+    def _earliest_at(self, elo: int, skip: int) -> Optional[_IndexKey]:
+        """Return the longest-waiting entry with exactly *elo*, ignoring index *skip*."""
+        pos = self._index.bisect_left((elo,))
+        if pos == skip:
+            pos += 1
+        if pos < len(self._index) and self._index[pos][0] == elo:
+            return self._index[pos]
+        return None
+
+    def find_match(self, player_id: str) -> Optional[Tuple[LiveTicket, LiveTicket]]:
         """Find the closest-elo opponent for the given player within the dynamic range.
 
+        Only the seeker's immediate neighbours in the elo index can be closest,
+        so the lookup is O(log n) regardless of queue size. Ties go to whoever
+        has waited longest.
+
         Removes both players from the queue if a match is found.
         Returns None if no suitable opponent exists yet.
         """
@@ -44,21 +137,52 @@ class EloMatchmaker:
 
         seeker = self._queue[player_id]
         allowed_range = self._dynamic_range(seeker)
+        pos = self._index.index(self._keys[player_id])
 
-        best: Optional[QueueTicket] = None
-        best_diff = float("inf")
+        candidates = []
+        if pos > 0:
+            candidates.append(self._earliest_at(self._index[pos - 1][0], pos))
+        if pos + 1 < len(self._index):
+            candidates.append(self._earliest_at(self._index[pos + 1][0], pos))
 
-        for pid, candidate in self._queue.items():
-            if pid == player_id:
+        best: Optional[_IndexKey] = None
+        for key in candidates:
+            if key is None or abs(key[0] - seeker.elo) > allowed_range:
                 continue
-            diff = abs(candidate.elo - seeker.elo)
-            if diff <= allowed_range and diff < best_diff:
-                best = candidate
-                best_diff = diff
+            if best is None or (abs(key[0] - seeker.elo), key[1]) < (abs(best[0] - seeker.elo), best[1]):
+                best = key
 
         if best is None:
             return None
 
+        opponent = self._queue[best[2]]
         self.remove_from_queue(player_id)
-        self.remove_from_queue(best.player_id)
-        return (seeker, best)
\ No newline at end of file
+        self.remove_from_queue(opponent.player_id)
+        return (seeker, opponent)
+
+    def pair_all(self) -> List[Tuple[LiveTicket, LiveTicket]]:
+        """Pair the whole queue at once, re-checking every waiting ticket.
+
+        Sweeps the elo index with plan_pairs, so players who have waited
+        longer (wider dynamic range) reach further.
+
+        Removes every paired ticket from the queue. The longer-waiting ticket
+        comes first in each returned pair.
+        """
+        entries = list(self._index)
+        if len(entries) < 2:
+            return []
+
+        now = time.time()
+        ranges = [self._dynamic_range(self._queue[pid], now) for _, _, pid in entries]
+
+        matches: List[Tuple[LiveTicket, LiveTicket]] = []
+        for i, j in plan_pairs([elo for elo, _, _ in entries], ranges):
+            a, b = entries[i], entries[j]
+            first, second = (a, b) if a[1] < b[1] else (b, a)
+            matches.append((self._queue[first[2]], self._queue[second[2]]))
+
+        for t1, t2 in matches:
+            self.remove_from_queue(t1.player_id)
+            self.remove_from_queue(t2.player_id)
+        return matches
@@ -0,0 +1,161 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+from app.models.showdown_state import PlayerElo as PlayerStats
+
+# Index entries sort best-first: higher elo, then more wins, then player_id
+_RankKey = Tuple[int, int, str]
+
+
+def _entry(rank: int, stats: PlayerStats) -> dict:
+    return {
+        "rank": rank,
+        "player_id": stats.player_id,
+        "elo": stats.elo,
+        "wins": stats.wins,
+        "losses": stats.losses,
+    }
+
+
+class Leaderboard(ABC):
+    """Order-statistic index over player ratings: rank lookups and pages."""
+
+    @abstractmethod
+    async def size(self) -> int:
+        ...
+
+    @abstractmethod
+    async def load(self, all_stats: Iterable[PlayerStats]) -> None:
+        """Cold-start bulk load, replacing any existing entries."""
+
+    @abstractmethod
+    async def update(self, stats: PlayerStats) -> None:
+        ...
+
+    @abstractmethod
+    async def rank_of(self, player_id: str) -> Optional[dict]:
+        """Return the player's 1-based rank and stats, or None if unranked."""
+
+    @abstractmethod
+    async def top(self, offset: int = 0, limit: int = 50) -> List[dict]:
+        ...
+
+
+class MemoryLeaderboard(Leaderboard):
+    """Process-local index; the default, and all a single worker needs.
+
+    Backed by a SortedList, so updates, "rank of player X" and fetching a
+    page starting at any offset are all O(log n).
+    """
+
+    def __init__(self):
+        self._index: SortedList = SortedList()
+        self._stats: Dict[str, PlayerStats] = {}  # player_id -> latest stats
+
+    @staticmethod
+    def _key(stats: PlayerStats) -> _RankKey:
+        return (-stats.elo, -stats.wins, stats.player_id)
+
+    async def size(self) -> int:
+        return len(self._stats)
+
+    async def load(self, all_stats: Iterable[PlayerStats]) -> None:
+        self._stats = {stats.player_id: stats for stats in all_stats}
+        self._index = SortedList(self._key(stats) for stats in self._stats.values())
+
+    async def update(self, stats: PlayerStats) -> None:
+        previous = self._stats.get(stats.player_id)
+        if previous is not None:
+            self._index.remove(self._key(previous))
+        stats = PlayerStats(player_id=stats.player_id, elo=stats.elo, wins=stats.wins, losses=stats.losses)
+        self._stats[stats.player_id] = stats
+        self._index.add(self._key(stats))
+
+    async def rank_of(self, player_id: str) -> Optional[dict]:
+        stats = self._stats.get(player_id)
+        if stats is None:
+            return None
+        return _entry(self._index.index(self._key(stats)) + 1, stats)
+
+    async def top(self, offset: int = 0, limit: int = 50) -> List[dict]:
+        return [
+            _entry(offset + i + 1, self._stats[key[2]])
+            for i, key in enumerate(self._index.islice(offset, offset + limit))
+        ]
+
+
+# Wins are folded into the sorted-set score below elo; far above any real count
+_WINS_SPAN = 2 ** 32
+
+
+class RedisLeaderboard(Leaderboard):
+    """Index shared by every worker, in a Redis sorted set.
+
+    The score is -(elo * 2^32 + wins), so ascending order is best-first and
+    equal scores fall back to member order, i.e. player_id, exactly as in
+    MemoryLeaderboard. Stats for the entries live in a hash next to it.
+    *client* is an async redis client created with decode_responses=True.
+    """
+
+    def __init__(self, client=None, url: Optional[str] = None, prefix: str = "asl:"):
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.from_url(url or os.environ["REDIS_URL"], decode_responses=True)
+        self._redis = client
+        self._index_key = f"{prefix}leaderboard"
+        self._stats_key = f"{prefix}leaderboard:stats"
+
+    @staticmethod
+    def _score(stats: PlayerStats) -> int:
+        return -(stats.elo * _WINS_SPAN + stats.wins)
+
+    @staticmethod
+    def _dump(stats: PlayerStats) -> str:
+        return json.dumps({"elo": stats.elo, "wins": stats.wins, "losses": stats.losses})
+
+    @staticmethod
+    def _stats(player_id: str, raw: str) -> PlayerStats:
+        return PlayerStats(player_id=player_id, **json.loads(raw))
+
+    async def size(self) -> int:
+        return await self._redis.zcard(self._index_key)
+
+    async def load(self, all_stats: Iterable[PlayerStats]) -> None:
+        all_stats = list(all_stats)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._index_key, self._stats_key)
+            if all_stats:
+                pipe.zadd(self._index_key, {stats.player_id: self._score(stats) for stats in all_stats})
+                pipe.hset(self._stats_key, mapping={stats.player_id: self._dump(stats) for stats in all_stats})
+            await pipe.execute()
+
+    async def update(self, stats: PlayerStats) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self._index_key, {stats.player_id: self._score(stats)})
+            pipe.hset(self._stats_key, stats.player_id, self._dump(stats))
+            await pipe.execute()
+
+    async def rank_of(self, player_id: str) -> Optional[dict]:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zrank(self._index_key, player_id)
+            pipe.hget(self._stats_key, player_id)
+            rank, raw = await pipe.execute()
+        if rank is None or raw is None:
+            return None
+        return _entry(rank + 1, self._stats(player_id, raw))
+
+    async def top(self, offset: int = 0, limit: int = 50) -> List[dict]:
+        player_ids = await self._redis.zrange(self._index_key, offset, offset + limit - 1)
+        if not player_ids:
+            return []
+        raws = await self._redis.hmget(self._stats_key, player_ids)
+        return [
+            _entry(offset + i + 1, self._stats(player_id, raw))
+            for i, (player_id, raw) in enumerate(zip(player_ids, raws))
+            if raw is not None  # replaced by a concurrent load
+        ]
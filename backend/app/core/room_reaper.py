@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import os
+import time
+
+from app.core.state_backend import StateBackend
+
+logger = logging.getLogger(__name__)
+
+
+class RoomReaper:
+    """Room lifecycle: closes rooms nobody will finish so state stays bounded.
+
+    Rooms normally go away when a match finishes. Two other ways out:
+      - a player disconnects: the room is marked abandoned, the opponent gets
+        'room_closed' right away, and the room is reaped *abandoned_ttl*
+        seconds later (in-flight classifications finish against it first);
+      - nothing happens for *idle_ttl* seconds: both players get
+        'room_closed' and the room is reaped.
+
+    A periodic sweep does the reaping; its numbers are kept in `metrics`.
+    """
+
+    def __init__(
+        self,
+        sio,
+        state: StateBackend,
+        idle_ttl: float | None = None,
+        abandoned_ttl: float | None = None,
+        sweep_interval: float | None = None,
+    ):
+        self._sio = sio
+        self._state = state
+        self._idle_ttl = idle_ttl if idle_ttl is not None else float(os.environ.get("ROOM_IDLE_TTL_SECONDS", "300"))
+        self._abandoned_ttl = (
+            abandoned_ttl if abandoned_ttl is not None else float(os.environ.get("ROOM_ABANDONED_TTL_SECONDS", "15"))
+        )
+        self._sweep_interval = (
+            sweep_interval if sweep_interval is not None else float(os.environ.get("ROOM_SWEEP_SECONDS", "30"))
+        )
+        self.metrics = {
+            "live_rooms": 0,
+            "stale_rooms": 0,  # found past their TTL by the last sweep
+            "rooms_reaped_total": 0,
+            "reclaimed_bytes_total": 0,  # approximate, serialized size of reaped state
+            "sweep_duration_ms": 0.0,
+        }
+
+    async def handle_disconnect(self, sid: str) -> None:
+        """Abandon the room *sid* was playing in and tell the opponent."""
+        room_id = await self._state.room_for_sid(sid)
+        room = await self._state.load_room(room_id) if room_id else None
+        if room is None or room.status != "active":
+            return
+        room.status = "abandoned"
+        await self._state.save_room(room)
+        await self._sio.emit(
+            "room_closed", {"room_id": room.room_id, "reason": "opponent_left"}, room=room.room_id, skip_sid=sid
+        )
+        logger.info(f"Room {room.room_id} abandoned by {sid}")
+
+    async def sweep(self) -> int:
+        """Reap every room past its TTL. Returns the number reaped."""
+        started = time.perf_counter()
+        now = time.time()
+        idle_cutoff = now - self._idle_ttl
+        abandoned_cutoff = now - self._abandoned_ttl
+
+        candidates = await self._state.rooms_updated_before(max(idle_cutoff, abandoned_cutoff))
+        stale = [
+            room
+            for room in candidates
+            if room.updated_at < (idle_cutoff if room.status == "active" else abandoned_cutoff)
+        ]
+
+        reclaimed = 0
+        for room in stale:
+            if room.status == "active":
+                await self._sio.emit("room_closed", {"room_id": room.room_id, "reason": "idle"}, room=room.room_id)
+            await self._sio.close_room(room.room_id)
+            reclaimed += await self._state.delete_room(room.room_id)
+
+        self.metrics["live_rooms"] = await self._state.room_count()
+        self.metrics["stale_rooms"] = len(stale)
+        self.metrics["rooms_reaped_total"] += len(stale)
+        self.metrics["reclaimed_bytes_total"] += reclaimed
+        self.metrics["sweep_duration_ms"] = (time.perf_counter() - started) * 1000
+        if stale:
+            logger.info(f"Reaped {len(stale)} stale rooms ({reclaimed} bytes)")
+        return len(stale)
+
+    async def run(self) -> None:
+        """Background loop: sweep every sweep interval."""
+        while True:
+            await asyncio.sleep(self._sweep_interval)
+            try:
+                await self.sweep()
+            except Exception as exc:
+                logger.error(f"Room sweep failed: {exc}")
@@ -0,0 +1,221 @@
+"""Per-round latency timelines, for answering "I signed first but lost".
+
+Each round gets a trace keyed by (room_id, round_number), holding spans:
+
+    round                 root, round_start emit -> round_result emit
+      round_start         the round_start broadcast
+      draw_made           one per player: arrival -> result recorded
+        classify          scheduler admission wait + the two below
+          preprocess      preprocess_image
+          classifier      classifier call (cache, batching, backend)
+      wait_opponent       one per early finisher: result recorded -> round resolved
+      resolve             scoring / Elo update
+      round_result        the round_result or match_complete broadcast
+
+Finished traces go into a bounded ring buffer (ROUND_TRACE_CAPACITY,
+default 1000); rounds that never finish are evicted into it, marked
+incomplete, once more than that many are open. Traces are per process:
+with several workers, a round's two draws may be traced on different
+workers. Export as plain JSON or as OTLP/JSON (``resourceSpans``), which
+OpenTelemetry collectors and Jaeger can import.
+"""
+
+import json
+import os
+import random
+import time
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from typing import Optional
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes")
+
+    def __init__(self, name: str, parent_id: Optional[str] = None, start_ns: Optional[int] = None, **attributes):
+        self.name = name
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.end()
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = end_ns if end_ns is not None else time.time_ns()
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return (self.end_ns - self.start_ns) / 1e6 if self.end_ns is not None else None
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+        }
+
+
+class RoundTrace:
+    def __init__(self, room_id: str, round_number: int, **attributes):
+        self.room_id = room_id
+        self.round_number = round_number
+        self.trace_id = _new_id(128)
+        self.root = Span("round", room_id=room_id, round_number=round_number, **attributes)
+        self.spans: list[Span] = [self.root]
+        self.complete = False
+        self._waiting: dict[str, int] = {}  # player_id -> when their result was recorded
+
+    def span(self, name: str, parent: Optional[Span] = None, **attributes) -> Span:
+        """Open a child span; use as a context manager or call .end()."""
+        span = Span(name, (parent or self.root).span_id, **attributes)
+        self.spans.append(span)
+        return span
+
+    def start_waiting(self, player_id: str) -> None:
+        self._waiting[player_id] = time.time_ns()
+
+    def end_waiting(self) -> None:
+        now = time.time_ns()
+        for player_id, since in self._waiting.items():
+            span = Span("wait_opponent", self.root.span_id, start_ns=since, player_id=player_id)
+            span.end(now)
+            self.spans.append(span)
+        self._waiting.clear()
+
+    def finish(self, **attributes) -> None:
+        self.end_waiting()
+        self.root.attributes.update(attributes)
+        self.root.end()
+        self.complete = True
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "room_id": self.room_id,
+            "round_number": self.round_number,
+            "complete": self.complete,
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+
+def traced(trace: Optional[RoundTrace], name: str, parent: Optional[Span] = None, **attributes):
+    """``trace.span(...)`` if there is a trace, else a no-op context."""
+    return trace.span(name, parent, **attributes) if trace is not None else nullcontext()
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class RoundTracer:
+    def __init__(self, capacity: Optional[int] = None):
+        self._capacity = capacity if capacity is not None else int(os.environ.get("ROUND_TRACE_CAPACITY", "1000"))
+        self._open: OrderedDict[tuple[str, int], RoundTrace] = OrderedDict()
+        self._finished: deque[RoundTrace] = deque(maxlen=self._capacity)
+
+    def start(self, room_id: str, round_number: int, **attributes) -> RoundTrace:
+        key = (room_id, round_number)
+        trace = self._open.pop(key, None) or RoundTrace(room_id, round_number, **attributes)
+        self._open[key] = trace
+        while len(self._open) > self._capacity:
+            _, stale = self._open.popitem(last=False)
+            self._finished.append(stale)  # complete=False
+        return trace
+
+    def get(self, room_id: str, round_number: int) -> RoundTrace:
+        """The open trace for this round; started lazily if the round began on another worker."""
+        trace = self._open.get((room_id, round_number))
+        return trace if trace is not None else self.start(room_id, round_number)
+
+    def finish(self, room_id: str, round_number: int, **attributes) -> None:
+        trace = self._open.pop((room_id, round_number), None)
+        if trace is not None:
+            trace.finish(**attributes)
+            self._finished.append(trace)
+
+    def traces(self, room_id: Optional[str] = None) -> list[RoundTrace]:
+        """Buffered traces, oldest first, then rounds still in progress."""
+        traces = list(self._finished) + list(self._open.values())
+        if room_id is not None:
+            traces = [t for t in traces if t.room_id == room_id]
+        return traces
+
+    def to_json(self, room_id: Optional[str] = None) -> list[dict]:
+        return [trace.to_dict() for trace in self.traces(room_id)]
+
+    def to_otlp(self, room_id: Optional[str] = None) -> dict:
+        spans = []
+        for trace in self.traces(room_id):
+            for span in trace.spans:
+                otlp_span = {
+                    "traceId": trace.trace_id,
+                    "spanId": span.span_id,
+                    "name": span.name,
+                    "kind": 1,  # SPAN_KIND_INTERNAL
+                    "startTimeUnixNano": str(span.start_ns),
+                    "endTimeUnixNano": str(span.end_ns if span.end_ns is not None else span.start_ns),
+                    "attributes": [
+                        {"key": key, "value": _otlp_value(value)}
+                        for key, value in span.attributes.items()
+                        if value is not None
+                    ],
+                }
+                if span.parent_id:
+                    otlp_span["parentSpanId"] = span.parent_id
+                spans.append(otlp_span)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "asl-quick-draw"}}]},
+                "scopeSpans": [{"scope": {"name": "app.core.round_trace"}, "spans": spans}],
+            }]
+        }
+
+    def summary(self) -> dict[str, dict]:
+        """Per-stage latency over finished traces: which stage dominates."""
+        durations: dict[str, list[float]] = {}
+        for trace in self._finished:
+            for span in trace.spans:
+                if span.end_ns is not None:
+                    durations.setdefault(span.name, []).append(span.duration_ms)
+        summary = {}
+        for name, values in durations.items():
+            values.sort()
+            summary[name] = {
+                "count": len(values),
+                "mean_ms": sum(values) / len(values),
+                "p50_ms": values[len(values) // 2],
+                "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+                "max_ms": values[-1],
+            }
+        return summary
+
+    def dump(self, path: str, format: str = "json") -> int:
+        """Write buffered traces to *path*; returns how many were written."""
+        traces = self.traces()
+        payload = self.to_otlp() if format == "otlp" else self.to_json()
+        with open(path, "w") as f:
+            json.dump(payload, f)
+        return len(traces)
@@ -0,0 +1,685 @@
+"""Pluggable storage for shared game state: queue, rooms and round results.
+
+MemoryStateBackend keeps everything in this process (single worker).
+RedisStateBackend keeps it in Redis so several uvicorn workers can serve the
+same game; every operation that must not interleave across processes
+(enqueue, pairing, recording a round result, readiness) is a Lua script, so
+it runs atomically on the Redis server.
+"""
+
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.elo_matchmaker import EloMatchmaker, dynamic_range, plan_pairs
+from app.models.live_state import LiveRoom, LiveTicket
+from app.models.showdown_state import DuelRoom, QueueTicket
+
+# Both players must report before a round resolves / the next round starts
+PLAYERS_PER_ROOM = 2
+
+
+def _first_correct(
+    submitted: Dict[str, float], matched: Dict[str, bool], confident: Dict[str, bool]
+) -> Tuple[bool, Optional[str]]:
+    """Early-resolution rule shared with the Redis scripts: (decided, winner_id).
+
+    *matched* and *confident* hold the players whose result is in. The
+    earliest confident match wins as soon as every earlier submission has
+    a result and none of them matched. Otherwise the round is decided once
+    every result is in, with winner None: score it on "matches" as usual.
+    """
+    winners = [pid for pid, ok in confident.items() if ok]
+    if winners:
+        winner = min(winners, key=submitted.__getitem__)
+        earlier = [pid for pid, at in submitted.items() if at < submitted[winner]]
+        if any(pid not in matched for pid in earlier):
+            return False, None  # an earlier submission may still win
+        if not any(matched[pid] for pid in earlier):
+            return True, winner
+    return len(matched) >= PLAYERS_PER_ROOM, None
+
+
+class StateBackend(ABC):
+    # ── Matchmaking queue ────────────────────────────────────────────────────
+
+    @abstractmethod
+    async def enqueue(self, ticket: LiveTicket) -> bool:
+        """Add *ticket*; returns False if the player is already queued."""
+
+    @abstractmethod
+    async def dequeue(self, player_id: str) -> None:
+        ...
+
+    @abstractmethod
+    async def is_queued(self, player_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def queue_size(self) -> int:
+        ...
+
+    @abstractmethod
+    async def find_match(self, player_id: str) -> Optional[Tuple[LiveTicket, LiveTicket]]:
+        """Atomically pair *player_id* with its closest opponent, removing both."""
+
+    @abstractmethod
+    async def pair_all(self) -> List[Tuple[LiveTicket, LiveTicket]]:
+        """Atomically claim a global pairing of the whole queue."""
+
+    # ── Rooms ────────────────────────────────────────────────────────────────
+
+    @abstractmethod
+    async def save_room(self, room: LiveRoom) -> None:
+        ...
+
+    @abstractmethod
+    async def load_room(self, room_id: str) -> Optional[LiveRoom]:
+        ...
+
+    @abstractmethod
+    async def delete_room(self, room_id: str) -> int:
+        """Remove the room together with its pending results and readiness.
+
+        Returns the approximate bytes reclaimed (serialized size of the state).
+        """
+
+    @abstractmethod
+    async def room_count(self) -> int:
+        ...
+
+    @abstractmethod
+    async def room_for_sid(self, sid: str) -> Optional[str]:
+        """Return the id of the room *sid* is playing in, if any."""
+
+    @abstractmethod
+    async def rooms_updated_before(self, cutoff: float) -> List[LiveRoom]:
+        """Return rooms whose last save is older than *cutoff* (epoch seconds)."""
+
+    @abstractmethod
+    async def mark_ready(self, room_id: str, player_id: str) -> bool:
+        """Record readiness; True exactly once, when the last player is ready."""
+
+    # ── Pending round results ────────────────────────────────────────────────
+
+    @abstractmethod
+    async def has_pending_result(self, room_id: str, player_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def pending_result_count(self) -> int:
+        """Number of rooms holding a result while waiting for the other player."""
+
+    @abstractmethod
+    async def add_pending_result(self, room_id: str, player_id: str, result: dict) -> Optional[Dict[str, dict]]:
+        """Record a player's result for the current round.
+
+        Returns every player's result, and clears them, to exactly one caller:
+        the one whose result completes the round. Otherwise returns None.
+        """
+
+    # ── Early resolution (first confident correct result wins) ───────────────
+
+    @abstractmethod
+    async def claim_submission(self, room_id: str, round_number: int, player_id: str, submitted_at: float) -> bool:
+        """Record when a player's draw arrived; False if already submitted or the round is decided."""
+
+    @abstractmethod
+    async def add_early_result(
+        self, room_id: str, round_number: int, player_id: str, result: dict, confident: bool
+    ) -> Optional[Tuple[Optional[str], Dict[str, dict]]]:
+        """Record a player's result; *confident* means a match at the required confidence.
+
+        The round is decided by the earliest-submitted confident match, as
+        soon as no earlier submission is still waiting for its result (see
+        _first_correct), or once every result is in. The deciding caller
+        alone gets (winner_id, results so far), where a None winner means
+        "score on result["matches"]"; later results for the round are
+        ignored. Otherwise returns None.
+        """
+
+    @abstractmethod
+    async def release_submission(
+        self, room_id: str, round_number: int, player_id: str
+    ) -> Optional[Tuple[Optional[str], Dict[str, dict]]]:
+        """Drop a claimed submission that produced no result, so the player can resubmit.
+
+        Players who were waiting on it may now decide the round; if so, the
+        decision is returned as from add_early_result.
+        """
+
+
+class MemoryStateBackend(StateBackend):
+    """Process-local state; the default, and all a single worker needs."""
+
+    def __init__(self, matchmaker: Optional[EloMatchmaker] = None):
+        self.matchmaker = matchmaker or EloMatchmaker()
+        self._rooms: Dict[str, LiveRoom] = {}  # room_id -> LiveRoom
+        self._sid_rooms: Dict[str, str] = {}  # player sid -> room_id
+        self._pending_results: Dict[str, Dict[str, dict]] = {}  # room_id -> {player_id: result}
+        self._ready: Dict[str, Set[str]] = {}  # room_id -> ready player_ids
+        # room_id -> {"round", "submitted": {pid: at}, "matched"/"confident": {pid: bool}, "results", "decided"}
+        self._early: Dict[str, dict] = {}
+
+    async def enqueue(self, ticket: LiveTicket) -> bool:
+        if self.matchmaker.is_in_queue(ticket.player_id):
+            return False
+        self.matchmaker.add_to_queue(ticket)
+        return True
+
+    async def dequeue(self, player_id: str) -> None:
+        self.matchmaker.remove_from_queue(player_id)
+
+    async def is_queued(self, player_id: str) -> bool:
+        return self.matchmaker.is_in_queue(player_id)
+
+    async def queue_size(self) -> int:
+        return self.matchmaker.queue_size()
+
+    async def find_match(self, player_id: str) -> Optional[Tuple[LiveTicket, LiveTicket]]:
+        return self.matchmaker.find_match(player_id)
+
+    async def pair_all(self) -> List[Tuple[LiveTicket, LiveTicket]]:
+        return self.matchmaker.pair_all()
+
+    async def save_room(self, room: LiveRoom) -> None:
+        room.updated_at = time.time()
+        self._rooms[room.room_id] = room
+        self._sid_rooms[room.player1_sid] = room.room_id
+        self._sid_rooms[room.player2_sid] = room.room_id
+
+    async def load_room(self, room_id: str) -> Optional[LiveRoom]:
+        return self._rooms.get(room_id)
+
+    async def delete_room(self, room_id: str) -> int:
+        room = self._rooms.pop(room_id, None)
+        pending = self._pending_results.pop(room_id, None)
+        self._ready.pop(room_id, None)
+        self._early.pop(room_id, None)
+        if room is None:
+            return 0
+        for sid in (room.player1_sid, room.player2_sid):
+            if self._sid_rooms.get(sid) == room_id:
+                del self._sid_rooms[sid]
+        return len(room.to_model().model_dump_json()) + (len(json.dumps(pending)) if pending else 0)
+
+    async def room_count(self) -> int:
+        return len(self._rooms)
+
+    async def room_for_sid(self, sid: str) -> Optional[str]:
+        return self._sid_rooms.get(sid)
+
+    async def rooms_updated_before(self, cutoff: float) -> List[LiveRoom]:
+        return [room for room in self._rooms.values() if room.updated_at < cutoff]
+
+    async def mark_ready(self, room_id: str, player_id: str) -> bool:
+        ready = self._ready.setdefault(room_id, set())
+        ready.add(player_id)
+        if len(ready) < PLAYERS_PER_ROOM:
+            return False
+        del self._ready[room_id]
+        return True
+
+    async def has_pending_result(self, room_id: str, player_id: str) -> bool:
+        return player_id in self._pending_results.get(room_id, {})
+
+    async def pending_result_count(self) -> int:
+        return len(self._pending_results)
+
+    async def add_pending_result(self, room_id: str, player_id: str, result: dict) -> Optional[Dict[str, dict]]:
+        pending = self._pending_results.setdefault(room_id, {})
+        if player_id in pending:
+            return None
+        pending[player_id] = result
+        if len(pending) < PLAYERS_PER_ROOM:
+            return None
+        return self._pending_results.pop(room_id)
+
+    async def claim_submission(self, room_id: str, round_number: int, player_id: str, submitted_at: float) -> bool:
+        early = self._early.get(room_id)
+        if early is None or early["round"] != round_number:
+            early = self._early[room_id] = {
+                "round": round_number, "submitted": {}, "matched": {}, "confident": {}, "results": {}, "decided": False,
+            }
+        if early["decided"] or player_id in early["submitted"]:
+            return False
+        early["submitted"][player_id] = submitted_at
+        return True
+
+    async def add_early_result(
+        self, room_id: str, round_number: int, player_id: str, result: dict, confident: bool
+    ) -> Optional[Tuple[Optional[str], Dict[str, dict]]]:
+        early = self._early.get(room_id)
+        if early is None or early["round"] != round_number or early["decided"]:
+            return None
+        early["results"][player_id] = result
+        early["matched"][player_id] = bool(result["matches"])
+        early["confident"][player_id] = confident
+        return self._early_decision(early)
+
+    async def release_submission(
+        self, room_id: str, round_number: int, player_id: str
+    ) -> Optional[Tuple[Optional[str], Dict[str, dict]]]:
+        early = self._early.get(room_id)
+        if early is None or early["round"] != round_number or early["decided"]:
+            return None
+        if player_id in early["results"] or early["submitted"].pop(player_id, None) is None:
+            return None
+        return self._early_decision(early)
+
+    @staticmethod
+    def _early_decision(early: dict) -> Optional[Tuple[Optional[str], Dict[str, dict]]]:
+        decided, winner_id = _first_correct(early["submitted"], early["matched"], early["confident"])
+        if not decided:
+            return None
+        early["decided"] = True
+        return winner_id, dict(early["results"])
+
+
+# KEYS[1]=queue zset (by elo), KEYS[2]=tickets hash, KEYS[3]=join-time zset;
+# ARGV: player_id, elo, ticket json, joined_at
+_ENQUEUE = """
+if redis.call('HSETNX', KEYS[2], ARGV[1], ARGV[3]) == 0 then return 0 end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+redis.call('ZADD', KEYS[3], ARGV[4], ARGV[1])
+return 1
+"""
+
+# KEYS as for _ENQUEUE; ARGV: player_id
+_DEQUEUE = """
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('ZREM', KEYS[3], ARGV[1])
+return redis.call('HDEL', KEYS[2], ARGV[1])
+"""
+
+# The nearest elo on each side of the seeker within range, O(log n); among
+# tickets that are equally close, the longest-waiting one, as in memory.
+# KEYS as for _ENQUEUE; ARGV: player_id, allowed range
+_FIND_MATCH = """
+local elo = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not elo then return false end
+elo = tonumber(elo)
+local range = tonumber(ARGV[2])
+local scores = {}
+for _, side in ipairs({
+  redis.call('ZREVRANGEBYSCORE', KEYS[1], elo, elo - range, 'WITHSCORES', 'LIMIT', 0, 2),
+  redis.call('ZRANGEBYSCORE', KEYS[1], elo, elo + range, 'WITHSCORES', 'LIMIT', 0, 2),
+}) do
+  for i = 1, #side, 2 do
+    if side[i] ~= ARGV[1] then
+      table.insert(scores, tonumber(side[i + 1]))
+      break
+    end
+  end
+end
+local best, best_diff, best_joined
+for _, score in ipairs(scores) do
+  local diff = math.abs(score - elo)
+  for _, member in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], score, score)) do
+    if member ~= ARGV[1] then
+      local joined = tonumber(redis.call('ZSCORE', KEYS[3], member) or math.huge)
+      if not best or diff < best_diff or (diff == best_diff and joined < best_joined) then
+        best, best_diff, best_joined = member, diff, joined
+      end
+    end
+  end
+end
+if not best then return false end
+local tickets = redis.call('HMGET', KEYS[2], ARGV[1], best)
+redis.call('ZREM', KEYS[1], ARGV[1], best)
+redis.call('ZREM', KEYS[3], ARGV[1], best)
+redis.call('HDEL', KEYS[2], ARGV[1], best)
+return tickets
+"""
+
+# Claim a planned pair only if both players are still queued.
+# KEYS as for _ENQUEUE; ARGV: player_id_a, player_id_b
+_CLAIM_PAIR = """
+if redis.call('HEXISTS', KEYS[2], ARGV[1]) == 0 or redis.call('HEXISTS', KEYS[2], ARGV[2]) == 0 then
+  return false
+end
+local tickets = redis.call('HMGET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('ZREM', KEYS[1], ARGV[1], ARGV[2])
+redis.call('ZREM', KEYS[3], ARGV[1], ARGV[2])
+redis.call('HDEL', KEYS[2], ARGV[1], ARGV[2])
+return tickets
+"""
+
+# KEYS[1]=pending hash; ARGV: player_id, result json, players per room, ttl
+_ADD_PENDING = """
+if redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[2]) == 0 then return false end
+if redis.call('HLEN', KEYS[1]) < tonumber(ARGV[3]) then
+  redis.call('EXPIRE', KEYS[1], ARGV[4])
+  return false
+end
+local all = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+return all
+"""
+
+# KEYS[1]=early hash; ARGV: round, player_id, submitted_at, ttl
+# Fields: round, decided, sub:<pid>, ok:<pid>, res:<pid>
+_CLAIM_SUBMISSION = """
+if redis.call('HGET', KEYS[1], 'round') ~= ARGV[1] then
+  redis.call('DEL', KEYS[1])
+  redis.call('HSET', KEYS[1], 'round', ARGV[1])
+end
+if redis.call('HEXISTS', KEYS[1], 'decided') == 1 then return 0 end
+if redis.call('HSETNX', KEYS[1], 'sub:' .. ARGV[2], ARGV[3]) == 0 then return 0 end
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+# Same rule as _first_correct, over the fields of an early hash:
+# round, decided, sub:<pid> (submitted at), hit:<pid> (matched 0/1),
+# ok:<pid> (confident 0/1), res:<pid> (result json).
+# Returns {winner or '', pid, result, ...} once, when the round is decided.
+_EARLY_DECIDE = """
+local function decide(key, players, ttl)
+  local fields = redis.call('HGETALL', key)
+  local sub, hit, ok, res, nres = {}, {}, {}, {}, 0
+  for i = 1, #fields, 2 do
+    local kind, pid = string.match(fields[i], '^(%a+):(.*)$')
+    if kind == 'sub' then sub[pid] = tonumber(fields[i + 1])
+    elseif kind == 'hit' then hit[pid] = fields[i + 1]
+    elseif kind == 'ok' then ok[pid] = fields[i + 1]
+    elseif kind == 'res' then res[pid] = fields[i + 1]; nres = nres + 1 end
+  end
+  local winner, best = nil, nil
+  for pid, v in pairs(ok) do
+    if v == '1' and (best == nil or sub[pid] < best) then winner, best = pid, sub[pid] end
+  end
+  if winner then
+    for pid, at in pairs(sub) do
+      if at < best then
+        if hit[pid] == nil then
+          redis.call('EXPIRE', key, ttl)
+          return false
+        end
+        if hit[pid] == '1' then winner = nil end
+      end
+    end
+  end
+  if not winner and nres < players then
+    redis.call('EXPIRE', key, ttl)
+    return false
+  end
+  redis.call('HSET', key, 'decided', 1)
+  local out = {winner or ''}
+  for pid, v in pairs(res) do
+    table.insert(out, pid)
+    table.insert(out, v)
+  end
+  return out
+end
+"""
+
+# KEYS[1]=early hash; ARGV: round, player_id, result json, hit (0/1), ok (0/1), players per room, ttl
+_ADD_EARLY = _EARLY_DECIDE + """
+if redis.call('HGET', KEYS[1], 'round') ~= ARGV[1] or redis.call('HEXISTS', KEYS[1], 'decided') == 1 then
+  return false
+end
+redis.call('HSET', KEYS[1], 'res:' .. ARGV[2], ARGV[3], 'hit:' .. ARGV[2], ARGV[4], 'ok:' .. ARGV[2], ARGV[5])
+return decide(KEYS[1], tonumber(ARGV[6]), ARGV[7])
+"""
+
+# KEYS[1]=early hash; ARGV: round, player_id, players per room, ttl
+_RELEASE_SUBMISSION = _EARLY_DECIDE + """
+if redis.call('HGET', KEYS[1], 'round') ~= ARGV[1] or redis.call('HEXISTS', KEYS[1], 'decided') == 1 then
+  return false
+end
+if redis.call('HEXISTS', KEYS[1], 'res:' .. ARGV[2]) == 1 or redis.call('HDEL', KEYS[1], 'sub:' .. ARGV[2]) == 0 then
+  return false
+end
+return decide(KEYS[1], tonumber(ARGV[3]), ARGV[4])
+"""
+
+# KEYS[1]=ready set; ARGV: player_id, players per room, ttl
+_MARK_READY = """
+redis.call('SADD', KEYS[1], ARGV[1])
+if redis.call('SCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+  redis.call('DEL', KEYS[1])
+  return 1
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 0
+"""
+
+
+class RedisStateBackend(StateBackend):
+    """Shared state in Redis (or anything speaking its protocol).
+
+    *client* is an async redis client created with decode_responses=True,
+    which lets tests pass a local stand-in such as fakeredis. Rooms expire
+    after *room_ttl* seconds without a write.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        url: Optional[str] = None,
+        prefix: str = "asl:",
+        room_ttl: int = 3600,
+        base_range: int = 150,
+        expansion_rate: int = 50,
+        expansion_interval: int = 10,
+    ):
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.from_url(url or os.environ["REDIS_URL"], decode_responses=True)
+        self._redis = client
+        self._prefix = prefix
+        self._room_ttl = room_ttl
+        self._range_policy = (base_range, expansion_rate, expansion_interval)
+        self._queue_key = f"{prefix}queue"
+        self._tickets_key = f"{prefix}tickets"
+        self._joined_key = f"{prefix}queue:joined"  # zset of player_id scored by joined_at
+        self._queue_keys = [self._queue_key, self._tickets_key, self._joined_key]
+        self._rooms_key = f"{prefix}rooms"  # zset of room_id scored by last save
+        self._enqueue = client.register_script(_ENQUEUE)
+        self._dequeue = client.register_script(_DEQUEUE)
+        self._find_match = client.register_script(_FIND_MATCH)
+        self._claim_pair = client.register_script(_CLAIM_PAIR)
+        self._add_pending = client.register_script(_ADD_PENDING)
+        self._mark_ready = client.register_script(_MARK_READY)
+        self._claim_submission = client.register_script(_CLAIM_SUBMISSION)
+        self._add_early = client.register_script(_ADD_EARLY)
+        self._release_submission = client.register_script(_RELEASE_SUBMISSION)
+
+    def _room_key(self, room_id: str, suffix: str = "") -> str:
+        return f"{self._prefix}room:{room_id}{suffix}"
+
+    def _sid_key(self, sid: str) -> str:
+        return f"{self._prefix}sid:{sid}"
+
+    def _range(self, ticket: LiveTicket, now: float) -> int:
+        return dynamic_range(now - ticket.joined_at, *self._range_policy)
+
+    @staticmethod
+    def _ticket(raw: str) -> LiveTicket:
+        return LiveTicket.from_model(QueueTicket.model_validate_json(raw))
+
+    @staticmethod
+    def _room(raw: str) -> LiveRoom:
+        return LiveRoom.from_model(DuelRoom.model_validate_json(raw))
+
+    def _pair(self, tickets) -> Tuple[LiveTicket, LiveTicket]:
+        first, second = (self._ticket(t) for t in tickets)
+        return first, second
+
+    async def enqueue(self, ticket: LiveTicket) -> bool:
+        added = await self._enqueue(
+            keys=self._queue_keys,
+            args=[ticket.player_id, ticket.elo, ticket.to_model().model_dump_json(), ticket.joined_at],
+        )
+        return bool(added)
+
+    async def dequeue(self, player_id: str) -> None:
+        await self._dequeue(keys=self._queue_keys, args=[player_id])
+
+    async def is_queued(self, player_id: str) -> bool:
+        return bool(await self._redis.hexists(self._tickets_key, player_id))
+
+    async def queue_size(self) -> int:
+        return await self._redis.zcard(self._queue_key)
+
+    async def find_match(self, player_id: str) -> Optional[Tuple[LiveTicket, LiveTicket]]:
+        raw = await self._redis.hget(self._tickets_key, player_id)
+        if raw is None:
+            return None
+        seeker = self._ticket(raw)
+        tickets = await self._find_match(
+            keys=self._queue_keys,
+            args=[player_id, self._range(seeker, time.time())],
+        )
+        return self._pair(tickets) if tickets else None
+
+    async def pair_all(self) -> List[Tuple[LiveTicket, LiveTicket]]:
+        """Plan on a snapshot, then claim each pair atomically.
+
+        Several workers may tick at once; a pair whose players were taken
+        meanwhile is simply skipped.
+        """
+        raw_tickets = await self._redis.hgetall(self._tickets_key)
+        if len(raw_tickets) < 2:
+            return []
+        tickets = sorted(
+            (self._ticket(raw) for raw in raw_tickets.values()),
+            key=lambda t: (t.elo, t.joined_at),
+        )
+        now = time.time()
+        plan = plan_pairs([t.elo for t in tickets], [self._range(t, now) for t in tickets])
+
+        matches: List[Tuple[LiveTicket, LiveTicket]] = []
+        for i, j in plan:
+            a, b = tickets[i], tickets[j]
+            first, second = (a, b) if a.joined_at <= b.joined_at else (b, a)
+            claimed = await self._claim_pair(
+                keys=self._queue_keys,
+                args=[first.player_id, second.player_id],
+            )
+            if claimed:
+                matches.append(self._pair(claimed))
+        return matches
+
+    async def save_room(self, room: LiveRoom) -> None:
+        room.updated_at = time.time()
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._room_key(room.room_id), room.to_model().model_dump_json(), ex=self._room_ttl)
+            pipe.zadd(self._rooms_key, {room.room_id: room.updated_at})
+            pipe.set(self._sid_key(room.player1_sid), room.room_id, ex=self._room_ttl)
+            pipe.set(self._sid_key(room.player2_sid), room.room_id, ex=self._room_ttl)
+            await pipe.execute()
+
+    async def load_room(self, room_id: str) -> Optional[LiveRoom]:
+        raw = await self._redis.get(self._room_key(room_id))
+        return self._room(raw) if raw else None
+
+    async def delete_room(self, room_id: str) -> int:
+        raw = await self._redis.get(self._room_key(room_id))
+        pending = await self._redis.hgetall(self._room_key(room_id, ":pending"))
+        keys = [
+            self._room_key(room_id),
+            self._room_key(room_id, ":pending"),
+            self._room_key(room_id, ":ready"),
+            self._room_key(room_id, ":early"),
+        ]
+        if raw:
+            room = self._room(raw)
+            keys += [self._sid_key(room.player1_sid), self._sid_key(room.player2_sid)]
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(*keys)
+            pipe.zrem(self._rooms_key, room_id)
+            await pipe.execute()
+        if not raw:
+            return 0
+        return len(raw) + sum(len(k) + len(v) for k, v in pending.items())
+
+    async def room_count(self) -> int:
+        return await self._redis.zcard(self._rooms_key)
+
+    async def room_for_sid(self, sid: str) -> Optional[str]:
+        return await self._redis.get(self._sid_key(sid))
+
+    async def rooms_updated_before(self, cutoff: float) -> List[LiveRoom]:
+        room_ids = await self._redis.zrangebyscore(self._rooms_key, "-inf", cutoff)
+        if not room_ids:
+            return []
+        raws = await self._redis.mget([self._room_key(room_id) for room_id in room_ids])
+        expired = [room_id for room_id, raw in zip(room_ids, raws) if raw is None]
+        if expired:
+            await self._redis.zrem(self._rooms_key, *expired)  # already gone via room_ttl
+        return [self._room(raw) for raw in raws if raw]
+
+    async def mark_ready(self, room_id: str, player_id: str) -> bool:
+        done = await self._mark_ready(
+            keys=[self._room_key(room_id, ":ready")],
+            args=[player_id, PLAYERS_PER_ROOM, self._room_ttl],
+        )
+        return bool(done)
+
+    async def has_pending_result(self, room_id: str, player_id: str) -> bool:
+        return bool(await self._redis.hexists(self._room_key(room_id, ":pending"), player_id))
+
+    async def pending_result_count(self) -> int:
+        # SCAN walks the keyspace; fine at scrape intervals, not per event
+        count = 0
+        async for _ in self._redis.scan_iter(match=self._room_key("*", ":pending"), count=1000):
+            count += 1
+        return count
+
+    async def add_pending_result(self, room_id: str, player_id: str, result: dict) -> Optional[Dict[str, dict]]:
+        flat = await self._add_pending(
+            keys=[self._room_key(room_id, ":pending")],
+            args=[player_id, json.dumps(result), PLAYERS_PER_ROOM, self._room_ttl],
+        )
+        if not flat:
+            return None
+        return {flat[i]: json.loads(flat[i + 1]) for i in range(0, len(flat), 2)}
+
+    async def claim_submission(self, room_id: str, round_number: int, player_id: str, submitted_at: float) -> bool:
+        claimed = await self._claim_submission(
+            keys=[self._room_key(room_id, ":early")],
+            args=[round_number, player_id, repr(submitted_at), self._room_ttl],
+        )
+        return bool(claimed)
+
+    async def add_early_result(
+        self, room_id: str, round_number: int, player_id: str, result: dict, confident: bool
+    ) -> Optional[Tuple[Optional[str], Dict[str, dict]]]:
+        flat = await self._add_early(
+            keys=[self._room_key(room_id, ":early")],
+            args=[
+                round_number, player_id, json.dumps(result), int(bool(result["matches"])), int(confident),
+                PLAYERS_PER_ROOM, self._room_ttl,
+            ],
+        )
+        return self._early_decision(flat)
+
+    async def release_submission(
+        self, room_id: str, round_number: int, player_id: str
+    ) -> Optional[Tuple[Optional[str], Dict[str, dict]]]:
+        flat = await self._release_submission(
+            keys=[self._room_key(room_id, ":early")],
+            args=[round_number, player_id, PLAYERS_PER_ROOM, self._room_ttl],
+        )
+        return self._early_decision(flat)
+
+    @staticmethod
+    def _early_decision(flat) -> Optional[Tuple[Optional[str], Dict[str, dict]]]:
+        if not flat:
+            return None
+        return flat[0] or None, {flat[i]: json.loads(flat[i + 1]) for i in range(1, len(flat), 2)}
+
+
+def create_state_backend(name: Optional[str] = None) -> StateBackend:
+    """Build the backend selected by *name* or STATE_BACKEND (memory | redis)."""
+    name = (name or os.environ.get("STATE_BACKEND", "memory")).strip().lower()
+    if name == "memory":
+        return MemoryStateBackend()
+    if name == "redis":
+        return RedisStateBackend()
+    raise ValueError(f"Unknown STATE_BACKEND '{name}'. Expected 'memory' or 'redis'.")
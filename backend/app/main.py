@@ -1,11 +1,24 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.socket_manager import socket_app  # Move the mess here
+from app.routers.api import router as api_router
+from app.routers.internal import internal_endpoints_enabled, router as internal_router
+from app.socket_manager import auth0_service, socket_app, start_background_tasks, stop_background_tasks  # Move the mess here
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_background_tasks()
+    yield
+    await stop_background_tasks()
+    await auth0_service.aclose()
 
-app = FastAPI(title="Quick Draw ASL Showdown")
+
+app = FastAPI(title="Quick Draw ASL Showdown", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,9 +27,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# This is the "Magic" that combines FastAPI and Socket.IO
-app.mount("/", socket_app)
+# REST routes must be registered before the catch-all Socket.IO mount
+app.include_router(api_router)
+# /metrics and /traces/*: off unless asked for, see app/routers/internal.py
+if internal_endpoints_enabled():
+    app.include_router(internal_router)
 
 @app.get("/health")
 async def health():
-    return {"status": "High Noon Ready"}
\ No newline at end of file
+    return {"status": "High Noon Ready"}
+
+# This is the "Magic" that combines FastAPI and Socket.IO
+app.mount("/", socket_app)
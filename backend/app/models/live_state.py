@@ -0,0 +1,145 @@
+"""Slotted in-process representation of queue tickets and duel rooms.
+
+Matchmaking and round handling touch these on every event, so they are
+plain __slots__ classes: no per-instance __dict__, no validation on
+attribute writes, and the two scores live in two ints instead of a dict.
+They convert to the Pydantic models in showdown_state only at the
+serialization edge (Redis, API payloads).
+"""
+
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from app.models.showdown_state import DuelRoom, QueueTicket
+
+
+def _to_datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+class LiveTicket:
+    __slots__ = ("player_id", "sid", "elo", "joined_at")
+
+    def __init__(self, player_id: str, sid: str, elo: int = 1000, joined_at: Optional[float] = None):
+        self.player_id = player_id
+        self.sid = sid
+        self.elo = elo
+        self.joined_at = joined_at if joined_at is not None else time.time()  # epoch seconds
+
+    def to_model(self) -> QueueTicket:
+        return QueueTicket(player_id=self.player_id, sid=self.sid, elo=self.elo, joined_at=_to_datetime(self.joined_at))
+
+    @classmethod
+    def from_model(cls, model: QueueTicket) -> "LiveTicket":
+        return cls(model.player_id, model.sid, model.elo, model.joined_at.timestamp())
+
+
+class LiveRoom:
+    __slots__ = (
+        "room_id",
+        "player1_id",
+        "player2_id",
+        "player1_sid",
+        "player2_sid",
+        "status",  # active | abandoned | finished
+        "score1",
+        "score2",
+        "round_number",
+        "target_sign",
+        "created_at",  # epoch seconds
+        "updated_at",  # epoch seconds of the last save
+    )
+
+    def __init__(
+        self,
+        player1_id: str,
+        player2_id: str,
+        player1_sid: str,
+        player2_sid: str,
+        room_id: Optional[str] = None,
+        status: str = "active",
+        score1: int = 0,
+        score2: int = 0,
+        round_number: int = 1,
+        target_sign: str = "",
+        created_at: Optional[float] = None,
+        updated_at: Optional[float] = None,
+    ):
+        self.room_id = room_id or str(uuid.uuid4())
+        self.player1_id = player1_id
+        self.player2_id = player2_id
+        self.player1_sid = player1_sid
+        self.player2_sid = player2_sid
+        self.status = status
+        self.score1 = score1
+        self.score2 = score2
+        self.round_number = round_number
+        self.target_sign = target_sign
+        self.created_at = created_at if created_at is not None else time.time()
+        self.updated_at = updated_at if updated_at is not None else self.created_at
+
+    def has_player(self, player_id: str) -> bool:
+        return player_id == self.player1_id or player_id == self.player2_id
+
+    def opponent_of(self, player_id: str) -> str:
+        if player_id == self.player1_id:
+            return self.player2_id
+        if player_id == self.player2_id:
+            return self.player1_id
+        raise ValueError(f"Player {player_id} is not part of room {self.room_id}")
+
+    def peer_sid(self, sid: str) -> Optional[str]:
+        """Return the other player's sid given one player's sid."""
+        if sid == self.player1_sid:
+            return self.player2_sid
+        if sid == self.player2_sid:
+            return self.player1_sid
+        return None
+
+    def add_point(self, player_id: str) -> int:
+        """Give *player_id* a point and return their new score."""
+        if player_id == self.player1_id:
+            self.score1 += 1
+            return self.score1
+        if player_id == self.player2_id:
+            self.score2 += 1
+            return self.score2
+        raise ValueError(f"Player {player_id} is not part of room {self.room_id}")
+
+    def scores(self) -> Dict[str, int]:
+        """Fresh player_id -> score dict, for event payloads."""
+        return {self.player1_id: self.score1, self.player2_id: self.score2}
+
+    def to_model(self) -> DuelRoom:
+        return DuelRoom(
+            room_id=self.room_id,
+            player1_id=self.player1_id,
+            player2_id=self.player2_id,
+            player1_sid=self.player1_sid,
+            player2_sid=self.player2_sid,
+            status=self.status,
+            scores=self.scores(),
+            round_number=self.round_number,
+            target_sign=self.target_sign,
+            created_at=_to_datetime(self.created_at),
+            updated_at=_to_datetime(self.updated_at),
+        )
+
+    @classmethod
+    def from_model(cls, model: DuelRoom) -> "LiveRoom":
+        return cls(
+            model.player1_id,
+            model.player2_id,
+            model.player1_sid,
+            model.player2_sid,
+            room_id=model.room_id,
+            status=model.status,
+            score1=model.scores.get(model.player1_id, 0),
+            score2=model.scores.get(model.player2_id, 0),
+            round_number=model.round_number,
+            target_sign=model.target_sign,
+            created_at=model.created_at.timestamp(),
+            updated_at=model.updated_at.timestamp(),
+        )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
+from typing import Dict
 from datetime import datetime, timezone
 import uuid
 
@@ -12,6 +12,10 @@ class PlayerElo(BaseModel):
     elo_delta: int = 0  # change applied this match (positive for winner, negative for loser)
 
 
+# QueueTicket and DuelRoom are the wire/storage schema; live state in the
+# server uses the slotted LiveTicket / LiveRoom from live_state.
+
+
 class QueueTicket(BaseModel):
     player_id: str
     sid: str
@@ -25,12 +29,10 @@ class DuelRoom(BaseModel):
     player2_id: str
     player1_sid: str
     player2_sid: str
-    status: str = "active"  # active | finished
+    status: str = "active"  # active | abandoned | finished
     scores: Dict[str, int] = Field(default_factory=dict)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))  # last save
     # Per-round tracking
     round_number: int = 1
     target_sign: str = ""
-    round_results: Dict[str, Optional[bool]] = Field(default_factory=dict)  # player_id → correct bool
-    detected_signs: Dict[str, str] = Field(default_factory=dict)  # player_id → detected letter
-    ready_players: List[str] = Field(default_factory=list)
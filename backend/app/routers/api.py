@@ -1,10 +1,34 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.socket_manager import leaderboard
 
 router = APIRouter()
 
 @router.get("/rankings")
-async def get_rankings():
-    raise NotImplementedError("Elo rankings retrieval is not yet implemented.")
+async def get_rankings(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    player_id: str | None = None,
+):
+    """Paginated leaderboard, optionally with the given player's own rank."""
+    response = {
+        "total": await leaderboard.size(),
+        "offset": offset,
+        "entries": await leaderboard.top(offset, limit),
+    }
+    if player_id:
+        response["player"] = await leaderboard.rank_of(player_id)
+    return response
+
+@router.get("/rankings/{player_id}")
+async def get_player_rank(player_id: str):
+    entry = await leaderboard.rank_of(player_id)
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Player {player_id} has no ranked matches yet",
+        )
+    return entry
 
 @router.get("/profile/{player_id}")
 async def get_profile(player_id: str):
@@ -0,0 +1,58 @@
+"""Operator endpoints: Prometheus metrics and round traces.
+
+These expose queue depths and per-room, per-player round timelines, so they
+are not part of the public API. main.py only mounts this router when
+ASL_INTERNAL_ENDPOINTS is on; serve it on a private network, and/or set
+ASL_INTERNAL_TOKEN so every request must send "Authorization: Bearer <token>".
+"""
+
+import os
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.core.metrics import CONTENT_TYPE, REGISTRY
+from app.socket_manager import collect_metrics, round_tracer
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def internal_endpoints_enabled() -> bool:
+    return os.environ.get("ASL_INTERNAL_ENDPOINTS", "0").lower() in ("1", "true", "yes")
+
+
+async def require_internal_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(_bearer),
+) -> None:
+    """Check the operator token when ASL_INTERNAL_TOKEN is set."""
+    expected = os.environ.get("ASL_INTERNAL_TOKEN")
+    if not expected:
+        return
+    if credentials is None or not secrets.compare_digest(credentials.credentials, expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid internal endpoint token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+@router.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    await collect_metrics()
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@router.get("/traces/rounds")
+async def get_round_traces(room_id: str | None = None, format: str = Query("json", pattern="^(json|otlp)$")):
+    """Buffered per-round span timelines, as plain JSON or OTLP/JSON."""
+    if format == "otlp":
+        return round_tracer.to_otlp(room_id)
+    return {"traces": round_tracer.to_json(room_id)}
+
+@router.get("/traces/rounds/summary")
+async def get_round_trace_summary():
+    """Per-stage latency over buffered rounds, to see what dominates draw-to-result."""
+    return round_tracer.summary()
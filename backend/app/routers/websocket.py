@@ -1,107 +1,291 @@
 import asyncio
 import logging
+import os
+import time
 
 from app.core.duel_engine import DuelEngine
-from app.core.elo_matchmaker import EloMatchmaker
-from app.models.showdown_state import QueueTicket
-from model_service import classifier, preprocess_image
+from app.core.metrics import CLASSIFIER_SECONDS, PREPROCESS_SECONDS, SOCKET_EVENT_SECONDS, timed
+from app.core.round_trace import RoundTrace, RoundTracer, Span, traced
+from app.core.state_backend import StateBackend
+from app.models.live_state import LiveRoom, LiveTicket
+from app.services.stream_judge import StreamJudge
+from model_service import ClassificationRejected, classifier, preprocess_image, scheduler
 
 logger = logging.getLogger(__name__)
 
-# Accumulate per-round classification results here so handle_draw can be called
-# once we have the detected_sign from the classifier.
-# Structure: room_id → {player_id: {"matches": bool, "detected_sign": str}}
-_pending_results: dict = {}
+# Early resolution: a correct result needs this confidence to decide a round
+EARLY_MIN_CONFIDENCE = float(os.environ.get("ASL_EARLY_MIN_CONFIDENCE", "0.7"))
+
+
+async def _classify_image(
+    lane: str,
+    image_b64: str,
+    target_sign: str,
+    trace: RoundTrace | None = None,
+    parent: Span | None = None,
+    player_id: str | None = None,
+) -> dict:
+    """Preprocess and classify one snapshot.
+
+    Tutorial frames may be answered by a near-duplicate cached frame; a
+    duel draw (*player_id* given) only reuses that player's verdict for
+    the very same image, since a different hand shape over the same
+    background hashes almost alike.
+    """
+    with PREPROCESS_SECONDS.time(), traced(trace, "preprocess", parent):
+        image_bytes = await asyncio.to_thread(preprocess_image, image_b64)
+    with CLASSIFIER_SECONDS.labels(lane).time(), traced(trace, "classifier", parent):
+        result = await classifier.classify(image_bytes, target_sign, scope=player_id)
+    if result.get("fallback"):
+        # The tiered classifier's deadline verdict is no verdict: surface it
+        # as an error instead of scoring the player's sign as a miss
+        raise TimeoutError("The classifier did not answer in time, please try again")
+    return result
+
+
+async def _session_player_id(sio, sid) -> str | None:
+    """The player_id verified from the access token at connect; None if anonymous."""
+    session = await sio.get_session(sid)
+    return session.get("player_id")
+
+
+async def _emit_round_start(sio, tracer: RoundTracer, room: LiveRoom, judge: StreamJudge | None = None) -> None:
+    trace = tracer.start(room.room_id, room.round_number, target_sign=room.target_sign)
+    round_payload = {
+        "room_id": room.room_id,
+        "round_number": room.round_number,
+        "target_sign": room.target_sign,
+        # "stream": the server judges the relayed video, no draw_made snapshot
+        "resolution": "stream" if judge is not None else "snapshot",
+    }
+    with trace.span("round_start"):
+        await sio.emit("round_start", round_payload, room=room.room_id)
+    if judge is not None:
+        judge.open(room, trace)
+    logger.info(
+        f"Round {room.round_number} started in room {room.room_id}: sign={room.target_sign}"
+    )
+
+
+async def start_match(
+    sio,
+    duel_engine: DuelEngine,
+    tracer: RoundTracer,
+    t1: LiveTicket,
+    t2: LiveTicket,
+    judge: StreamJudge | None = None,
+) -> None:
+    """Open a room for a freshly paired couple and kick off its first round.
+
+    Shared by enter_queue (instant match) and the background matchmaking
+    tick in socket_manager. *t1* is the WebRTC initiator.
+
+    Both players join a Socket.IO room named by room_id, so every later duel
+    event is a single broadcast: python-socketio encodes the packet once for
+    all members, and a multi-node manager publishes it once. Spectators can
+    join the same room later at no extra per-event cost.
+    """
+    room = await duel_engine.start_duel(t1, t2)
+    await sio.enter_room(t1.sid, room.room_id)
+    await sio.enter_room(t2.sid, room.room_id)
+    logger.info(
+        f"Match found: {t1.player_id} vs {t2.player_id} in room {room.room_id}"
+    )
+
+    await sio.emit(
+        "match_found",
+        {
+            "room_id": room.room_id,
+            "opponent_id": t2.player_id,
+            "opponent_elo": t2.elo,
+            "is_initiator": True,
+        },
+        to=t1.sid,
+    )
+    await sio.emit(
+        "match_found",
+        {
+            "room_id": room.room_id,
+            "opponent_id": t1.player_id,
+            "opponent_elo": t1.elo,
+            "is_initiator": False,
+        },
+        to=t2.sid,
+    )
+
+    # Wait for both clients to mount their MatchPage and register
+    # socket listeners before firing the first round_start.
+    await asyncio.sleep(1.0)
+
+    room = await duel_engine.get_room(room.room_id)
+    if room is None or room.status != "active":
+        return  # a player left during the pause
+    room = await duel_engine.start_round(room.room_id)
+    await _emit_round_start(sio, tracer, room, judge)
+
+
+async def _resolve_round(
+    sio,
+    duel_engine: DuelEngine,
+    tracer: RoundTracer,
+    room: LiveRoom,
+    round_results: dict,
+    first_correct: str | None = None,
+) -> None:
+    """Score a round from the players' results and broadcast the outcome.
+
+      - Both miss      → replay (round_result with is_replay; player_ready starts the next round)
+      - One correct    → that player wins the round (round_result)
+      - Both correct   → draw, both get a point (round_result, winner_id=null)
+      - Match over     → match_complete
+
+    With *first_correct* (early resolution) only that player scores, even
+    if the other's result also matched.
+    """
+    room_id, round_number = room.room_id, room.round_number
+    trace = tracer.get(room_id, round_number)
+    trace.end_waiting()
+    if first_correct is not None:
+        p1_correct = first_correct == room.player1_id
+        p2_correct = first_correct == room.player2_id
+    else:
+        p1_correct = round_results.get(room.player1_id, {}).get("matches", False)
+        p2_correct = round_results.get(room.player2_id, {}).get("matches", False)
+
+    if not p1_correct and not p2_correct:
+        # Both missed — show replay result; player_ready will start the next round
+        round_result_payload = {
+            "room_id": room_id,
+            "winner_id": None,
+            "player_results": round_results,
+            "scores": room.scores(),
+            "is_replay": True,
+        }
+        with trace.span("round_result"):
+            await sio.emit("round_result", round_result_payload, room=room_id)
+        tracer.finish(room_id, round_number, outcome="replay")
+        logger.info(f"Both missed in room {room_id} — showing replay result")
+        return
+
+    # At least one player correct — update scores via DuelEngine
+    winner_id = None
+    scores = room.scores()
+
+    resolve_span = trace.span("resolve")
+    for pid, correct in [(room.player1_id, p1_correct), (room.player2_id, p2_correct)]:
+        if not correct:
+            continue
+        draw_state = await duel_engine.handle_draw(room_id, pid, True)
+        scores = draw_state["scores"]
+        if draw_state["status"] == "match_finished":
+            resolve_span.end()
+            match_payload = {
+                "room_id": room_id,
+                "winner_id": draw_state["winner_id"],
+                "final_scores": draw_state["scores"],
+                "winner_stats": draw_state.get("winner_stats"),
+                "loser_stats": draw_state.get("loser_stats"),
+            }
+            with trace.span("round_result", event="match_complete"):
+                await sio.emit("match_complete", match_payload, room=room_id)
+            tracer.finish(room_id, round_number, outcome="match_complete", winner_id=draw_state["winner_id"])
+            await sio.close_room(room_id)
+            logger.info(f"Match finished in room {room_id}: winner={draw_state['winner_id']}")
+            return
+        winner_id = pid
+
+    if p1_correct and p2_correct:
+        winner_id = None  # draw — both got a point
+    resolve_span.end()
+
+    round_result_payload = {
+        "room_id": room_id,
+        "winner_id": winner_id,
+        "player_results": round_results,
+        "scores": scores,
+        "is_replay": False,
+    }
+    with trace.span("round_result"):
+        await sio.emit("round_result", round_result_payload, room=room_id)
+    tracer.finish(room_id, round_number, outcome="draw" if winner_id is None else "win", winner_id=winner_id)
+    logger.info(f"Round result in room {room_id}: winner={winner_id}, scores={scores}")
+
+
+async def resolve_streamed_round(
+    sio, duel_engine: DuelEngine, tracer: RoundTracer, room_id: str, round_number: int, round_results: dict
+) -> None:
+    """StreamJudge callback: resolve a round decided from the relayed frames."""
+    room = await duel_engine.get_room(room_id)
+    if room is None or room.status != "active" or room.round_number != round_number:
+        return  # abandoned, or already resolved some other way
+    await _resolve_round(sio, duel_engine, tracer, room, round_results)
 
 
 def setup_websocket_handlers(
-    sio, matchmaker: EloMatchmaker, duel_engine: DuelEngine, sid_to_player: dict
+    sio,
+    state: StateBackend,
+    duel_engine: DuelEngine,
+    tracer: RoundTracer,
+    sid_to_player: dict,
+    judge: StreamJudge | None = None,
+    early_resolution: bool = False,
 ):
+    # (room_id, player_id) -> in-flight draw_made classification, so early
+    # resolution can cancel the slower player's call on this worker
+    classifying: dict[tuple[str, str], asyncio.Task] = {}
+
     @sio.on("enter_queue")
+    @timed(SOCKET_EVENT_SECONDS.labels("enter_queue"))
     async def enter_queue(sid, data):
-        player_id = data.get("player_id")
+        # An authenticated connection plays as its token's player; only
+        # anonymous ones name themselves
+        player_id = await _session_player_id(sio, sid) or data.get("player_id")
         elo = data.get("elo", 1000)
 
         if not player_id:
             await sio.emit("queue_error", {"message": "player_id is required"}, to=sid)
             return
 
-        if matchmaker.is_in_queue(player_id):
+        ticket = LiveTicket(player_id, sid, elo)
+        if not await state.enqueue(ticket):
             await sio.emit("queue_error", {"message": "Already in queue"}, to=sid)
             return
 
-        ticket = QueueTicket(player_id=player_id, sid=sid, elo=elo)
-        matchmaker.add_to_queue(ticket)
         sid_to_player[sid] = player_id
         logger.info(f"Player {player_id} (elo={elo}) entered queue")
 
-        match = matchmaker.find_match(player_id)
+        match = await state.find_match(player_id)
         if match:
-            t1, t2 = match
-            room = duel_engine.start_duel(t1, t2)
-            logger.info(
-                f"Match found: {t1.player_id} vs {t2.player_id} in room {room.room_id}"
-            )
-
-            await sio.emit(
-                "match_found",
-                {
-                    "room_id": room.room_id,
-                    "opponent_id": t2.player_id,
-                    "opponent_elo": t2.elo,
-                    "is_initiator": True,
-                },
-                to=t1.sid,
-            )
-            await sio.emit(
-                "match_found",
-                {
-                    "room_id": room.room_id,
-                    "opponent_id": t1.player_id,
-                    "opponent_elo": t1.elo,
-                    "is_initiator": False,
-                },
-                to=t2.sid,
-            )
-
-            # Wait for both clients to mount their MatchPage and register
-            # socket listeners before firing the first round_start.
-            await asyncio.sleep(1.0)
-
-            room = duel_engine.start_round(room.room_id)
-            round_payload = {
-                "room_id": room.room_id,
-                "round_number": room.round_number,
-                "target_sign": room.target_sign,
-            }
-            await sio.emit("round_start", round_payload, to=t1.sid)
-            await sio.emit("round_start", round_payload, to=t2.sid)
-            logger.info(
-                f"Round {room.round_number} started in room {room.room_id}: sign={room.target_sign}"
-            )
+            await start_match(sio, duel_engine, tracer, *match, judge=judge)
         else:
             await sio.emit(
-                "queue_joined", {"position": matchmaker.queue_size()}, to=sid
+                "queue_joined", {"position": await state.queue_size()}, to=sid
             )
 
     @sio.on("leave_queue")
+    @timed(SOCKET_EVENT_SECONDS.labels("leave_queue"))
     async def leave_queue(sid, data):
-        player_id = data.get("player_id") or sid_to_player.get(sid)
+        player_id = sid_to_player.pop(sid, None)
         if player_id:
-            matchmaker.remove_from_queue(player_id)
-            sid_to_player.pop(sid, None)
+            await state.dequeue(player_id)
             logger.info(f"Player {player_id} left queue")
 
     @sio.on("draw_made")
+    @timed(SOCKET_EVENT_SECONDS.labels("draw_made"))
     async def draw_made(sid, data):
         """Classify a player's submitted hand-sign snapshot via Gemini.
 
-        Waits for both players to submit before resolving the round:
-          - Both miss      → replay (new round_start with fresh sign)
-          - One correct    → that player wins the round (round_result)
-          - Both correct   → draw, both get a point (round_result, winner_id=null)
-          - Match over     → match_complete
+        Waits for both players to submit before resolving the round (see
+        _resolve_round). Ignored when a StreamJudge decides rounds from the
+        relayed video instead.
+
+        With *early_resolution*, the earliest-submitted confident correct
+        result decides the round as soon as no earlier submission is still
+        being classified; the other player's classification is cancelled
+        (on this worker) or its result ignored.
         """
+        if judge is not None:
+            return
         image_b64: str = data.get("image", "")
         target_sign: str = data.get("target_sign", "")
         room_id: str = data.get("room_id", "")
@@ -119,98 +303,98 @@ def setup_websocket_handlers(
             await sio.emit("classification_error", {"error": "Unknown player session"}, to=sid)
             return
 
-        room = duel_engine.get_room(room_id)
+        room = await duel_engine.get_room(room_id)
         if not room:
             await sio.emit("classification_error", {"error": f"Room {room_id} not found"}, to=sid)
             return
-
-        # Ignore duplicate submissions for this round
-        if player_id in _pending_results.get(room_id, {}):
-            return
-
-        try:
-            image_bytes = await asyncio.to_thread(preprocess_image, image_b64)
-            result = await classifier.classify(image_bytes, target_sign)
-            logger.info(f"Classification for {player_id}: {result}")
-        except Exception as exc:
-            logger.error(f"Classification error for {sid}: {exc}")
-            await sio.emit("classification_error", {"error": str(exc)}, to=sid)
+        if room.status != "active":
+            await sio.emit("classification_error", {"error": f"Room {room_id} is closed"}, to=sid)
             return
 
-        await sio.emit(
-            "classification_result",
-            {**result, "player_id": player_id, "room_id": room_id},
-            to=sid,
-        )
-
-        # Accumulate result and wait for both players
-        if room_id not in _pending_results:
-            _pending_results[room_id] = {}
-        _pending_results[room_id][player_id] = {
-            "matches": result["matches"],
-            "detected_sign": result["detected_sign"],
-        }
-
-        if len(_pending_results[room_id]) < 2:
-            return  # still waiting for the other player
-
-        # Both submitted — resolve the round
-        round_results = _pending_results.pop(room_id)
-        p1_correct = round_results.get(room.player1_id, {}).get("matches", False)
-        p2_correct = round_results.get(room.player2_id, {}).get("matches", False)
-
-        if not p1_correct and not p2_correct:
-            # Both missed — show replay result; player_ready will start the next round
-            round_result_payload = {
-                "room_id": room_id,
-                "winner_id": None,
-                "player_results": round_results,
-                "scores": room.scores.copy(),
-                "is_replay": True,
-            }
-            await sio.emit("round_result", round_result_payload, to=room.player1_sid)
-            await sio.emit("round_result", round_result_payload, to=room.player2_sid)
-            logger.info(f"Both missed in room {room_id} — showing replay result")
+        round_number = room.round_number
+        # Ignore duplicate submissions for this round (and, early, decided rounds)
+        if early_resolution:
+            if not await state.claim_submission(room_id, round_number, player_id, time.time()):
+                return
+        elif await state.has_pending_result(room_id, player_id):
             return
 
-        # At least one player correct — update scores via DuelEngine
-        winner_id = None
-        scores = room.scores.copy()
-
-        for pid, correct in [(room.player1_id, p1_correct), (room.player2_id, p2_correct)]:
-            if not correct:
-                continue
-            draw_state = duel_engine.handle_draw(room_id, pid, True)
-            scores = draw_state["scores"]
-            if draw_state["status"] == "match_finished":
-                match_payload = {
-                    "room_id": room_id,
-                    "winner_id": draw_state["winner_id"],
-                    "final_scores": draw_state["scores"],
-                    "winner_stats": draw_state.get("winner_stats"),
-                    "loser_stats": draw_state.get("loser_stats"),
-                }
-                await sio.emit("match_complete", match_payload, to=room.player1_sid)
-                await sio.emit("match_complete", match_payload, to=room.player2_sid)
-                logger.info(f"Match finished in room {room_id}: winner={draw_state['winner_id']}")
+        trace = tracer.get(room_id, round_number)
+        key = (room_id, player_id)
+        with trace.span("draw_made", player_id=player_id) as draw_span:
+            try:
+                with trace.span("classify", draw_span) as classify_span:
+                    task = asyncio.ensure_future(scheduler.run(
+                        "duel", _classify_image, "duel", image_b64, target_sign, trace, classify_span, player_id
+                    ))
+                    classifying[key] = task
+                    try:
+                        result = await task
+                    finally:
+                        if classifying.get(key) is task:
+                            del classifying[key]
+                logger.info(f"Classification for {player_id}: {result}")
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise
+                logger.info(f"Classification for {player_id} cancelled: round {round_number} already decided")
+                draw_span.attributes["cancelled"] = True
                 return
-            winner_id = pid
+            except ClassificationRejected as exc:
+                logger.warning(f"Classification shed for {sid}: {exc.code}")
+                draw_span.attributes["error"] = exc.code
+                await sio.emit(
+                    "classification_error", {"error": exc.message, "code": exc.code}, to=sid
+                )
+                result = None
+            except Exception as exc:
+                logger.error(f"Classification error for {sid}: {exc}")
+                draw_span.attributes["error"] = type(exc).__name__
+                await sio.emit("classification_error", {"error": str(exc)}, to=sid)
+                result = None
+
+            if result is None:
+                if not early_resolution:
+                    return  # nothing recorded: the player may resubmit
+                # Free the claim so the player may resubmit; an opponent
+                # who was waiting on this submission may now decide the round
+                decision = await state.release_submission(room_id, round_number, player_id)
+                if decision is None:
+                    return
+                first_correct, round_results = decision
+            else:
+                draw_span.attributes.update(matches=result["matches"], detected_sign=result["detected_sign"])
+
+                await sio.emit(
+                    "classification_result",
+                    {**result, "player_id": player_id, "room_id": room_id},
+                    to=sid,
+                )
+
+                # Record the result; only the submission that decides the round
+                # (on whichever worker) gets the results back and resolves it.
+                player_result = {"matches": result["matches"], "detected_sign": result["detected_sign"]}
+                if early_resolution:
+                    # Confidence only decides whether the round may close early
+                    confident = result["matches"] and result.get("confidence", 0.0) >= EARLY_MIN_CONFIDENCE
+                    decision = await state.add_early_result(room_id, round_number, player_id, player_result, confident)
+                    first_correct, round_results = decision if decision else (None, None)
+                else:
+                    first_correct = None
+                    round_results = await state.add_pending_result(room_id, player_id, player_result)
+        if round_results is None:
+            trace.start_waiting(player_id)
+            return  # still waiting for the other player
 
-        if p1_correct and p2_correct:
-            winner_id = None  # draw — both got a point
+        if early_resolution:
+            slower = classifying.pop((room_id, room.opponent_of(player_id)), None)
+            if slower is not None:
+                slower.cancel()
 
-        round_result_payload = {
-            "room_id": room_id,
-            "winner_id": winner_id,
-            "player_results": round_results,
-            "scores": scores,
-            "is_replay": False,
-        }
-        await sio.emit("round_result", round_result_payload, to=room.player1_sid)
-        await sio.emit("round_result", round_result_payload, to=room.player2_sid)
-        logger.info(f"Round result in room {room_id}: winner={winner_id}, scores={scores}")
+        await _resolve_round(sio, duel_engine, tracer, room, round_results, first_correct)
 
     @sio.on("tutorial_classify")
+    @timed(SOCKET_EVENT_SECONDS.labels("tutorial_classify"))
     async def tutorial_classify(sid, data):
         """Classify a hand sign for solo practice/tutorial mode (no room required)."""
         image_b64: str = data.get("image", "")
@@ -225,9 +409,12 @@ def setup_websocket_handlers(
             return
 
         try:
-            image_bytes = await asyncio.to_thread(preprocess_image, image_b64)
-            result = await classifier.classify(image_bytes, target_sign)
+            result = await scheduler.run("tutorial", _classify_image, "tutorial", image_b64, target_sign)
             logger.info(f"Tutorial classification: {result}")
+        except ClassificationRejected as exc:
+            logger.warning(f"Tutorial classification shed for {sid}: {exc.code}")
+            await sio.emit("tutorial_error", {"error": exc.message, "code": exc.code}, to=sid)
+            return
         except Exception as exc:
             logger.error(f"Tutorial classification error for {sid}: {exc}")
             await sio.emit("tutorial_error", {"error": str(exc)}, to=sid)
@@ -236,30 +423,20 @@ def setup_websocket_handlers(
         await sio.emit("tutorial_result", result, to=sid)
 
     @sio.on("player_ready")
+    @timed(SOCKET_EVENT_SECONDS.labels("player_ready"))
     async def player_ready(sid, data):
         """Called when a player clicks Continue after seeing a round result.
         Fires round_start once both players are ready.
         """
         room_id: str = data.get("room_id", "")
-        player_id: str = data.get("player_id") or sid_to_player.get(sid)
+        player_id: str = sid_to_player.get(sid)
 
-        room = duel_engine.get_room(room_id)
-        if not room or not player_id:
+        room = await duel_engine.get_room(room_id)
+        if not room or room.status != "active" or not player_id or not room.has_player(player_id):
             return
 
-        if player_id not in room.ready_players:
-            room.ready_players.append(player_id)
-
-        if len(room.ready_players) < 2:
+        if not await state.mark_ready(room_id, player_id):
             return  # waiting for other player
 
-        room.ready_players.clear()
-        new_room = duel_engine.start_round(room_id)
-        round_payload = {
-            "room_id": room_id,
-            "round_number": new_room.round_number,
-            "target_sign": new_room.target_sign,
-        }
-        await sio.emit("round_start", round_payload, to=room.player1_sid)
-        await sio.emit("round_start", round_payload, to=room.player2_sid)
-        logger.info(f"Round {new_room.round_number} started in room {room_id}: sign={new_room.target_sign}")
+        new_room = await duel_engine.start_round(room_id)
+        await _emit_round_start(sio, tracer, new_room, judge)
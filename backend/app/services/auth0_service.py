@@ -1,3 +1,4 @@
+import asyncio
 import os
 import time
 from functools import lru_cache
@@ -5,6 +6,7 @@ from urllib.parse import quote
 
 import httpx
 
+from app.core.metrics import AUTH0_SECONDS
 from app.models.showdown_state import PlayerElo as PlayerStats
 
 
@@ -17,43 +19,69 @@ def get_management_config() -> tuple[str, str, str]:
 
 
 class Auth0Service:
-    def __init__(self):
+    """Auth0 Management API client.
+
+    All calls share one httpx.AsyncClient so connections are kept alive and
+    pooled, and nothing blocks the event loop.
+    """
+
+    def __init__(self, timeout: float = 10.0, max_connections: int = 20):
         self._access_token: str | None = None
         self._expires_at = 0.0
+        self._token_lock = asyncio.Lock()
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _token_valid(self) -> bool:
+        return bool(self._access_token) and time.time() < self._expires_at - 60
+
+    async def _token(self) -> str:
+        """Return a cached Management API access token, refreshing when near expiry.
 
-    def _token(self) -> str:
-        """Return a cached Management API access token, refreshing when near expiry."""
-        now = time.time()
-        if self._access_token and now < self._expires_at - 60:
+        Concurrent callers share a single refresh request.
+        """
+        if self._token_valid():
             return self._access_token
 
-        domain, client_id, client_secret = get_management_config()
-        resp = httpx.post(
-            f"https://{domain}/oauth/token",
-            json={
-                "client_id": client_id,
-                "client_secret": client_secret,
-                "audience": f"https://{domain}/api/v2/",
-                "grant_type": "client_credentials",
-            },
-            timeout=10.0,
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        self._access_token = data["access_token"]
-        self._expires_at = now + int(data.get("expires_in", 86400))
-        return self._access_token
+        async with self._token_lock:
+            if self._token_valid():  # refreshed while we waited for the lock
+                return self._access_token
 
-    def _headers(self) -> dict:
-        return {"Authorization": f"Bearer {self._token()}"}
+            domain, client_id, client_secret = get_management_config()
+            now = time.time()
+            with AUTH0_SECONDS.labels("token").time():
+                resp = await self._client.post(
+                    f"https://{domain}/oauth/token",
+                    json={
+                        "client_id": client_id,
+                        "client_secret": client_secret,
+                        "audience": f"https://{domain}/api/v2/",
+                        "grant_type": "client_credentials",
+                    },
+                )
+            resp.raise_for_status()
+            data = resp.json()
+            self._access_token = data["access_token"]
+            self._expires_at = now + int(data.get("expires_in", 86400))
+            return self._access_token
+
+    async def _headers(self) -> dict:
+        return {"Authorization": f"Bearer {await self._token()}"}
 
     def _user_url(self, user_id: str) -> str:
         domain, _, _ = get_management_config()
         # Auth0 user IDs contain '|' which must be percent-encoded in the URL
         return f"https://{domain}/api/v2/users/{quote(user_id, safe='')}"
 
-    def get_user_stats(self, user_id: str) -> PlayerStats:
-        resp = httpx.get(self._user_url(user_id), headers=self._headers(), timeout=10.0)
+    async def get_user_stats(self, user_id: str) -> PlayerStats:
+        headers = await self._headers()
+        with AUTH0_SECONDS.labels("get_user").time():
+            resp = await self._client.get(self._user_url(user_id), headers=headers)
         resp.raise_for_status()
         stats = ((resp.json().get("app_metadata") or {}).get("stats") or {})
         return PlayerStats(
@@ -63,20 +91,21 @@ class Auth0Service:
             losses=int(stats.get("losses", 0)),
         )
 
-    def update_user_stats(self, user_id: str, stats: PlayerStats) -> PlayerStats:
-        resp = httpx.patch(
-            self._user_url(user_id),
-            headers=self._headers(),
-            json={
-                "app_metadata": {
-                    "stats": {
-                        "elo": stats.elo,
-                        "wins": stats.wins,
-                        "losses": stats.losses,
+    async def update_user_stats(self, user_id: str, stats: PlayerStats) -> PlayerStats:
+        headers = await self._headers()
+        with AUTH0_SECONDS.labels("update_user").time():
+            resp = await self._client.patch(
+                self._user_url(user_id),
+                headers=headers,
+                json={
+                    "app_metadata": {
+                        "stats": {
+                            "elo": stats.elo,
+                            "wins": stats.wins,
+                            "losses": stats.losses,
+                        }
                     }
-                }
-            },
-            timeout=10.0,
-        )
+                },
+            )
         resp.raise_for_status()
         return stats
@@ -0,0 +1,281 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Callable, Optional, Tuple
+
+from sqlalchemy import Boolean, Column, Float, Integer, MetaData, String, Table, create_engine, select, update
+
+from app.core.leaderboard import Leaderboard
+from app.models.showdown_state import PlayerElo as PlayerStats
+from app.services.auth0_service import Auth0Service
+
+logger = logging.getLogger(__name__)
+
+# Stats Auth0Service reports for a user with no app_metadata yet
+DEFAULT_ELO = 1200
+
+metadata = MetaData()
+
+player_ratings = Table(
+    "player_ratings",
+    metadata,
+    Column("player_id", String, primary_key=True),
+    Column("elo", Integer, nullable=False),
+    Column("wins", Integer, nullable=False, default=0),
+    Column("losses", Integer, nullable=False, default=0),
+    # Seeded with default stats because Auth0 was unreachable; merged with
+    # the remote stats before the first push.
+    Column("provisional", Boolean, nullable=False, default=False),
+    # Local changes not yet pushed to Auth0
+    Column("dirty", Boolean, nullable=False, default=False),
+    Column("updated_at", Float, nullable=False),
+)
+
+
+# (winner, loser) as stored -> (winner, loser) after the match
+RateMatch = Callable[[PlayerStats, PlayerStats], Tuple[PlayerStats, PlayerStats]]
+
+
+class _RowChanged(Exception):
+    """A player's row changed between reading and writing it; the write is rolled back."""
+
+
+def _row_to_stats(row) -> PlayerStats:
+    return PlayerStats(player_id=row.player_id, elo=row.elo, wins=row.wins, losses=row.losses)
+
+
+class RatingsStore:
+    """Local source of truth for PlayerElo with write-behind sync to Auth0.
+
+    Match results commit to SQLite (or any SQLAlchemy URL) in one
+    transaction and are marked dirty. A background loop pushes dirty players
+    to Auth0 in batches; several matches by the same player between flushes
+    coalesce into one PATCH. Failed pushes stay dirty and are retried with
+    exponential backoff, so results survive Auth0 outages and restarts.
+
+    Stats rebased onto Auth0's when a provisional player is first pushed
+    are also written to *leaderboard*, if given.
+    """
+
+    def __init__(
+        self,
+        auth0_service: Auth0Service,
+        database_url: str | None = None,
+        flush_interval: float | None = None,
+        batch_size: int = 20,
+        seed_timeout: float = 2.0,
+        max_backoff: float = 300.0,
+        leaderboard: Optional[Leaderboard] = None,
+    ):
+        database_url = database_url or os.environ.get("RATINGS_DATABASE_URL", "sqlite:///ratings.db")
+        connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+        self._engine = create_engine(database_url, connect_args=connect_args)
+        metadata.create_all(self._engine)
+
+        self._auth0_service = auth0_service
+        self._leaderboard = leaderboard
+        self._flush_interval = (
+            flush_interval if flush_interval is not None else float(os.environ.get("RATINGS_FLUSH_SECONDS", "5"))
+        )
+        self._batch_size = batch_size
+        self._seed_timeout = seed_timeout
+        self._max_backoff = max_backoff
+        self._retry_at: dict[str, float] = {}  # player_id -> monotonic time of next attempt
+        self._failures: dict[str, int] = {}  # player_id -> consecutive push failures
+        self._flush_lock = asyncio.Lock()
+
+        with self._engine.connect() as conn:
+            self._dirty: set[str] = set(
+                conn.execute(select(player_ratings.c.player_id).where(player_ratings.c.dirty)).scalars()
+            )
+
+    def pending_sync(self) -> int:
+        return len(self._dirty)
+
+    # ── Local reads / writes (blocking, run in a thread) ─────────────────────
+
+    def _load(self, player_id: str):
+        with self._engine.connect() as conn:
+            return conn.execute(
+                select(player_ratings).where(player_ratings.c.player_id == player_id)
+            ).first()
+
+    def _load_all(self) -> list[PlayerStats]:
+        with self._engine.connect() as conn:
+            return [_row_to_stats(row) for row in conn.execute(select(player_ratings))]
+
+    def _insert_if_missing(self, stats: PlayerStats, provisional: bool):
+        with self._engine.begin() as conn:
+            row = conn.execute(
+                select(player_ratings).where(player_ratings.c.player_id == stats.player_id)
+            ).first()
+            if row is not None:
+                return row  # another request seeded it first
+            conn.execute(
+                player_ratings.insert().values(
+                    player_id=stats.player_id,
+                    elo=stats.elo,
+                    wins=stats.wins,
+                    losses=stats.losses,
+                    provisional=provisional,
+                    dirty=False,
+                    updated_at=time.time(),
+                )
+            )
+        return self._load(stats.player_id)
+
+    def _write_match(self, winner_id: str, loser_id: str, rate: RateMatch) -> Tuple[PlayerStats, PlayerStats] | None:
+        """Rate the match on both stored rows and write the result in one transaction.
+
+        Rows are locked where the database supports SELECT ... FOR UPDATE;
+        elsewhere (SQLite) each UPDATE only applies if the row's updated_at
+        is still the one read. None if either row changed meanwhile.
+        """
+        now = time.time()
+        try:
+            with self._engine.begin() as conn:
+                rows = {
+                    row.player_id: row
+                    for row in conn.execute(
+                        select(player_ratings)
+                        .where(player_ratings.c.player_id.in_((winner_id, loser_id)))
+                        .with_for_update()
+                    )
+                }
+                winner, loser = rate(_row_to_stats(rows[winner_id]), _row_to_stats(rows[loser_id]))
+                for stats in (winner, loser):
+                    result = conn.execute(
+                        update(player_ratings)
+                        .where(player_ratings.c.player_id == stats.player_id)
+                        .where(player_ratings.c.updated_at == rows[stats.player_id].updated_at)
+                        .values(elo=stats.elo, wins=stats.wins, losses=stats.losses, dirty=True, updated_at=now)
+                    )
+                    if not result.rowcount:
+                        raise _RowChanged(stats.player_id)
+        except _RowChanged:
+            return None
+        return winner, loser
+
+    def _replace_if_unchanged(self, row, stats: PlayerStats) -> float | None:
+        """Store merged stats unless the row changed since *row* was read."""
+        now = time.time()
+        with self._engine.begin() as conn:
+            result = conn.execute(
+                update(player_ratings)
+                .where(player_ratings.c.player_id == row.player_id)
+                .where(player_ratings.c.updated_at == row.updated_at)
+                .values(elo=stats.elo, wins=stats.wins, losses=stats.losses, provisional=False, updated_at=now)
+            )
+        return now if result.rowcount else None
+
+    def _mark_clean(self, player_id: str, updated_at: float) -> bool:
+        with self._engine.begin() as conn:
+            result = conn.execute(
+                update(player_ratings)
+                .where(player_ratings.c.player_id == player_id)
+                .where(player_ratings.c.updated_at == updated_at)
+                .values(dirty=False)
+            )
+        return bool(result.rowcount)
+
+    # ── Public API ───────────────────────────────────────────────────────────
+
+    async def all_stats(self) -> list[PlayerStats]:
+        return await asyncio.to_thread(self._load_all)
+
+    async def get_stats(self, player_id: str) -> PlayerStats:
+        """Return local stats, seeding a new player from Auth0 on first sight."""
+        row = await asyncio.to_thread(self._load, player_id)
+        if row is None:
+            try:
+                remote = await asyncio.wait_for(
+                    self._auth0_service.get_user_stats(player_id), self._seed_timeout
+                )
+                row = await asyncio.to_thread(self._insert_if_missing, remote, False)
+            except Exception as exc:
+                logger.warning(f"Seeding {player_id} from Auth0 failed, using defaults: {exc}")
+                default = PlayerStats(player_id=player_id, elo=DEFAULT_ELO)
+                row = await asyncio.to_thread(self._insert_if_missing, default, True)
+        return _row_to_stats(row)
+
+    async def record_match(
+        self, winner_id: str, loser_id: str, rate: RateMatch, attempts: int = 5
+    ) -> Tuple[PlayerStats, PlayerStats]:
+        """Apply a match result atomically and queue both players for Auth0.
+
+        *rate* gets both players' stored stats and returns their new stats.
+        If another worker updates either player at the same time, *rate*
+        runs again on the fresh stats, so no result is lost.
+        """
+        await asyncio.gather(self.get_stats(winner_id), self.get_stats(loser_id))  # seed new players
+        for attempt in range(attempts):
+            rated = await asyncio.to_thread(self._write_match, winner_id, loser_id, rate)
+            if rated is not None:
+                self._dirty.update((winner_id, loser_id))
+                return rated
+            await asyncio.sleep(random.uniform(0, 0.01 * 2 ** attempt))  # let the other writer finish
+        raise RuntimeError(f"Stats of {winner_id} or {loser_id} kept changing; match not recorded")
+
+    # ── Auth0 sync ───────────────────────────────────────────────────────────
+
+    async def _push(self, player_id: str) -> None:
+        row = await asyncio.to_thread(self._load, player_id)
+        if row is None or not row.dirty:
+            self._dirty.discard(player_id)
+            return
+
+        stats = _row_to_stats(row)
+        updated_at = row.updated_at
+        if row.provisional:
+            # Local stats started from defaults; rebase them onto Auth0's
+            remote = await self._auth0_service.get_user_stats(player_id)
+            stats = PlayerStats(
+                player_id=player_id,
+                elo=max(100, remote.elo + row.elo - DEFAULT_ELO),
+                wins=remote.wins + row.wins,
+                losses=remote.losses + row.losses,
+            )
+            updated_at = await asyncio.to_thread(self._replace_if_unchanged, row, stats)
+            if updated_at is None:
+                return  # a newer match landed meanwhile; next flush retries
+            if self._leaderboard is not None:
+                await self._leaderboard.update(stats)
+
+        await self._auth0_service.update_user_stats(player_id, stats)
+        if await asyncio.to_thread(self._mark_clean, player_id, updated_at):
+            self._dirty.discard(player_id)
+
+    async def flush(self) -> int:
+        """Push one batch of due dirty players to Auth0. Returns how many succeeded."""
+        async with self._flush_lock:
+            now = time.monotonic()
+            due = [pid for pid in self._dirty if self._retry_at.get(pid, 0.0) <= now][: self._batch_size]
+            if not due:
+                return 0
+
+            results = await asyncio.gather(*(self._push(pid) for pid in due), return_exceptions=True)
+            pushed = 0
+            for player_id, result in zip(due, results):
+                if isinstance(result, Exception):
+                    failures = self._failures.get(player_id, 0) + 1
+                    self._failures[player_id] = failures
+                    delay = min(self._max_backoff, self._flush_interval * 2 ** failures)
+                    self._retry_at[player_id] = time.monotonic() + delay
+                    logger.warning(f"Auth0 sync for {player_id} failed (retry in {delay:.0f}s): {result}")
+                else:
+                    self._failures.pop(player_id, None)
+                    self._retry_at.pop(player_id, None)
+                    pushed += 1
+            return pushed
+
+    async def run(self) -> None:
+        """Background loop: flush whatever became dirty every flush interval."""
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                while await self.flush() == self._batch_size:
+                    pass  # keep draining full batches
+            except Exception as exc:
+                logger.error(f"Ratings flush failed: {exc}")
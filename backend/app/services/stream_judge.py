@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable
+
+from app.core.round_trace import RoundTrace
+from app.models.live_state import LiveRoom
+from model_service import (
+    ClassificationRejected,
+    ClassificationScheduler,
+    ClassifierBackend,
+    create_classifier,
+    preprocess_image,
+    scheduler as default_scheduler,
+    uncached_classifier,
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds between round_start and DRAW! on the client (MatchPage countdown)
+ROUND_COUNTDOWN_SECONDS = 5.0
+
+# Called once per round with {player_id: {"matches", "detected_sign"}}
+OnDecided = Callable[[str, int, dict], Awaitable[None]]
+
+
+class _PlayerLane:
+    """Newest unclassified frame for one player, plus the one in flight."""
+
+    __slots__ = ("player_id", "frame", "received_at", "inflight_at", "ready", "last_result")
+
+    def __init__(self, player_id: str):
+        self.player_id = player_id
+        self.frame = None
+        self.received_at = 0.0
+        self.inflight_at: float | None = None  # receive time of the frame being classified
+        self.ready = asyncio.Event()
+        self.last_result: dict | None = None
+
+
+class _RoundWindow:
+    __slots__ = ("room_id", "round_number", "target_sign", "opens_at", "lanes", "best", "trace", "tasks", "decided")
+
+    def __init__(self, room: LiveRoom, opens_at: float, trace: RoundTrace | None):
+        self.room_id = room.room_id
+        self.round_number = room.round_number
+        self.target_sign = room.target_sign
+        self.opens_at = opens_at
+        self.lanes = {
+            room.player1_sid: _PlayerLane(room.player1_id),
+            room.player2_sid: _PlayerLane(room.player2_id),
+        }
+        self.best: tuple[float, str] | None = None  # (receive time, player_id) of earliest correct frame
+        self.trace = trace
+        self.tasks: list[asyncio.Task] = []
+        self.decided = False
+
+
+class StreamJudge:
+    """First-correct detection on the relayed video frames.
+
+    When a round starts, a window opens for its room. Once the client
+    countdown is over, every relayed frame is offered here; each player has
+    one classification in flight at a time on the newest frame, at most one
+    every *sample_interval* seconds, so intermediate frames are skipped.
+
+    A frame counts as correct when it matches the target sign with at least
+    *min_confidence*. The round goes to the player whose correct frame the
+    server received first: a correct result only decides the round once
+    the opponent has no earlier frame still being classified or waiting
+    for its next sample. Nobody correct within *window_seconds* of DRAW!
+    is a replay.
+
+    Samples run in the scheduler's "stream" lane, so they share the
+    classification concurrency cap and are shed under load like any other
+    work. There is no result cache: consecutive frames differ mostly in
+    the hand, which a whole-frame hash barely sees.
+
+    Frames never leave the process, so the judge only sees frames for
+    rooms whose round started on this worker; run a single worker with
+    this mode. Settings (env or constructor):
+        ASL_STREAM_CLASSIFIER_BACKEND  backend for frames (default: the main classifier, uncached)
+        ASL_STREAM_SAMPLE_MS           min gap between a player's samples (default 300)
+        ASL_STREAM_WINDOW_SECONDS      seconds after DRAW! before a replay (default 8)
+        ASL_STREAM_MIN_CONFIDENCE      confidence needed to win (default 0.7)
+    """
+
+    def __init__(
+        self,
+        on_decided: OnDecided,
+        backend: ClassifierBackend | None = None,
+        scheduler: ClassificationScheduler | None = None,
+        sample_interval: float | None = None,
+        window_seconds: float | None = None,
+        min_confidence: float | None = None,
+        countdown: float = ROUND_COUNTDOWN_SECONDS,
+    ):
+        self._on_decided = on_decided
+        if backend is None:
+            name = os.environ.get("ASL_STREAM_CLASSIFIER_BACKEND")
+            backend = create_classifier(name) if name else uncached_classifier
+        self._backend = backend
+        self._scheduler = scheduler or default_scheduler
+        self._sample_interval = (
+            sample_interval if sample_interval is not None else float(os.environ.get("ASL_STREAM_SAMPLE_MS", "300")) / 1000
+        )
+        self._window = (
+            window_seconds if window_seconds is not None else float(os.environ.get("ASL_STREAM_WINDOW_SECONDS", "8"))
+        )
+        self._min_confidence = (
+            min_confidence if min_confidence is not None else float(os.environ.get("ASL_STREAM_MIN_CONFIDENCE", "0.7"))
+        )
+        self._countdown = countdown
+        self._windows: dict[str, _RoundWindow] = {}  # room_id -> open window
+        self.frames_sampled = 0
+
+    def open(self, room: LiveRoom, trace: RoundTrace | None = None) -> None:
+        """Start judging *room*'s current round; call right after round_start."""
+        self.close(room.room_id)
+        window = _RoundWindow(room, time.monotonic() + self._countdown, trace)
+        self._windows[room.room_id] = window
+        loop = asyncio.get_running_loop()
+        window.tasks = [loop.create_task(self._sampler(window, lane)) for lane in window.lanes.values()]
+        window.tasks.append(loop.create_task(self._expire(window)))
+
+    def close(self, room_id: str) -> None:
+        window = self._windows.pop(room_id, None)
+        if window is None:
+            return
+        current = asyncio.current_task()
+        for task in window.tasks:
+            if task is not current:
+                task.cancel()
+
+    def offer(self, room_id: str, sid: str, frame) -> None:
+        """Hand over a relayed frame; cheap enough to call for every frame."""
+        window = self._windows.get(room_id)
+        if window is None:
+            return
+        now = time.monotonic()
+        if now < window.opens_at:
+            return  # still counting down: holding the sign early doesn't count
+        lane = window.lanes.get(sid)
+        if lane is None:
+            return
+        lane.frame = frame
+        lane.received_at = now
+        lane.ready.set()
+
+    async def _classify(self, frame, target_sign: str) -> dict:
+        image_bytes = await asyncio.to_thread(preprocess_image, frame)
+        result = await self._backend.classify(image_bytes, target_sign)
+        if result.get("fallback"):
+            raise TimeoutError("no classifier tier answered in time")  # not a verdict on the frame
+        return result
+
+    async def _sampler(self, window: _RoundWindow, lane: _PlayerLane) -> None:
+        while True:
+            await lane.ready.wait()
+            lane.ready.clear()
+            frame, received_at = lane.frame, lane.received_at
+            lane.frame = None
+            if frame is None:
+                continue
+
+            started = time.monotonic()
+            lane.inflight_at = received_at
+            span = window.trace.span("stream_sample", player_id=lane.player_id) if window.trace else None
+            try:
+                result = await self._scheduler.run("stream", self._classify, frame, window.target_sign)
+            except ClassificationRejected as exc:
+                # counted in the scheduler's lane stats; a newer frame follows
+                logger.debug(f"Stream sample for {lane.player_id} shed: {exc.code}")
+                result = None
+            except Exception as exc:
+                logger.warning(f"Stream classification for {lane.player_id} failed: {exc}")
+                result = None
+            finally:
+                lane.inflight_at = None
+                if span is not None:
+                    span.end()
+            self.frames_sampled += 1
+
+            if result is not None:
+                lane.last_result = result
+                if span is not None:
+                    span.attributes.update(matches=result["matches"], confidence=result.get("confidence"))
+                correct = result["matches"] and result.get("confidence", 0.0) >= self._min_confidence
+                if correct and (window.best is None or received_at < window.best[0]):
+                    window.best = (received_at, lane.player_id)
+            await self._maybe_decide(window)
+            if window.decided:
+                return
+
+            await asyncio.sleep(max(0.0, self._sample_interval - (time.monotonic() - started)))
+
+    async def _maybe_decide(self, window: _RoundWindow) -> None:
+        if window.best is None or window.decided:
+            return
+        best_at, _ = window.best
+        if any(self._earlier_frame_pending(lane, best_at) for lane in window.lanes.values()):
+            return  # an earlier frame from the opponent may still win; its sampler re-checks
+        await self._decide(window)
+
+    @staticmethod
+    def _earlier_frame_pending(lane: _PlayerLane, before: float) -> bool:
+        """Whether *lane* has a frame received before *before* in flight or waiting to be sampled."""
+        if lane.inflight_at is not None and lane.inflight_at < before:
+            return True
+        return lane.frame is not None and lane.received_at < before
+
+    async def _expire(self, window: _RoundWindow) -> None:
+        await asyncio.sleep(window.opens_at - time.monotonic() + self._window)
+        await self._decide(window)
+
+    async def _decide(self, window: _RoundWindow) -> None:
+        if window.decided:
+            return
+        window.decided = True
+        self.close(window.room_id)
+
+        winner_id = window.best[1] if window.best else None
+        round_results = {}
+        for lane in window.lanes.values():
+            if lane.player_id == winner_id:
+                round_results[lane.player_id] = {"matches": True, "detected_sign": window.target_sign}
+            else:
+                detected = (lane.last_result or {}).get("detected_sign", "UNKNOWN")
+                round_results[lane.player_id] = {"matches": False, "detected_sign": detected}
+        try:
+            await self._on_decided(window.room_id, window.round_number, round_results)
+        except Exception as exc:
+            logger.error(f"Resolving streamed round in room {window.room_id} failed: {exc}")
@@ -1,33 +1,197 @@
+import asyncio
 import logging
+import time
 
 from app.core.duel_engine import DuelEngine
+from app.core.metrics import SOCKET_EVENT_SECONDS, timed
+from app.services.stream_judge import StreamJudge
 
 logger = logging.getLogger(__name__)
 
+# A receiver's sender task exits after this many idle seconds; the next frame
+# for that receiver starts a fresh one.
+_SENDER_IDLE_SECONDS = 5.0
 
-def setup_video_relay(sio, duel_engine: DuelEngine):
+# Room players are cached locally this long so relaying a frame does not hit
+# the state backend (Redis, with several workers) on every frame.
+_ROOM_CACHE_SECONDS = 2.0
+
+
+class _FrameMailbox:
+    """Holds only the newest undelivered frame for one receiver."""
+
+    __slots__ = ("frame", "room_id", "ready")
+
+    def __init__(self):
+        self.frame = None
+        self.room_id: str | None = None
+        self.ready = asyncio.Event()
+
+
+class VideoRelay:
+    """Latest-frame-wins fan-out of relayed video frames.
+
+    Each receiving sid gets a one-slot mailbox drained by a single sender
+    task. A frame that arrives while an older one is still undelivered
+    replaces it, so a slow connection sees a lower frame rate instead of a
+    growing backlog. Replaced frames are counted per room.
+
+    sio.emit() returns as soon as the packet is on the engine.io socket's
+    unbounded send queue, so the sender paces itself on that queue: the
+    next frame is only emitted once the transport has taken the previous
+    one, and the mailbox does the dropping in between.
+    """
+
+    def __init__(self, sio, duel_engine: DuelEngine):
+        self._sio = sio
+        self._duel_engine = duel_engine
+        self._mailboxes: dict[str, _FrameMailbox] = {}  # receiver sid -> mailbox
+        self._senders: dict[str, asyncio.Task] = {}  # receiver sid -> sender task
+        self._dropped: dict[str, int] = {}  # room_id -> frames replaced before delivery
+        self._relayed: dict[str, int] = {}  # room_id -> frames delivered
+        self._room_sids: dict[str, tuple[str, str, float]] = {}  # room_id -> (p1 sid, p2 sid, expiry)
+        self.frames_relayed = 0  # totals across all rooms, for metrics
+        self.frames_dropped = 0
+
+    def dropped_frames(self, room_id: str) -> int:
+        return self._dropped.get(room_id, 0)
+
+    def stats(self) -> dict:
+        """Per-room relayed and dropped frame counts."""
+        return {
+            room_id: {"relayed": self._relayed.get(room_id, 0), "dropped": self._dropped.get(room_id, 0)}
+            for room_id in self._relayed.keys() | self._dropped.keys()
+        }
+
+    def forget_room(self, room_id: str) -> None:
+        self._dropped.pop(room_id, None)
+        self._relayed.pop(room_id, None)
+        self._room_sids.pop(room_id, None)
+
+    async def peer_sid(self, room_id: str, sender_sid: str) -> str | None:
+        """Return the other player's sid given one player's sid in a room."""
+        cached = self._room_sids.get(room_id)
+        if cached is None or cached[2] < time.monotonic():
+            room = await self._duel_engine.get_room(room_id)
+            if room is None:
+                self._room_sids.pop(room_id, None)
+                return None
+            cached = (room.player1_sid, room.player2_sid, time.monotonic() + _ROOM_CACHE_SECONDS)
+            self._room_sids[room_id] = cached
+        player1_sid, player2_sid, _ = cached
+        if player1_sid == sender_sid:
+            return player2_sid
+        if player2_sid == sender_sid:
+            return player1_sid
+        return None
+
+    async def _forget_if_closed(self, room_id: str) -> None:
+        try:
+            if await self._duel_engine.get_room(room_id) is None:
+                self.forget_room(room_id)
+        except Exception as exc:
+            logger.warning(f"Video relay cleanup for {room_id} failed: {exc}")
+
+    def forget_sid(self, sid: str) -> None:
+        self._mailboxes.pop(sid, None)
+        task = self._senders.pop(sid, None)
+        if task:
+            task.cancel()
+
+    def _transport_queue(self, sid: str) -> asyncio.Queue | None:
+        """The engine.io send queue for *sid*, if it is connected to this process."""
+        eio_sid = self._sio.manager.eio_sid_from_sid(sid, "/")
+        socket = self._sio.eio.sockets.get(eio_sid) if eio_sid else None
+        return socket.queue if socket is not None and not socket.closed else None
+
+    async def _transport_drained(self, sid: str) -> bool:
+        """Wait until the transport has taken every queued packet for *sid*."""
+        queue = self._transport_queue(sid)
+        if queue is None or not queue.qsize():
+            return True
+        try:
+            # engine.io marks packets done as its writer takes them off the queue
+            await asyncio.wait_for(queue.join(), _SENDER_IDLE_SECONDS)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def post(self, receiver_sid: str, room_id: str, frame) -> None:
+        mailbox = self._mailboxes.get(receiver_sid)
+        if mailbox is None:
+            mailbox = self._mailboxes[receiver_sid] = _FrameMailbox()
+        if mailbox.frame is not None:
+            self._dropped[room_id] = self._dropped.get(room_id, 0) + 1
+            self.frames_dropped += 1
+        mailbox.frame = frame
+        mailbox.room_id = room_id
+        mailbox.ready.set()
+
+        if receiver_sid not in self._senders:
+            self._senders[receiver_sid] = asyncio.get_running_loop().create_task(
+                self._sender(receiver_sid, mailbox)
+            )
+
+    async def _sender(self, receiver_sid: str, mailbox: _FrameMailbox) -> None:
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(mailbox.ready.wait(), _SENDER_IDLE_SECONDS)
+                except asyncio.TimeoutError:
+                    return
+                mailbox.ready.clear()
+                if not await self._transport_drained(receiver_sid):
+                    continue  # stalled receiver: keep only the newest frame
+                frame, room_id = mailbox.frame, mailbox.room_id
+                mailbox.frame = None
+                if frame is None:
+                    continue
+                try:
+                    await self._sio.emit("video_frame", frame, to=receiver_sid)
+                except Exception as exc:
+                    logger.warning(f"Video relay to {receiver_sid} failed: {exc}")
+                    continue
+                self._relayed[room_id] = self._relayed.get(room_id, 0) + 1
+                self.frames_relayed += 1
+        finally:
+            if self._senders.get(receiver_sid) is asyncio.current_task():
+                del self._senders[receiver_sid]
+                self._mailboxes.pop(receiver_sid, None)
+            # Counters outlive the room only until its streams go idle
+            if mailbox.room_id:
+                asyncio.get_running_loop().create_task(self._forget_if_closed(mailbox.room_id))
+
+
+def setup_video_relay(sio, duel_engine: DuelEngine, judge: StreamJudge | None = None) -> VideoRelay:
     """Relay video frames between the two players in a room.
 
     Each player captures JPEG frames from their local camera and emits
     'video_frame'. This handler looks up their opponent in the room and
     forwards the frame to them. No WebRTC negotiation needed.
-    """
 
-    def _peer_sid(room, sender_sid: str) -> str | None:
-        """Return the other player's sid given one player's sid in a room."""
-        if room.player1_sid == sender_sid:
-            return room.player2_sid
-        if room.player2_sid == sender_sid:
-            return room.player1_sid
-        return None
+    Current clients send the frame as raw JPEG bytes, which Socket.IO carries
+    as a binary attachment; older clients send a base64 data-URL string.
+    Either way the frame itself is forwarded as-is, never decoded or
+    copied; only room_id and frame are passed on, so nothing else a client
+    puts in the payload reaches its opponent. Delivery goes through a
+    VideoRelay mailbox so stale frames are dropped rather than queued.
+
+    With a StreamJudge, each frame is also offered to it for first-correct
+    detection; the judge decides itself which frames to classify.
+    """
+    relay = VideoRelay(sio, duel_engine)
 
     @sio.on("video_frame")
+    @timed(SOCKET_EVENT_SECONDS.labels("video_frame"))
     async def relay_video_frame(sid, data):
         room_id = data.get("room_id")
         frame = data.get("frame")
-        room = duel_engine.get_room(room_id)
-        if not room:
+        if not room_id or not frame:
             return
-        peer_sid = _peer_sid(room, sid)
+        if judge is not None:
+            judge.offer(room_id, sid, frame)
+        peer_sid = await relay.peer_sid(room_id, sid)
         if peer_sid:
-            await sio.emit("video_frame", {"frame": frame}, to=peer_sid)
\ No newline at end of file
+            relay.post(peer_sid, room_id, {"room_id": room_id, "frame": frame})
+
+    return relay
@@ -1,32 +1,101 @@
+import asyncio
 import logging
+import os
+import time
+from functools import partial
 
 import socketio
+from fastapi import HTTPException
 
+from app.core.auth import verify_access_token
 from app.core.duel_engine import DuelEngine
-from app.core.elo_matchmaker import EloMatchmaker
-from app.routers.websocket import setup_websocket_handlers
+from app.core.leaderboard import MemoryLeaderboard, RedisLeaderboard
+from app.core.metrics import counter, gauge
+from app.core.room_reaper import RoomReaper
+from app.core.round_trace import RoundTracer
+from app.core.state_backend import RedisStateBackend, create_state_backend
+from app.routers.websocket import resolve_streamed_round, setup_websocket_handlers, start_match
 from app.services.auth0_service import Auth0Service
+from app.services.ratings_store import RatingsStore
+from app.services.stream_judge import StreamJudge
 from app.services.webrtc_relay import setup_video_relay
+from model_service import TieredClassifier, classifier, scheduler
 
 logger = logging.getLogger(__name__)
 
 # cors_allowed_origins=[] disables python-socketio's built-in CORS so that
 # FastAPI's CORSMiddleware (configured in main.py) handles it exclusively.
 # Do NOT change this to "*" — that causes duplicate CORS headers.
-sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins=[])
+#
+# STATE_BACKEND=redis keeps the queue and rooms in Redis and routes emits
+# through it, so several uvicorn workers can serve one game. Clients must
+# stick to one worker (sticky sessions) as usual for Socket.IO.
+state = create_state_backend()
+client_manager = (
+    socketio.AsyncRedisManager(os.environ["REDIS_URL"]) if isinstance(state, RedisStateBackend) else None
+)
+sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins=[], client_manager=client_manager)
 socket_app = socketio.ASGIApp(sio)
 
 # Singletons shared across all socket events
-matchmaker = EloMatchmaker()
 auth0_service = Auth0Service()
-duel_engine = DuelEngine(auth0_service=auth0_service)
+# Rankings are shared through Redis too, so every worker serves the same order
+leaderboard = RedisLeaderboard() if isinstance(state, RedisStateBackend) else MemoryLeaderboard()
+ratings_store = RatingsStore(auth0_service, leaderboard=leaderboard)
+duel_engine = DuelEngine(state=state, ratings_store=ratings_store, leaderboard=leaderboard)
+room_reaper = RoomReaper(sio, state)
+round_tracer = RoundTracer()
 
-# Maps sid -> player_id for disconnect cleanup
+# ASL_STREAMING_DETECTION=1 decides rounds from the relayed video frames
+# (first correct frame wins) instead of the draw_made snapshots.
+STREAMING_DETECTION = os.environ.get("ASL_STREAMING_DETECTION", "0").lower() in ("1", "true", "yes")
+stream_judge = (
+    StreamJudge(on_decided=partial(resolve_streamed_round, sio, duel_engine, round_tracer))
+    if STREAMING_DETECTION
+    else None
+)
+if stream_judge is not None and isinstance(state, RedisStateBackend):
+    logger.warning("ASL_STREAMING_DETECTION only sees frames relayed by this worker; run a single worker")
+
+# ASL_EARLY_RESOLUTION=1 lets the first confident correct draw_made decide a
+# round without waiting for (and cancelling) the other player's classification.
+EARLY_RESOLUTION = os.environ.get("ASL_EARLY_RESOLUTION", "0").lower() in ("1", "true", "yes")
+
+# Maps sid -> player_id for disconnect cleanup. Stays per-process: a sid
+# only ever connects to one worker.
 _sid_to_player: dict[str, str] = {}
 
+# Seconds between global re-pairing passes over the whole queue
+MATCHMAKING_TICK_SECONDS = float(os.environ.get("MATCHMAKING_TICK_SECONDS", "2.0"))
+
+# When set, buffered round traces are written here on shutdown
+# (ROUND_TRACE_FORMAT: json or otlp)
+ROUND_TRACE_FILE = os.environ.get("ROUND_TRACE_FILE")
+ROUND_TRACE_FORMAT = os.environ.get("ROUND_TRACE_FORMAT", "json")
+
+# Last-tick and cumulative matchmaking numbers, for tuning throughput vs quality
+matchmaking_metrics = {
+    "ticks": 0,
+    "pairs_made": 0,
+    "pairs_made_total": 0,
+    "pass_duration_ms": 0.0,
+    "queue_depth": 0,
+}
+
+_background_tasks: list[asyncio.Task] = []
+
 
 @sio.event
-async def connect(sid, environ):
+async def connect(sid, environ, auth=None):
+    # Clients may present an Auth0 access token; it is verified (and cached)
+    # before the connection is accepted. Anonymous connections are still allowed.
+    token = auth.get("token") if isinstance(auth, dict) else None
+    if token:
+        try:
+            token_data = await verify_access_token(token)
+        except HTTPException as exc:
+            raise socketio.exceptions.ConnectionRefusedError(exc.detail)
+        await sio.save_session(sid, {"player_id": token_data.player_id})
     logger.info(f"Cowboy connected: {sid}")
 
 
@@ -34,11 +103,147 @@ async def connect(sid, environ):
 async def disconnect(sid):
     player_id = _sid_to_player.pop(sid, None)
     if player_id:
-        matchmaker.remove_from_queue(player_id)
+        await state.dequeue(player_id)
         logger.info(f"Player {player_id} disconnected, removed from queue")
+    await room_reaper.handle_disconnect(sid)
+    video_relay.forget_sid(sid)
     logger.info(f"Cowboy left the saloon: {sid}")
 
 
 # Wire up event handlers at import time
-setup_websocket_handlers(sio, matchmaker, duel_engine, _sid_to_player)
-setup_video_relay(sio, duel_engine)
+setup_websocket_handlers(sio, state, duel_engine, round_tracer, _sid_to_player, stream_judge, EARLY_RESOLUTION)
+video_relay = setup_video_relay(sio, duel_engine, stream_judge)
+
+
+async def run_matchmaking_tick() -> int:
+    """Pair the whole queue once and start a match for every pair.
+
+    Returns the number of pairs made.
+    """
+    queue_depth = await state.queue_size()
+    started = time.perf_counter()
+    pairs = await state.pair_all()
+    pass_ms = (time.perf_counter() - started) * 1000
+
+    matchmaking_metrics["ticks"] += 1
+    matchmaking_metrics["pairs_made"] = len(pairs)
+    matchmaking_metrics["pairs_made_total"] += len(pairs)
+    matchmaking_metrics["pass_duration_ms"] = pass_ms
+    matchmaking_metrics["queue_depth"] = queue_depth
+
+    if pairs:
+        logger.info(
+            f"Matchmaking tick: {len(pairs)} pairs from {queue_depth} queued in {pass_ms:.2f}ms"
+        )
+    # Each match sleeps before its first round_start, so run them side by side
+    # instead of holding up the tick.
+    for t1, t2 in pairs:
+        sio.start_background_task(start_match, sio, duel_engine, round_tracer, t1, t2, judge=stream_judge)
+    return len(pairs)
+
+
+async def matchmaking_loop(interval: float = MATCHMAKING_TICK_SECONDS) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_matchmaking_tick()
+        except Exception as exc:
+            logger.error(f"Matchmaking tick failed: {exc}")
+
+
+async def start_background_tasks() -> None:
+    """Load startup state and start periodic server work.
+
+    Called from the FastAPI lifespan in main.py.
+    """
+    await leaderboard.load(await ratings_store.all_stats())
+    logger.info(f"Leaderboard loaded with {await leaderboard.size()} players")
+    _background_tasks.append(asyncio.create_task(matchmaking_loop()))
+    _background_tasks.append(asyncio.create_task(ratings_store.run()))
+    _background_tasks.append(asyncio.create_task(room_reaper.run()))
+
+
+async def stop_background_tasks() -> None:
+    for task in _background_tasks:
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    _background_tasks.clear()
+    # Last chance to push pending ratings; anything left is retried next start
+    try:
+        await asyncio.wait_for(ratings_store.flush(), 5.0)
+    except Exception as exc:
+        logger.warning(f"Final ratings flush incomplete: {exc}")
+    if ROUND_TRACE_FILE:
+        written = round_tracer.dump(ROUND_TRACE_FILE, ROUND_TRACE_FORMAT)
+        logger.info(f"Wrote {written} round traces to {ROUND_TRACE_FILE}")
+
+
+# ── Metrics (rendered by GET /metrics) ───────────────────────────────────────
+
+QUEUE_SIZE = gauge("asl_queue_size", "Players waiting in the matchmaking queue")
+LIVE_ROOMS = gauge("asl_live_rooms", "Duel rooms held by the state backend")
+PENDING_RESULTS = gauge("asl_pending_results", "Rooms holding one result while waiting for the other")
+RELAY_FPS = gauge("asl_relay_frames_per_second", "Video frames relayed per second since the previous scrape")
+RELAY_FRAMES = counter("asl_relay_frames_total", "Video frames relayed, or dropped for a newer one", ["outcome"])
+MATCHMAKING_PASS = gauge("asl_matchmaking_pass_duration_seconds", "Duration of the last global pairing pass")
+MATCHMAKING_PAIRS = counter("asl_matchmaking_pairs_total", "Pairs made by the periodic matchmaking tick")
+ROOMS_REAPED = counter("asl_rooms_reaped_total", "Abandoned or idle rooms removed by the reaper")
+RECLAIMED_BYTES = counter("asl_reaper_reclaimed_bytes_total", "Approximate serialized bytes freed by the reaper")
+CLASSIFICATIONS_ACTIVE = gauge("asl_classifications_active", "Classifications holding a scheduler slot")
+CLASSIFICATIONS_QUEUED = gauge("asl_classifications_queued", "Classifications waiting for a slot", ["lane"])
+CLASSIFICATIONS_SHED = counter("asl_classifications_shed_total", "Classifications rejected by the scheduler", ["lane", "reason"])
+CACHE_REQUESTS = counter("asl_classifier_cache_requests_total", "Classifier result cache lookups", ["result"])
+RATINGS_PENDING_SYNC = gauge("asl_ratings_pending_sync", "Players with ratings not yet pushed to Auth0")
+TIER_CALLS = counter("asl_classifier_tier_calls_total", "Calls per classifier tier, by outcome", ["tier", "outcome"])
+TIER_HEDGES = counter("asl_classifier_hedges_total", "Hedged backup requests per tier, by winner", ["tier", "won"])
+TIER_ESCALATIONS = counter("asl_classifier_escalations_total", "Images passed on to a stronger tier")
+TIER_FALLBACKS = counter("asl_classifier_fallbacks_total", "Images given the fallback verdict at the deadline")
+
+_relay_sample = {"frames": 0, "at": time.monotonic()}
+
+
+async def collect_metrics() -> None:
+    """Refresh gauges and mirrored totals; called right before rendering."""
+    QUEUE_SIZE.set(await state.queue_size())
+    LIVE_ROOMS.set(await state.room_count())
+    PENDING_RESULTS.set(await state.pending_result_count())
+
+    now = time.monotonic()
+    elapsed = now - _relay_sample["at"]
+    if elapsed > 0:
+        RELAY_FPS.set((video_relay.frames_relayed - _relay_sample["frames"]) / elapsed)
+    _relay_sample.update(frames=video_relay.frames_relayed, at=now)
+    RELAY_FRAMES.labels("relayed").set(video_relay.frames_relayed)
+    RELAY_FRAMES.labels("dropped").set(video_relay.frames_dropped)
+
+    MATCHMAKING_PASS.set(matchmaking_metrics["pass_duration_ms"] / 1000)
+    MATCHMAKING_PAIRS.labels().set(matchmaking_metrics["pairs_made_total"])
+    ROOMS_REAPED.labels().set(room_reaper.metrics["rooms_reaped_total"])
+    RECLAIMED_BYTES.labels().set(room_reaper.metrics["reclaimed_bytes_total"])
+
+    scheduler_stats = scheduler.stats()
+    CLASSIFICATIONS_ACTIVE.set(scheduler_stats["active"])
+    for lane, lane_stats in scheduler_stats["lanes"].items():
+        CLASSIFICATIONS_QUEUED.labels(lane).set(lane_stats["queued"])
+        CLASSIFICATIONS_SHED.labels(lane, "overloaded").set(lane_stats["shed"])
+        CLASSIFICATIONS_SHED.labels(lane, "deadline_exceeded").set(lane_stats["timed_out"])
+
+    cache_stats = classifier.stats()
+    CACHE_REQUESTS.labels("hit").set(cache_stats["hits"])
+    CACHE_REQUESTS.labels("miss").set(cache_stats["misses"])
+    RATINGS_PENDING_SYNC.set(ratings_store.pending_sync())
+
+    backend = classifier
+    while not isinstance(backend, TieredClassifier) and hasattr(backend, "backend"):
+        backend = backend.backend
+    if isinstance(backend, TieredClassifier):
+        tiered_stats = backend.stats()
+        TIER_ESCALATIONS.labels().set(tiered_stats["escalations"])
+        TIER_FALLBACKS.labels().set(tiered_stats["fallbacks"])
+        for tier, tier_stats in tiered_stats["tiers"].items():
+            failed = tier_stats["errors"] + tier_stats["timeouts"]
+            TIER_CALLS.labels(tier, "ok").set(tier_stats["calls"] - failed)
+            TIER_CALLS.labels(tier, "error").set(tier_stats["errors"])
+            TIER_CALLS.labels(tier, "timeout").set(tier_stats["timeouts"])
+            TIER_HEDGES.labels(tier, "backup").set(tier_stats["hedge_wins"])
+            TIER_HEDGES.labels(tier, "primary").set(tier_stats["hedges"] - tier_stats["hedge_wins"])
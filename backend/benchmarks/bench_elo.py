@@ -0,0 +1,64 @@
+"""Cost of DuelEngine._apply_match_result with Auth0 stubbed out.
+
+Usage (from /backend directory):
+    python benchmarks/bench_elo.py
+    python benchmarks/bench_elo.py --matches 2000 --players 200
+
+Covers the Elo math plus what comes with it on every finished match:
+reading both players from the RatingsStore, committing the result to a
+temporary SQLite file and updating the leaderboard. Auth0 is never
+reached; the write-behind loop is not started.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Allow running from the backend directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.duel_engine import DuelEngine
+from app.core.leaderboard import MemoryLeaderboard
+from app.core.state_backend import MemoryStateBackend
+from app.models.showdown_state import PlayerElo as PlayerStats
+from app.services.ratings_store import RatingsStore
+
+
+class StubAuth0:
+    async def get_user_stats(self, player_id: str) -> PlayerStats:
+        return PlayerStats(player_id=player_id, elo=1200)
+
+    async def update_user_stats(self, player_id: str, stats: PlayerStats) -> None:
+        pass
+
+
+async def run(matches: int, players: int = 100, seed: int = 0) -> float:
+    """Return mean microseconds per _apply_match_result."""
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RatingsStore(StubAuth0(), database_url=f"sqlite:///{tmp}/ratings.db", flush_interval=3600)
+        engine = DuelEngine(state=MemoryStateBackend(), ratings_store=store, leaderboard=MemoryLeaderboard())
+        player_ids = [f"p{i}" for i in range(players)]
+        for player_id in player_ids:  # seed every player once, outside the timing
+            await store.get_stats(player_id)
+
+        pairs = [rng.sample(player_ids, 2) for _ in range(matches)]
+        start = time.perf_counter()
+        for winner_id, loser_id in pairs:
+            await engine._apply_match_result(winner_id, loser_id)
+        elapsed = time.perf_counter() - start
+        store._engine.dispose()
+    return elapsed / matches * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Elo update on match finish")
+    parser.add_argument("--matches", type=int, default=1_000)
+    parser.add_argument("--players", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{asyncio.run(run(args.matches, args.players)):.1f} us/match")
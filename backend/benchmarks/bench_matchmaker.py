@@ -0,0 +1,63 @@
+"""Join/match cost of EloMatchmaker as the queue grows.
+
+Usage (from /backend directory):
+    python benchmarks/bench_matchmaker.py
+    python benchmarks/bench_matchmaker.py --sizes 100 1000 10000 100000 --joins 2000
+
+For each queue size the queue is pre-filled with tickets spread over a wide
+elo band, then a stream of new players joins and calls find_match. Matched
+opponents are put back so the queue depth stays constant during the run.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Allow running from the backend directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.elo_matchmaker import EloMatchmaker
+from app.models.live_state import LiveTicket
+
+
+def _fill(matchmaker: EloMatchmaker, size: int, rng: random.Random) -> None:
+    for i in range(size):
+        matchmaker.add_to_queue(
+            LiveTicket(f"p{i}", f"s{i}", rng.randint(400, 2800))
+        )
+
+
+def run(size: int, joins: int, seed: int = 0) -> float:
+    """Return mean microseconds per enter-queue + find_match at *size* queued tickets."""
+    rng = random.Random(seed)
+    matchmaker = EloMatchmaker()
+    _fill(matchmaker, size, rng)
+
+    newcomers = [
+        LiveTicket(f"n{i}", f"ns{i}", rng.randint(400, 2800))
+        for i in range(joins)
+    ]
+
+    start = time.perf_counter()
+    for ticket in newcomers:
+        matchmaker.add_to_queue(ticket)
+        match = matchmaker.find_match(ticket.player_id)
+        if match:
+            matchmaker.add_to_queue(match[1])  # keep the queue depth constant
+        else:
+            matchmaker.remove_by_sid(ticket.sid)
+    elapsed = time.perf_counter() - start
+    return elapsed / joins * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark EloMatchmaker join/match cost")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--joins", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(f"{'queued':>10}  {'us/join':>10}")
+    for size in args.sizes:
+        print(f"{size:>10}  {run(size, args.joins):>10.2f}")
@@ -0,0 +1,81 @@
+"""Per-image latency and peak memory of preprocess_image vs the original version.
+
+Usage (from /backend directory):
+    python benchmarks/bench_preprocess.py
+    python benchmarks/bench_preprocess.py --repeat 50
+
+Inputs are synthetic JPEG data-URLs at common webcam sizes. Peak memory is
+the tracemalloc high-water mark, i.e. Python-side buffers (base64 strings,
+decoded bytes, encoder output); PIL's pixel buffers are allocated outside
+tracemalloc and are smaller on the fast path by construction.
+"""
+
+import argparse
+import base64
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+# Allow running from the backend directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+# Importing model_service builds the classifier singleton; no calls are made
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-unused")
+
+from PIL import Image, ImageDraw
+
+from model_service.preprocess import preprocess_image
+
+
+def legacy_preprocess_image(base64_img: str) -> bytes:
+    """preprocess_image as it was before the JPEG fast path."""
+    if "," in base64_img:
+        base64_img = base64_img.split(",", 1)[1]
+
+    image_bytes = base64.b64decode(base64_img)
+
+    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=85)
+    return buf.getvalue()
+
+
+def make_data_url(width: int, height: int) -> str:
+    img = Image.new("RGB", (width, height), (196, 164, 132))
+    draw = ImageDraw.Draw(img)
+    for i in range(0, width, max(1, width // 16)):
+        draw.line((i, 0, width - i, height), fill=(i % 255, 80, 40), width=3)
+    draw.ellipse((width // 3, height // 4, width * 2 // 3, height * 3 // 4), fill=(120, 80, 60))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=85)
+    return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def measure(func, payload: str, repeat: int) -> tuple[float, float]:
+    """Return (mean ms per call, peak KiB traced during one call)."""
+    func(payload)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(payload)
+    mean_ms = (time.perf_counter() - start) / repeat * 1000
+
+    tracemalloc.start()
+    func(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return mean_ms, peak / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark preprocess_image")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    sizes = [(320, 240), (640, 480), (1280, 720), (1920, 1080)]
+    print(f"{'size':>10}  {'legacy ms':>10}  {'new ms':>8}  {'legacy KiB':>11}  {'new KiB':>8}")
+    for width, height in sizes:
+        payload = make_data_url(width, height)
+        old_ms, old_kib = measure(legacy_preprocess_image, payload, args.repeat)
+        new_ms, new_kib = measure(preprocess_image, payload, args.repeat)
+        print(f"{width}x{height:<5}  {old_ms:>10.2f}  {new_ms:>8.2f}  {old_kib:>11.0f}  {new_kib:>8.0f}")
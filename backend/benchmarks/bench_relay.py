@@ -0,0 +1,84 @@
+"""Dispatch cost of the video_frame relay handler.
+
+Usage (from /backend directory):
+    python benchmarks/bench_relay.py
+    python benchmarks/bench_relay.py --rooms 1000 --frames 50000
+
+Frames from both players of every room are fed straight into the
+registered relay_video_frame handler (peer lookup + mailbox post) with a
+no-op Socket.IO server. Only dispatch is timed; delivery happens later in
+the per-receiver sender tasks.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Allow running from the backend directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+# Importing model_service builds the classifier singleton; no calls are made
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-unused")
+
+from app.core.duel_engine import DuelEngine
+from app.core.state_backend import MemoryStateBackend
+from app.models.live_state import LiveTicket
+from app.services.webrtc_relay import setup_video_relay
+
+
+class _NullSio:
+    """Just enough of socketio.AsyncServer to register and call handlers."""
+
+    def __init__(self):
+        self.handlers = {}
+        # No engine.io sockets: VideoRelay finds no transport queue to pace on
+        self.manager = type("Manager", (), {"eio_sid_from_sid": staticmethod(lambda sid, namespace: None)})()
+        self.eio = type("Eio", (), {"sockets": {}})()
+
+    def on(self, event):
+        def register(handler):
+            self.handlers[event] = handler
+            return handler
+        return register
+
+    async def emit(self, event, data, to=None, **kwargs):
+        pass
+
+
+async def run(rooms: int, frames: int) -> float:
+    """Return mean microseconds per relayed video_frame."""
+    engine = DuelEngine(state=MemoryStateBackend(), ratings_store=None)
+    sio = _NullSio()
+    relay = setup_video_relay(sio, engine)
+    handler = sio.handlers["video_frame"]
+
+    frame = os.urandom(8_000)  # about a 320x240 q=0.5 JPEG
+    payloads = []
+    for i in range(rooms):
+        room = await engine.start_duel(LiveTicket(f"a{i}", f"sa{i}"), LiveTicket(f"b{i}", f"sb{i}"))
+        payloads.append((f"sa{i}", {"room_id": room.room_id, "frame": frame}))
+        payloads.append((f"sb{i}", {"room_id": room.room_id, "frame": frame}))
+
+    for sid, data in payloads:  # warm the peer cache and start the senders
+        await handler(sid, data)
+
+    start = time.perf_counter()
+    for k in range(frames):
+        sid, data = payloads[k % len(payloads)]
+        await handler(sid, data)
+    elapsed = time.perf_counter() - start
+
+    for sid, _ in payloads:
+        relay.forget_sid(sid)
+    await asyncio.sleep(0)
+    return elapsed / frames * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark video_frame relay dispatch")
+    parser.add_argument("--rooms", type=int, default=1_000)
+    parser.add_argument("--frames", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print(f"{args.rooms} rooms: {asyncio.run(run(args.rooms, args.frames)):.2f} us/frame")
@@ -0,0 +1,159 @@
+"""Per-room memory and start_round / handle_draw cost with many live rooms.
+
+Usage (from /backend directory):
+    python benchmarks/bench_rooms.py
+    python benchmarks/bench_rooms.py --rooms 50000 --ops 20000
+
+Rooms live in a MemoryStateBackend and go through DuelEngine. The
+"legacy" column is the previous representation behind the same dict
+load/save: a Pydantic DuelRoom carrying the since-removed round_results /
+detected_signs / ready_players fields, with scores in a dict copied on
+every event. Memory is the tracemalloc delta of building all rooms,
+divided by the room count.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# Allow running from the backend directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pydantic import BaseModel, Field
+
+from app.core.duel_engine import SIGNS, DuelEngine
+from app.core.state_backend import MemoryStateBackend
+from app.models.live_state import LiveTicket
+
+
+class LegacyDuelRoom(BaseModel):
+    """DuelRoom as it was before the slotted representation."""
+
+    room_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    player1_id: str
+    player2_id: str
+    player1_sid: str
+    player2_sid: str
+    status: str = "active"
+    scores: Dict[str, int] = Field(default_factory=dict)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    round_number: int = 1
+    target_sign: str = ""
+    round_results: Dict[str, Optional[bool]] = Field(default_factory=dict)
+    detected_signs: Dict[str, str] = Field(default_factory=dict)
+    ready_players: List[str] = Field(default_factory=list)
+
+
+class LegacyStore:
+    """Dict-backed load/save with the same bookkeeping as MemoryStateBackend."""
+
+    def __init__(self):
+        self.rooms: Dict[str, LegacyDuelRoom] = {}
+        self.sid_rooms: Dict[str, str] = {}
+
+    async def save_room(self, room: LegacyDuelRoom) -> None:
+        self.rooms[room.room_id] = room
+        self.sid_rooms[room.player1_sid] = room.room_id
+        self.sid_rooms[room.player2_sid] = room.room_id
+
+    async def load_room(self, room_id: str) -> Optional[LegacyDuelRoom]:
+        return self.rooms.get(room_id)
+
+
+async def legacy_start_round(store: LegacyStore, room_id: str) -> LegacyDuelRoom:
+    room = await store.load_room(room_id)
+    if room.target_sign:
+        room.round_number += 1
+    room.target_sign = random.choice(SIGNS)
+    await store.save_room(room)
+    return room
+
+
+async def legacy_handle_draw(store: LegacyStore, room_id: str, player_id: str) -> dict:
+    room = await store.load_room(room_id)
+    if player_id not in room.scores:
+        raise ValueError(player_id)
+    room.scores[player_id] += 1
+    await store.save_room(room)
+    return {"status": "round_won", "room_id": room_id, "round_winner_id": player_id, "scores": room.scores.copy()}
+
+
+def _players(i: int) -> tuple[str, str, str, str]:
+    return f"a{i}", f"b{i}", f"sa{i}", f"sb{i}"
+
+
+async def bench_legacy(rooms: int, ops: int, rng: random.Random) -> tuple[float, float, float]:
+    store = LegacyStore()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    room_ids = []
+    for i in range(rooms):
+        p1, p2, s1, s2 = _players(i)
+        room = LegacyDuelRoom(player1_id=p1, player2_id=p2, player1_sid=s1, player2_sid=s2, scores={p1: 0, p2: 0})
+        await store.save_room(room)
+        room_ids.append((room.room_id, p1))
+    per_room = (tracemalloc.get_traced_memory()[0] - before) / rooms
+    tracemalloc.stop()
+
+    picks = [rng.choice(room_ids) for _ in range(ops)]
+    start = time.perf_counter()
+    for room_id, _ in picks:
+        await legacy_start_round(store, room_id)
+    round_us = (time.perf_counter() - start) / ops * 1e6
+
+    start = time.perf_counter()
+    for room_id, player_id in picks:
+        await legacy_handle_draw(store, room_id, player_id)
+    draw_us = (time.perf_counter() - start) / ops * 1e6
+    return per_room, round_us, draw_us
+
+
+async def bench_live(rooms: int, ops: int, rng: random.Random) -> tuple[float, float, float]:
+    state = MemoryStateBackend()
+    # Scores never reach the finish line, so the ratings store is not touched
+    engine = DuelEngine(state=state, ratings_store=None, wins_to_finish=ops + 1)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    room_ids = []
+    for i in range(rooms):
+        p1, p2, s1, s2 = _players(i)
+        room = await engine.start_duel(LiveTicket(p1, s1), LiveTicket(p2, s2))
+        room_ids.append((room.room_id, p1))
+    per_room = (tracemalloc.get_traced_memory()[0] - before) / rooms
+    tracemalloc.stop()
+
+    picks = [rng.choice(room_ids) for _ in range(ops)]
+    start = time.perf_counter()
+    for room_id, _ in picks:
+        await engine.start_round(room_id)
+    round_us = (time.perf_counter() - start) / ops * 1e6
+
+    start = time.perf_counter()
+    for room_id, player_id in picks:
+        await engine.handle_draw(room_id, player_id, True)
+    draw_us = (time.perf_counter() - start) / ops * 1e6
+    return per_room, round_us, draw_us
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark live room state")
+    parser.add_argument("--rooms", type=int, default=50_000)
+    parser.add_argument("--ops", type=int, default=20_000)
+    args = parser.parse_args()
+
+    legacy = asyncio.run(bench_legacy(args.rooms, args.ops, random.Random(0)))
+    live = asyncio.run(bench_live(args.rooms, args.ops, random.Random(0)))
+
+    print(f"{args.rooms} rooms, {args.ops} ops")
+    print(f"{'':>18}  {'legacy':>10}  {'live':>10}")
+    for label, old, new in zip(("bytes/room", "start_round us", "handle_draw us"), legacy, live):
+        print(f"{label:>18}  {old:>10.2f}  {new:>10.2f}")
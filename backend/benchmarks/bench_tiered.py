@@ -0,0 +1,108 @@
+"""Tail latency of TieredClassifier routing, hedging and deadlines against fakes.
+
+Usage (from /backend directory):
+    python benchmarks/bench_tiered.py
+    python benchmarks/bench_tiered.py --calls 5000 --concurrency 128 --tail-prob 0.05
+
+Every scenario classifies the same number of images through FakeClassifier
+tiers with a long-tail latency distribution (mostly fast, occasionally a
+slow outlier) and some malformed replies:
+    strong        the strong tier alone, no hedging, no deadline
+    hedged        the strong tier, hedged at its p95
+    tiered        fast tier first, escalating low-confidence verdicts
+    tiered+hedge  tiered, both tiers hedged, with the deadline fallback
+Latencies are scaled down (default ~10x) so a run takes seconds.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Allow running from the backend directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+# Importing model_service builds the classifier singleton; no calls are made
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-unused")
+
+from model_service.fake_classifier import FakeClassifier
+from model_service.tiered import TieredClassifier
+
+_NO_DEADLINE_MS = 3_600_000
+
+
+def fast_tier(args: argparse.Namespace, seed: int) -> FakeClassifier:
+    return FakeClassifier(
+        latency_ms=args.fast_ms, jitter_ms=args.fast_ms / 3, accuracy=0.5, seed=seed,
+        tail_prob=args.tail_prob, tail_ms=args.tail_ms / 2, error_rate=args.error_rate,
+        low_confidence_rate=args.low_confidence_rate,
+    )
+
+
+def strong_tier(args: argparse.Namespace, seed: int) -> FakeClassifier:
+    return FakeClassifier(
+        latency_ms=args.strong_ms, jitter_ms=args.strong_ms / 3, accuracy=0.5, seed=seed,
+        tail_prob=args.tail_prob, tail_ms=args.tail_ms, error_rate=args.error_rate,
+    )
+
+
+def scenarios(args: argparse.Namespace) -> dict[str, TieredClassifier]:
+    return {
+        "strong": TieredClassifier([("strong", strong_tier(args, 1))], hedge_quantile=0, deadline_ms=_NO_DEADLINE_MS),
+        "hedged": TieredClassifier([("strong", strong_tier(args, 1))], deadline_ms=_NO_DEADLINE_MS),
+        "tiered": TieredClassifier(
+            [("fast", fast_tier(args, 2)), ("strong", strong_tier(args, 1))],
+            hedge_quantile=0, deadline_ms=_NO_DEADLINE_MS,
+        ),
+        "tiered+hedge": TieredClassifier(
+            [("fast", fast_tier(args, 2)), ("strong", strong_tier(args, 1))], deadline_ms=args.deadline_ms,
+        ),
+    }
+
+
+async def run(classifier: TieredClassifier, calls: int, concurrency: int) -> list[float]:
+    """Classify *calls* images, *concurrency* at a time; return sorted seconds per call."""
+    latencies = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with slots:
+            started = time.perf_counter()
+            await classifier.classify(b"", "A")
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return sorted(latencies)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"{'scenario':<14}  {'p50':>7}  {'p95':>7}  {'p99':>7}  {'max':>7}  "
+          f"{'extra req':>9}  {'escalated':>9}  {'fallback':>8}  {'errors':>6}")
+    for name, classifier in scenarios(args).items():
+        latencies = await run(classifier, args.calls, args.concurrency)
+        stats = classifier.stats()
+        tiers = stats["tiers"].values()
+        hedges = sum(tier["hedges"] for tier in tiers)
+        errors = sum(tier["errors"] for tier in tiers)
+        p50, p95, p99 = (percentile(latencies, p) * 1000 for p in (50, 95, 99))
+        print(f"{name:<14}  {p50:>5.0f}ms  {p95:>5.0f}ms  {p99:>5.0f}ms  {latencies[-1] * 1000:>5.0f}ms  "
+              f"{hedges / args.calls:>9.1%}  {stats['escalations'] / args.calls:>9.1%}  "
+              f"{stats['fallbacks']:>8}  {errors:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tiered/hedged classification against fakes")
+    parser.add_argument("--calls", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--fast-ms", type=float, default=30.0, help="fast tier mean latency")
+    parser.add_argument("--strong-ms", type=float, default=150.0, help="strong tier mean latency")
+    parser.add_argument("--tail-prob", type=float, default=0.03, help="share of slow outliers per tier")
+    parser.add_argument("--tail-ms", type=float, default=1_500.0, help="strong tier outlier latency")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="share of malformed replies")
+    parser.add_argument("--low-confidence-rate", type=float, default=0.3, help="fast tier verdicts to escalate")
+    parser.add_argument("--deadline-ms", type=float, default=800.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,215 @@
+"""Load generator: N virtual duelists against a running server.
+
+Usage (from /backend directory):
+    # server with the stub classifier (latency/accuracy configurable via env)
+    ASL_CLASSIFIER_BACKEND=fake ASL_FAKE_LATENCY_MS=150 uvicorn app.main:app
+
+    # streaming first-correct detection; DRAW! is 5s after round_start
+    ASL_STREAMING_DETECTION=1 ASL_STREAM_CLASSIFIER_BACKEND=fake uvicorn app.main:app
+    python benchmarks/loadtest.py --draw-delay 5
+
+    python benchmarks/loadtest.py --players 200 --duration 60
+    python benchmarks/loadtest.py --url http://localhost:8000 --players 2000 --ramp 20 --fps 5
+
+Each virtual player is a python-socketio AsyncClient that loops: enter
+the queue, wait for match_found, stream synthetic video_frames to its
+opponent, submit draw_made for every round_start, press ready after each
+round_result, and requeue after match_complete / room_closed.
+
+Reported latencies:
+    queue_to_match   enter_queue sent  -> match_found received
+    draw_to_result   draw_made sent    -> round_result / match_complete received
+                     (streamed rounds send no draw_made: timed from --draw-delay)
+    frame_relay      video_frame sent  -> the opponent receives it
+All players run in this process, so one monotonic clock times both ends.
+The relay forwards only room_id and frame, so each frame carries its send
+time in 8 bytes after the JPEG end marker, which decoders ignore.
+"""
+
+import argparse
+import asyncio
+import io
+import random
+import struct
+import time
+from collections import defaultdict
+
+import socketio
+from PIL import Image
+
+latencies: dict[str, list[float]] = defaultdict(list)  # metric -> seconds
+counters: dict[str, int] = defaultdict(int)
+
+_STAMP = struct.Struct("<d")  # perf_counter() at send, appended to each frame
+
+
+def synthetic_jpeg(rng: random.Random, width: int = 96, height: int = 72) -> bytes:
+    """A small noise JPEG; fresh noise per draw keeps the result cache cold."""
+    img = Image.frombytes("RGB", (width, height), rng.randbytes(width * height * 3))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=70)
+    return buf.getvalue()
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class VirtualPlayer:
+    def __init__(self, index: int, args: argparse.Namespace, frame: bytes, stop: asyncio.Event):
+        self._rng = random.Random(index)
+        self.player_id = f"load-{index}"
+        self.elo = 1000 + self._rng.randint(-args.elo_spread, args.elo_spread)
+        self._args = args
+        self._frame = frame
+        self._stop = stop
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._client = socketio.AsyncClient(reconnection=False)
+        self._room_id: str | None = None
+        for event in ("match_found", "round_start", "round_result", "match_complete", "room_closed",
+                      "queue_error", "classification_error"):
+            self._client.on(event, self._enqueue_handler(event))
+        self._client.on("video_frame", self._on_video_frame)
+
+    def _enqueue_handler(self, event: str):
+        async def handler(data):
+            await self._events.put((event, data))
+        return handler
+
+    async def _on_video_frame(self, data):
+        frame = data.get("frame")
+        if isinstance(frame, bytes) and len(frame) > _STAMP.size:
+            (sent_at,) = _STAMP.unpack_from(frame, len(frame) - _STAMP.size)
+            latencies["frame_relay"].append(time.perf_counter() - sent_at)
+        counters["frames_received"] += 1
+
+    async def _next(self, *wanted: str, timeout: float):
+        deadline = time.perf_counter() + timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            event, data = await asyncio.wait_for(self._events.get(), remaining)
+            if event in wanted:
+                return event, data
+            if event in ("queue_error", "classification_error"):
+                counters[event] += 1
+
+    async def _stream_frames(self) -> None:
+        interval = 1 / self._args.fps
+        while True:
+            await self._client.emit(
+                "video_frame", {"room_id": self._room_id, "frame": self._frame + _STAMP.pack(time.perf_counter())}
+            )
+            counters["frames_sent"] += 1
+            await asyncio.sleep(interval)
+
+    async def _play_match(self) -> None:
+        streamer = asyncio.create_task(self._stream_frames()) if self._args.fps > 0 else None
+        try:
+            while True:
+                event, data = await self._next("round_start", "room_closed", timeout=self._args.timeout)
+                if event == "room_closed":
+                    counters["rooms_closed"] += 1
+                    return
+                await asyncio.sleep(self._args.draw_delay)
+                sent = time.perf_counter()
+                if data.get("resolution") != "stream":
+                    await self._client.emit("draw_made", {
+                        "image": synthetic_jpeg(self._rng),
+                        "target_sign": data["target_sign"],
+                        "room_id": self._room_id,
+                        "player_id": self.player_id,
+                    })
+                    counters["draws_sent"] += 1
+                event, data = await self._next(
+                    "round_result", "match_complete", "room_closed", timeout=self._args.timeout
+                )
+                if event == "room_closed":
+                    counters["rooms_closed"] += 1
+                    return
+                latencies["draw_to_result"].append(time.perf_counter() - sent)
+                if event == "match_complete":
+                    counters["matches_completed"] += 1
+                    return
+                counters["rounds_completed"] += 1
+                await self._client.emit("player_ready", {"room_id": self._room_id, "player_id": self.player_id})
+        finally:
+            if streamer:
+                streamer.cancel()
+
+    async def run(self) -> None:
+        await self._client.connect(self._args.url, transports=["websocket"])
+        counters["connected"] += 1
+        try:
+            while not self._stop.is_set():
+                queued = time.perf_counter()
+                await self._client.emit("enter_queue", {"player_id": self.player_id, "elo": self.elo})
+                try:
+                    _, data = await self._next("match_found", timeout=self._args.timeout)
+                    latencies["queue_to_match"].append(time.perf_counter() - queued)
+                    counters["matches_found"] += 1
+                    self._room_id = data["room_id"]
+                    await self._play_match()
+                except asyncio.TimeoutError:
+                    counters["timeouts"] += 1
+                    await self._client.emit("leave_queue", {"player_id": self.player_id})
+        finally:
+            await self._client.disconnect()
+
+
+def report(elapsed: float) -> None:
+    print(f"\n{elapsed:.1f}s, {counters['connected']} players connected")
+    print(f"{'latency (ms)':>16}  {'count':>8}  {'p50':>8}  {'p95':>8}  {'p99':>8}")
+    for metric in ("queue_to_match", "draw_to_result", "frame_relay"):
+        values = sorted(latencies[metric])
+        p50, p95, p99 = (percentile(values, p) * 1000 for p in (50, 95, 99))
+        print(f"{metric:>16}  {len(values):>8}  {p50:>8.1f}  {p95:>8.1f}  {p99:>8.1f}")
+
+    print(f"\n{'throughput':>16}  {'total':>8}  {'per s':>8}")
+    for name in ("matches_found", "matches_completed", "rounds_completed", "draws_sent",
+                 "frames_sent", "frames_received"):
+        print(f"{name:>16}  {counters[name]:>8}  {counters[name] / elapsed:>8.1f}")
+
+    errors = {name: counters[name] for name in ("timeouts", "rooms_closed", "queue_error", "classification_error")}
+    print("\nerrors: " + ", ".join(f"{name}={count}" for name, count in errors.items()))
+
+
+async def main(args: argparse.Namespace) -> None:
+    stop = asyncio.Event()
+    frame = synthetic_jpeg(random.Random(0), 320, 240)
+    players = [VirtualPlayer(i, args, frame, stop) for i in range(args.players)]
+
+    started = time.perf_counter()
+    tasks = []
+    for player in players:
+        tasks.append(asyncio.create_task(player.run()))
+        if args.ramp:
+            await asyncio.sleep(args.ramp / args.players)
+
+    await asyncio.sleep(max(0.0, args.duration - (time.perf_counter() - started)))
+    stop.set()
+    elapsed = time.perf_counter() - started
+    for task in tasks:
+        task.cancel()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    failed = [r for r in results if isinstance(r, Exception) and not isinstance(r, asyncio.CancelledError)]
+    if failed:
+        print(f"{len(failed)} players failed, first: {failed[0]!r}")
+    report(elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate concurrent duelists against a running server")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds, including ramp-up")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds to spread connections over")
+    parser.add_argument("--fps", type=float, default=10.0, help="video frames per second per player (0 = off)")
+    parser.add_argument("--draw-delay", type=float, default=0.5, help="seconds from round_start to draw_made")
+    parser.add_argument("--elo-spread", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for any expected event")
+    asyncio.run(main(parser.parse_args()))
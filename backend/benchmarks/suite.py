@@ -0,0 +1,167 @@
+"""Run every backend microbenchmark; save a baseline or compare against one.
+
+Usage (from /backend directory):
+    python benchmarks/suite.py                       # run and print
+    python benchmarks/suite.py --save                # write benchmarks/baseline.json
+    python benchmarks/suite.py --compare             # exit 1 on >10% regressions
+    python benchmarks/suite.py --compare --threshold 0.2 --only preprocess
+    python benchmarks/suite.py --save my.json        # a baseline for this machine
+    python benchmarks/suite.py --compare my.json
+
+Cases come from the individual bench_*.py scripts, which stay runnable on
+their own. Every value is lower-is-better. Each group runs --rounds times
+and the best value per case is kept, to damp scheduler noise.
+
+benchmarks/baseline.json is the committed reference baseline; --save and
+--compare use it unless given a path. Baselines are only comparable on
+the same machine: the file records where it was made, and --compare
+warns on a mismatch. On another machine (or CI runner), save a baseline
+there from the base commit and compare against that path. Refresh the
+reference with --save when a change is meant to move the numbers.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+# Allow running from the backend directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import bench_elo
+import bench_matchmaker
+import bench_preprocess
+import bench_relay
+import bench_rooms
+from model_service.preprocess import preprocess_image
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def matchmaker_cases() -> dict[str, tuple[float, str]]:
+    return {
+        f"matchmaker.find_match[queue={size}]": (bench_matchmaker.run(size, 2_000), "us")
+        for size in (1_000, 10_000, 100_000)
+    }
+
+
+def duel_cases() -> dict[str, tuple[float, str]]:
+    rooms = 50_000
+    per_room, round_us, draw_us = asyncio.run(bench_rooms.bench_live(rooms, 20_000, random.Random(0)))
+    return {
+        f"duel.start_round[rooms={rooms}]": (round_us, "us"),
+        f"duel.handle_draw[rooms={rooms}]": (draw_us, "us"),
+        "duel.room_memory": (per_room, "bytes"),
+    }
+
+
+def preprocess_cases() -> dict[str, tuple[float, str]]:
+    cases = {}
+    for width, height in ((320, 240), (640, 480), (1280, 720), (1920, 1080)):
+        payload = bench_preprocess.make_data_url(width, height)
+        mean_ms, _ = bench_preprocess.measure(preprocess_image, payload, 20)
+        cases[f"preprocess_image[{width}x{height}]"] = (mean_ms * 1000, "us")
+    return cases
+
+
+def relay_cases() -> dict[str, tuple[float, str]]:
+    return {"relay.video_frame[rooms=1000]": (asyncio.run(bench_relay.run(1_000, 50_000)), "us")}
+
+
+def elo_cases() -> dict[str, tuple[float, str]]:
+    return {"elo.apply_match_result": (asyncio.run(bench_elo.run(500)), "us")}
+
+
+GROUPS = {
+    "matchmaker": matchmaker_cases,
+    "duel": duel_cases,
+    "preprocess": preprocess_cases,
+    "relay": relay_cases,
+    "elo": elo_cases,
+}
+
+
+def run_suite(rounds: int, only: list[str] | None) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    for group, cases in GROUPS.items():
+        if only and group not in only:
+            continue
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for name, (value, unit) in cases().items():
+                best = results.get(name)
+                if best is None or value < best["value"]:
+                    results[name] = {"value": value, "unit": unit}
+        print(f"  {group}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return results
+
+
+def machine() -> str:
+    return f"{platform.platform()} {platform.processor()} x{os.cpu_count()}".strip()
+
+
+def print_results(results: dict[str, dict]) -> None:
+    print(f"{'case':<42}  {'value':>12}")
+    for name, result in results.items():
+        print(f"{name:<42}  {result['value']:>12.2f} {result['unit']}")
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], threshold: float) -> list[str]:
+    """Print a comparison table and return the names of regressed cases."""
+    regressions = []
+    print(f"{'case':<42}  {'baseline':>12}  {'current':>12}  {'change':>8}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<42}  {'-':>12}  {result['value']:>12.2f}  {'new':>8}")
+            continue
+        change = (result["value"] - before["value"]) / before["value"] if before["value"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<42}  {before['value']:>12.2f}  {result['value']:>12.2f}  {change:>+8.1%}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backend microbenchmark suite")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, metavar="PATH", help="write results as baseline")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, metavar="PATH", help="compare with baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before flagging (0.10 = 10%%)")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--only", nargs="+", choices=list(GROUPS), help="run only these groups")
+    args = parser.parse_args()
+
+    results = run_suite(args.rounds, args.only)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"baseline: {baseline['meta']['created']} on {baseline['meta']['machine']}")
+        if baseline["meta"]["machine"] != machine():
+            print(f"warning: running on {machine()}; numbers may not be comparable", file=sys.stderr)
+        regressions = compare(results, baseline["results"], args.threshold)
+    else:
+        print_results(results)
+        regressions = []
+
+    if args.save:
+        meta = {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "machine": machine(),
+            "python": platform.python_version(),
+            "rounds": args.rounds,
+        }
+        with open(args.save, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"saved baseline to {args.save}")
+
+    if regressions:
+        print(f"{len(regressions)} regressions above {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,7 @@
+import os
+
+# Importing model_service builds the classifier singleton; tests never call it
+os.environ.setdefault("ASL_CLASSIFIER_BACKEND", "fake")
+
+# Manual scripts that need a running server or a Gemini key
+collect_ignore = ["test_matchmaking.py", "test_model_service.py"]
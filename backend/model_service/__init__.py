@@ -1,7 +1,23 @@
 # ASL Model Service package
+from .backend import ClassifierBackend, create_classifier
+from .batching import BatchingClassifier
+from .cache import CachedClassifier
 from .classifier import ASLClassifier
 from .preprocess import preprocess_image
+from .scheduler import ClassificationRejected, ClassificationScheduler
+from .tiered import TieredClassifier
 
-# Singleton classifier — imported and reused by the backend so the Gemini
-# client is only initialised once per process.
-classifier = ASLClassifier()
+# Singleton classifier — imported and reused by the backend so the model
+# client (Gemini) or worker pool (local) is only initialised once per process.
+# Pick the implementation with ASL_CLASSIFIER_BACKEND=gemini|local|fake|tiered.
+# Both draw_made and tutorial_classify go through the result cache (near-
+# duplicate hits for tutorial frames, exact per-player hits for duel draws);
+# cache misses can be micro-batched before reaching the backend (off unless
+# ASL_BATCH_MAX_SIZE > 1).
+# uncached_classifier is the same backend without the cache, for callers whose
+# images rarely repeat (StreamJudge samples of relayed video).
+uncached_classifier = BatchingClassifier(create_classifier())
+classifier = CachedClassifier(uncached_classifier)
+
+# Caps in-flight classifications and runs duel draws ahead of tutorial frames.
+scheduler = ClassificationScheduler()
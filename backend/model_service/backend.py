@@ -0,0 +1,62 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+
+
+class ClassifierBackend(ABC):
+    """Common interface for everything that can judge an ASL hand-sign image.
+
+    Implementations must return the same dict shape as ASLClassifier.classify
+    so the socket handlers never need to know which backend is serving them.
+    """
+
+    @abstractmethod
+    async def classify(self, image_bytes: bytes, target_sign: str) -> dict:
+        """Return {"matches": bool, "detected_sign": str, "confidence": float}."""
+
+    async def classify_batch(self, items: list[tuple[bytes, str]]) -> list[dict]:
+        """Classify several (image_bytes, target_sign) pairs, results in order.
+
+        Backends that can amortise work across images (one multi-image request,
+        one model forward pass) should override this.
+        """
+        return list(await asyncio.gather(*(self.classify(b, t) for b, t in items)))
+
+
+def create_classifier(name: str | None = None) -> ClassifierBackend:
+    """Build the classifier backend selected by *name* or ASL_CLASSIFIER_BACKEND.
+
+    Supported values:
+        gemini  remote gemini-2.5-pro call (default); "gemini:<model>" picks
+                another model, e.g. gemini:gemini-2.5-flash
+        local   on-CPU hand landmarks + letter model in a process pool
+                (needs requirements-local.txt and the model files)
+        fake    stub with configurable latency, for load tests
+        tiered  the backends in ASL_CLASSIFIER_TIERS, cheapest first, with
+                escalation on low confidence, hedging and a deadline
+    """
+    name = (name or os.environ.get("ASL_CLASSIFIER_BACKEND", "gemini")).strip().lower()
+    name, _, model = name.partition(":")
+
+    if name == "gemini":
+        from .classifier import ASLClassifier
+        return ASLClassifier(model or None)
+    if name == "local":
+        from .local_classifier import LocalASLClassifier
+        return LocalASLClassifier()
+    if name == "fake":
+        from .fake_classifier import FakeClassifier
+        return FakeClassifier()
+    if name == "tiered":
+        from .tiered import TieredClassifier
+        tiers = os.environ.get("ASL_CLASSIFIER_TIERS", "gemini:gemini-2.5-flash,gemini")
+        names = [tier.strip() for tier in tiers.split(",") if tier.strip()]
+        if not names or "tiered" in names:
+            raise ValueError(f"ASL_CLASSIFIER_TIERS must list other backends, got '{tiers}'")
+        # Labels for stats/metrics; repeated backends get their position appended
+        labels = [tier if names.count(tier) == 1 else f"{tier}#{i}" for i, tier in enumerate(names)]
+        return TieredClassifier([(label, create_classifier(tier)) for label, tier in zip(labels, names)])
+
+    raise ValueError(
+        f"Unknown ASL_CLASSIFIER_BACKEND '{name}'. Expected 'gemini', 'local', 'fake' or 'tiered'."
+    )
@@ -0,0 +1,111 @@
+import asyncio
+import os
+
+from .backend import ClassifierBackend
+
+
+class BatchingClassifier(ClassifierBackend):
+    """Micro-batching stage in front of another backend.
+
+    Requests arriving within *max_wait_ms* of the first queued one are sent
+    together through the backend's classify_batch (one multi-image Gemini
+    request, or one local-model pass), up to *max_batch_size* at a time.
+    Each caller still awaits its own result; a failed batch fails every
+    caller in it. Added latency is bounded by the window.
+
+    A caller cancelled before its batch is sent leaves the batch; a batch
+    already sent is cancelled once all of its callers are. Off by default
+    (batch size 1): a batch answers only when its slowest image does, so
+    turn it on where that is cheap, e.g. ASL_BATCH_MAX_SIZE=8 with the
+    local backend, whose batch is one forward pass.
+    """
+
+    def __init__(
+        self,
+        backend: ClassifierBackend,
+        max_batch_size: int | None = None,
+        max_wait_ms: float | None = None,
+    ):
+        self._backend = backend
+        self._max_batch_size = (
+            max_batch_size if max_batch_size is not None else int(os.environ.get("ASL_BATCH_MAX_SIZE", "1"))
+        )
+        self._max_wait = (
+            max_wait_ms if max_wait_ms is not None else float(os.environ.get("ASL_BATCH_WINDOW_MS", "15"))
+        ) / 1000
+        self._pending: list[tuple[bytes, str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    @property
+    def backend(self) -> ClassifierBackend:
+        return self._backend
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "queued": len(self._pending),
+        }
+
+    async def classify(self, image_bytes: bytes, target_sign: str) -> dict:
+        if self._max_batch_size <= 1:
+            return await self._backend.classify(image_bytes, target_sign)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry = (image_bytes, target_sign, future)
+        self._pending.append(entry)
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait, self._flush)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if entry in self._pending:  # not sent yet: nobody pays for this image
+                self._pending.remove(entry)
+                if not self._pending and self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            raise
+
+    async def classify_batch(self, items: list[tuple[bytes, str]]) -> list[dict]:
+        return await self._backend.classify_batch(items)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        def cancel_if_abandoned(_):
+            if all(future.cancelled() for _, _, future in batch):
+                task.cancel()
+
+        for _, _, future in batch:
+            future.add_done_callback(cancel_if_abandoned)
+
+    async def _run(self, batch: list[tuple[bytes, str, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self._backend.classify_batch([(b, t) for b, t, _ in batch])
+        except Exception as exc:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():  # caller may have given up
+                future.set_result(result)
@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import io
+import os
+import time
+from collections import OrderedDict
+
+from PIL import Image
+
+from .backend import ClassifierBackend
+
+
+def dhash(image_bytes: bytes, size: int = 8) -> int:
+    """64-bit difference hash of a JPEG: robust to re-encoding and small shifts.
+
+    Uses JPEG draft mode so the decoder only produces a tiny greyscale image.
+    """
+    img = Image.open(io.BytesIO(image_bytes))
+    img.draft("L", (size * 4, size * 4))
+    pixels = list(img.convert("L").resize((size + 1, size), Image.BILINEAR).getdata())
+    bits = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+def content_hash(image_bytes: bytes) -> int:
+    """64-bit digest of the exact bytes."""
+    return int.from_bytes(hashlib.blake2b(image_bytes, digest_size=8).digest(), "big")
+
+
+class CachedClassifier(ClassifierBackend):
+    """Result cache in front of another backend, keyed on (scope, target, hash).
+
+    Entries expire after *ttl_seconds*; past *max_entries* the least recently
+    used entry is evicted. Unscoped calls (tutorial frames) share entries
+    keyed on a perceptual hash: a frame within *max_distance* bits of a
+    cached frame for the same target counts as a near-duplicate hit. The
+    whole-frame hash barely sees the hand, so a call with a *scope* (a duel
+    player) only reuses a verdict for the very same bytes within that scope.
+    """
+
+    def __init__(
+        self,
+        backend: ClassifierBackend,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+        max_distance: int | None = None,
+    ):
+        self._backend = backend
+        self._max_entries = max_entries if max_entries is not None else int(os.environ.get("ASL_CACHE_SIZE", "1024"))
+        self._ttl = ttl_seconds if ttl_seconds is not None else float(os.environ.get("ASL_CACHE_TTL_SECONDS", "300"))
+        self._max_distance = (
+            max_distance if max_distance is not None else int(os.environ.get("ASL_CACHE_MAX_DISTANCE", "4"))
+        )
+        # (scope, target, hash) -> (expires_at, result), oldest use first
+        self._entries: OrderedDict[tuple[str, str, int], tuple[float, dict]] = OrderedDict()
+        self._by_target: dict[tuple[str, str], set[int]] = {}  # (scope, target) -> hashes cached for it
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def backend(self) -> ClassifierBackend:
+        return self._backend
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
+
+    def _drop(self, key: tuple[str, str, int]) -> None:
+        del self._entries[key]
+        hashes = self._by_target[key[:2]]
+        hashes.discard(key[2])
+        if not hashes:
+            del self._by_target[key[:2]]
+
+    def _lookup(self, scope: str, target: str, image_hash: int, now: float, max_distance: int) -> dict | None:
+        key = (scope, target, image_hash)
+        if key not in self._entries and max_distance > 0:
+            key = next(
+                (
+                    (scope, target, h)
+                    for h in self._by_target.get((scope, target), ())
+                    if (h ^ image_hash).bit_count() <= max_distance
+                ),
+                key,
+            )
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= now:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def _store(self, scope: str, target: str, image_hash: int, result: dict, now: float) -> None:
+        key = (scope, target, image_hash)
+        self._entries[key] = (now + self._ttl, result)
+        self._entries.move_to_end(key)
+        self._by_target.setdefault((scope, target), set()).add(image_hash)
+        while len(self._entries) > self._max_entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def classify(self, image_bytes: bytes, target_sign: str, scope: str | None = None) -> dict:
+        if self._max_entries <= 0:
+            return await self._backend.classify(image_bytes, target_sign)
+
+        target = target_sign.upper().strip()
+        if scope is None:
+            scope, max_distance = "", self._max_distance
+            image_hash = await asyncio.to_thread(dhash, image_bytes)
+        else:
+            max_distance = 0
+            image_hash = content_hash(image_bytes)
+
+        cached = self._lookup(scope, target, image_hash, time.monotonic(), max_distance)
+        if cached is not None:
+            self.hits += 1
+            return dict(cached)
+
+        self.misses += 1
+        result = await self._backend.classify(image_bytes, target_sign)
+        if not result.get("fallback"):  # a deadline miss is not a verdict worth keeping
+            self._store(scope, target, image_hash, dict(result), time.monotonic())
+        return result
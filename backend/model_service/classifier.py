@@ -1,11 +1,19 @@
 import asyncio
-import os
 import json
+import logging
+import os
 from google import genai
 from google.genai import types
 
+from .backend import ClassifierBackend
+
+logger = logging.getLogger(__name__)
+
 _MODEL_NAME = "gemini-2.5-pro"
 
+# Per-request HTTP timeout; a hung request fails instead of stalling a round
+_REQUEST_TIMEOUT_MS = int(os.environ.get("ASL_GEMINI_TIMEOUT_MS", "20000"))
+
 _PROMPT_TEMPLATE = """You are an ASL (American Sign Language) hand sign expert.
 
 Look at this image and determine whether the hand shown is making the ASL letter '{target}'.
@@ -20,20 +28,73 @@ Rules:
 - Do not give a correct classification if the hand sign looks like the letter, it MUST be valid ASL
 """
 
+_BATCH_PROMPT_TEMPLATE = """You are an ASL (American Sign Language) hand sign expert.
+
+You are given {count} images, numbered in the order they appear. For each image, determine whether the hand shown is making the ASL letter listed for it:
+{targets}
+
+Respond ONLY with a valid JSON array of exactly {count} objects, in image order, each in exactly this format (no markdown, no extra text):
+{{"matches": true_or_false, "detected_sign": "LETTER_OR_UNKNOWN", "confidence": 0.0_to_1.0}}
+
+Rules:
+- "matches" is true only if you are reasonably confident the sign shown is the letter listed for that image.
+- "detected_sign" is the single uppercase letter you think is being shown, or "UNKNOWN" if no clear hand sign is visible.
+- "confidence" is your confidence level between 0.0 and 1.0.
+- Judge every image independently of the others.
+- Do not give a correct classification if the hand sign looks like the letter, it MUST be valid ASL
+"""
+
 
-class ASLClassifier:
-    def __init__(self):
+def _parse_response(raw: str | None):
+    """Decode the model's JSON reply; ValueError (not a bare JSONDecodeError) if malformed."""
+    raw = (raw or "").strip()
+
+    # Strip accidental markdown fences
+    if raw.startswith("```"):
+        raw = raw.split("```")[1]
+        if raw.startswith("json"):
+            raw = raw[4:]
+        raw = raw.strip()
+
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Malformed classifier reply ({exc}): {raw[:200]!r}") from None
+
+
+def _normalise(result: dict) -> dict:
+    if not isinstance(result, dict):
+        raise ValueError(f"Malformed classifier reply: expected an object, got {result!r}")
+    try:
+        return {
+            "matches": bool(result.get("matches", False)),
+            "detected_sign": str(result.get("detected_sign", "UNKNOWN")).upper(),
+            "confidence": float(result.get("confidence", 0.0)),
+        }
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Malformed classifier reply ({exc}): {result!r}") from None
+
+
+class ASLClassifier(ClassifierBackend):
+    """Gemini judge; *model* defaults to ASL_GEMINI_MODEL or gemini-2.5-pro."""
+
+    def __init__(self, model: str | None = None):
         api_key = os.environ.get("GEMINI_API_KEY", "")
         if not api_key:
             raise EnvironmentError(
                 "GEMINI_API_KEY environment variable is not set. "
                 "Add it to your .env file."
             )
+        self._model = model or os.environ.get("ASL_GEMINI_MODEL", _MODEL_NAME)
         self._client = genai.Client(
             api_key=api_key,
-            http_options=types.HttpOptions(api_version="v1beta"),
+            http_options=types.HttpOptions(api_version="v1beta", timeout=_REQUEST_TIMEOUT_MS),
         )
 
+    @property
+    def model(self) -> str:
+        return self._model
+
     async def classify(self, image_bytes: bytes, target_sign: str) -> dict:
         """Validate whether *image_bytes* shows the ASL hand sign for *target_sign*.
 
@@ -47,28 +108,61 @@ class ASLClassifier:
         target = target_sign.upper().strip()
         prompt = _PROMPT_TEMPLATE.format(target=target)
 
-        # Run the blocking SDK call in a thread so it never blocks the event loop.
-        response = await asyncio.to_thread(
-            self._client.models.generate_content,
-            model=_MODEL_NAME,
+        # The SDK's async client: never blocks the event loop, and cancelling
+        # the caller (a hedge loser, a decided round) aborts the request.
+        response = await self._client.aio.models.generate_content(
+            model=self._model,
             contents=[
                 types.Part.from_bytes(data=image_bytes, mime_type="image/jpeg"),
                 prompt,
             ],
         )
-        raw = response.text.strip()
+        return _normalise(_parse_response(response.text))
 
-        # Strip accidental markdown fences
-        if raw.startswith("```"):
-            raw = raw.split("```")[1]
-            if raw.startswith("json"):
-                raw = raw[4:]
-            raw = raw.strip()
+    async def classify_batch(self, items: list[tuple[bytes, str]]) -> list[dict]:
+        """Classify several images in a single multi-image Gemini request.
 
-        result = json.loads(raw)
+        Images the reply does not account for (a malformed entry, or a reply
+        that is not one object per image) are retried with one request each,
+        so a bad reply does not fail every image in the batch.
+        """
+        if len(items) == 1:
+            return [await self.classify(*items[0])]
 
-        return {
-            "matches": bool(result.get("matches", False)),
-            "detected_sign": str(result.get("detected_sign", "UNKNOWN")).upper(),
-            "confidence": float(result.get("confidence", 0.0)),
-        }
+        targets = [target_sign.upper().strip() for _, target_sign in items]
+        contents = []
+        for number, (image_bytes, _) in enumerate(items, start=1):
+            contents.append(f"Image {number}:")
+            contents.append(types.Part.from_bytes(data=image_bytes, mime_type="image/jpeg"))
+        contents.append(
+            _BATCH_PROMPT_TEMPLATE.format(
+                count=len(items),
+                targets="\n".join(f"- Image {n}: '{t}'" for n, t in enumerate(targets, start=1)),
+            )
+        )
+
+        response = await self._client.aio.models.generate_content(
+            model=self._model,
+            contents=contents,
+        )
+        results: list[dict | None] = [None] * len(items)
+        try:
+            replies = _parse_response(response.text)
+        except ValueError as exc:
+            logger.warning(f"Batch reply unusable, classifying {len(items)} images one by one: {exc}")
+            replies = None
+        # Without one reply per image there is no telling which image a reply is for
+        if isinstance(replies, list) and len(replies) == len(items):
+            for position, reply in enumerate(replies):
+                try:
+                    results[position] = _normalise(reply)
+                except ValueError as exc:
+                    logger.warning(f"Batch reply for image {position + 1} malformed: {exc}")
+        elif replies is not None:
+            logger.warning(f"Expected {len(items)} results from Gemini, got: {str(replies)[:200]}")
+
+        missing = [position for position, result in enumerate(results) if result is None]
+        retried = await asyncio.gather(*(self.classify(*items[position]) for position in missing))
+        for position, result in zip(missing, retried):
+            results[position] = result
+        return results
@@ -0,0 +1,75 @@
+"""Stub classifier for load tests and local development without a model.
+
+Never looks at the image: waits a configurable latency, then reports a
+match with a configurable probability. Settings (env or constructor):
+    ASL_FAKE_LATENCY_MS            mean latency per call (default 150)
+    ASL_FAKE_JITTER_MS             uniform +/- jitter around the mean (default 50)
+    ASL_FAKE_ACCURACY              probability of {"matches": True} (default 0.5)
+    ASL_FAKE_TAIL_PROB             probability a call is a slow outlier (default 0)
+    ASL_FAKE_TAIL_MS               latency of such an outlier (default 2000)
+    ASL_FAKE_ERROR_RATE            probability of a malformed reply, raised as ValueError (default 0)
+    ASL_FAKE_LOW_CONFIDENCE_RATE   probability a verdict comes back at confidence 0.5 (default 0)
+"""
+
+import asyncio
+import os
+import random
+
+from .backend import ClassifierBackend
+
+_SIGNS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def _setting(value: float | None, env: str, default: str) -> float:
+    return value if value is not None else float(os.environ.get(env, default))
+
+
+class FakeClassifier(ClassifierBackend):
+    def __init__(
+        self,
+        latency_ms: float | None = None,
+        jitter_ms: float | None = None,
+        accuracy: float | None = None,
+        seed: int | None = None,
+        tail_prob: float | None = None,
+        tail_ms: float | None = None,
+        error_rate: float | None = None,
+        low_confidence_rate: float | None = None,
+    ):
+        self._latency = _setting(latency_ms, "ASL_FAKE_LATENCY_MS", "150") / 1000
+        self._jitter = _setting(jitter_ms, "ASL_FAKE_JITTER_MS", "50") / 1000
+        self._accuracy = _setting(accuracy, "ASL_FAKE_ACCURACY", "0.5")
+        self._tail_prob = _setting(tail_prob, "ASL_FAKE_TAIL_PROB", "0")
+        self._tail = _setting(tail_ms, "ASL_FAKE_TAIL_MS", "2000") / 1000
+        self._error_rate = _setting(error_rate, "ASL_FAKE_ERROR_RATE", "0")
+        self._low_confidence_rate = _setting(low_confidence_rate, "ASL_FAKE_LOW_CONFIDENCE_RATE", "0")
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    def _delay(self) -> float:
+        if self._tail_prob and self._rng.random() < self._tail_prob:
+            return self._tail
+        return max(0.0, self._latency + self._rng.uniform(-self._jitter, self._jitter))
+
+    def _verdict(self, target_sign: str) -> dict:
+        low = self._low_confidence_rate and self._rng.random() < self._low_confidence_rate
+        if self._rng.random() < self._accuracy:
+            return {"matches": True, "detected_sign": target_sign.upper(), "confidence": 0.5 if low else 0.95}
+        detected = self._rng.choice(_SIGNS.replace(target_sign.upper(), "") or _SIGNS)
+        return {"matches": False, "detected_sign": detected, "confidence": 0.5 if low else 0.6}
+
+    async def _round_trip(self) -> None:
+        await asyncio.sleep(self._delay())
+        if self._error_rate and self._rng.random() < self._error_rate:
+            raise ValueError("Malformed classifier reply (fake): ''")
+
+    async def classify(self, image_bytes: bytes, target_sign: str) -> dict:
+        self.calls += 1
+        await self._round_trip()
+        return self._verdict(target_sign)
+
+    async def classify_batch(self, items: list[tuple[bytes, str]]) -> list[dict]:
+        # One simulated round trip for the whole batch, like a real batched call
+        self.calls += len(items)
+        await self._round_trip()
+        return [self._verdict(target_sign) for _, target_sign in items]
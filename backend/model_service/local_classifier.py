@@ -0,0 +1,166 @@
+"""On-CPU ASL letter classifier.
+
+Pipeline per image:
+    JPEG → MediaPipe HandLandmarker (21 landmarks) → normalised feature
+    vector → small MLP → letter + softmax confidence
+
+Hand detection, the expensive part, runs in a process pool so the event
+loop and the GIL stay free; each image is its own pool task, so a batch
+spreads over every worker. The MLP is a couple of small matrix products
+and runs in this process, once per batch.
+
+Model files (both paths configurable via env):
+    ASL_HAND_LANDMARKER_PATH  MediaPipe hand_landmarker.task bundle
+    ASL_LOCAL_MODEL_PATH      .npz with W1, b1, W2, b2 and labels
+                              (produced by model_service/train_local.py)
+
+Neither file is shipped; see "Local classifier" in the README. numpy and
+mediapipe come from requirements-local.txt.
+"""
+
+import asyncio
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .backend import ClassifierBackend
+
+_MODEL_DIR = os.path.join(os.path.dirname(__file__), "models")
+_DEFAULT_LANDMARKER_PATH = os.path.join(_MODEL_DIR, "hand_landmarker.task")
+_DEFAULT_LETTER_MODEL_PATH = os.path.join(_MODEL_DIR, "asl_letters.npz")
+
+_NO_HAND = {"matches": False, "detected_sign": "UNKNOWN", "confidence": 0.0}
+
+# Per-worker state, populated once by _init_worker
+_landmarker = None
+
+
+def landmark_features(landmarks, is_left_hand: bool):
+    """Turn 21 MediaPipe landmarks into a translation/scale invariant vector.
+
+    Coordinates are taken relative to the wrist, left hands are mirrored onto
+    right hands, and everything is scaled by the largest wrist distance.
+    """
+    import numpy as np
+
+    points = np.array([[lm.x, lm.y, lm.z] for lm in landmarks], dtype=np.float32)
+    points -= points[0]
+    if is_left_hand:
+        points[:, 0] *= -1
+    scale = float(np.linalg.norm(points, axis=1).max()) or 1.0
+    return (points / scale).reshape(-1)
+
+
+def detect_landmarks(landmarker, image_bytes: bytes):
+    """Return (landmarks, is_left_hand) for the most prominent hand, or None."""
+    import mediapipe as mp
+    import numpy as np
+    from PIL import Image
+
+    rgb = np.asarray(Image.open(io.BytesIO(image_bytes)).convert("RGB"))
+    result = landmarker.detect(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb))
+    if not result.hand_landmarks:
+        return None
+    handedness = result.handedness[0][0].category_name if result.handedness else "Right"
+    return result.hand_landmarks[0], handedness == "Left"
+
+
+def _init_worker(landmarker_path: str) -> None:
+    global _landmarker
+    from mediapipe.tasks.python.vision import HandLandmarker
+
+    _landmarker = HandLandmarker.create_from_model_path(landmarker_path)
+
+
+def _features_in_worker(image_bytes: bytes):
+    """Feature vector of the most prominent hand, or None if there is none."""
+    detected = detect_landmarks(_landmarker, image_bytes)
+    return landmark_features(*detected) if detected is not None else None
+
+
+def _load_letter_model(model_path: str) -> dict:
+    import numpy as np
+
+    with np.load(model_path) as data:
+        return {key: data[key] for key in ("W1", "b1", "W2", "b2", "labels")}
+
+
+def _predict(model: dict, features) -> list[tuple[str, float]]:
+    """Run the MLP on a (n, 63) feature matrix in one forward pass."""
+    import numpy as np
+
+    hidden = np.maximum(features @ model["W1"] + model["b1"], 0.0)
+    logits = hidden @ model["W2"] + model["b2"]
+    probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+    probs /= probs.sum(axis=1, keepdims=True)
+    best = probs.argmax(axis=1)
+    return [
+        (str(model["labels"][index]).upper(), float(row[index]))
+        for index, row in zip(best, probs)
+    ]
+
+
+class LocalASLClassifier(ClassifierBackend):
+    def __init__(
+        self,
+        landmarker_path: str | None = None,
+        model_path: str | None = None,
+        workers: int | None = None,
+        min_confidence: float | None = None,
+    ):
+        landmarker_path = landmarker_path or os.environ.get(
+            "ASL_HAND_LANDMARKER_PATH", _DEFAULT_LANDMARKER_PATH
+        )
+        model_path = model_path or os.environ.get("ASL_LOCAL_MODEL_PATH", _DEFAULT_LETTER_MODEL_PATH)
+        for path in (landmarker_path, model_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(
+                    f"Local ASL classifier model file not found: {path}. "
+                    "Set ASL_HAND_LANDMARKER_PATH / ASL_LOCAL_MODEL_PATH."
+                )
+
+        if workers is None:
+            workers = int(os.environ.get("ASL_LOCAL_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+        if min_confidence is None:
+            min_confidence = float(os.environ.get("ASL_LOCAL_MIN_CONFIDENCE", "0.6"))
+
+        self._min_confidence = min_confidence
+        self._model = _load_letter_model(model_path)
+        # The landmarker is loaded once per worker process
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(landmarker_path,),
+        )
+
+    async def classify(self, image_bytes: bytes, target_sign: str) -> dict:
+        """Validate whether *image_bytes* shows the ASL hand sign for *target_sign*.
+
+        Same return shape as ASLClassifier.classify; "UNKNOWN" with confidence
+        0.0 when no hand is found.
+        """
+        return (await self.classify_batch([(image_bytes, target_sign)]))[0]
+
+    async def classify_batch(self, items: list[tuple[bytes, str]]) -> list[dict]:
+        """Detect hands on all workers at once, then one MLP pass for the batch."""
+        import numpy as np
+
+        loop = asyncio.get_running_loop()
+        features = await asyncio.gather(
+            *(loop.run_in_executor(self._pool, _features_in_worker, image_bytes) for image_bytes, _ in items)
+        )
+
+        results = [dict(_NO_HAND) for _ in items]
+        found = [position for position, vector in enumerate(features) if vector is not None]
+        if found:
+            predictions = _predict(self._model, np.stack([features[position] for position in found]))
+            for position, (letter, confidence) in zip(found, predictions):
+                results[position] = {
+                    "matches": letter == items[position][1].upper().strip() and confidence >= self._min_confidence,
+                    "detected_sign": letter,
+                    "confidence": confidence,
+                }
+        return results
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
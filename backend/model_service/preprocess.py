@@ -1,18 +1,135 @@
 import base64
-from PIL import Image
+import os
+from PIL import Image, ImageChops, ImageFilter
 import io
 
+_JPEG_MAGIC = b"\xff\xd8\xff"
 
-def preprocess_image(base64_img: str) -> bytes:
-    """Decode a base64 image string and return raw JPEG bytes for Gemini."""
-    # Strip data URI prefix if present (e.g. "data:image/jpeg;base64,...")
-    if "," in base64_img:
-        base64_img = base64_img.split(",", 1)[1]
 
-    image_bytes = base64.b64decode(base64_img)
+def _parse_size(value: str) -> tuple[int, int]:
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height or width)
+
+
+# Largest image sent to the classifier; anything bigger is downscaled.
+MAX_IMAGE_SIZE = _parse_size(os.environ.get("ASL_IMAGE_MAX_SIZE", "640x480"))
+
+# Optional hand-region crop: send only a padded square around the hand.
+HAND_CROP = os.environ.get("ASL_HAND_CROP", "0").lower() in ("1", "true", "yes")
+HAND_CROP_SIZE = int(os.environ.get("ASL_HAND_CROP_SIZE", "256"))
+
+# Skin detection runs on a thumbnail this wide; classic YCbCr skin ranges.
+_DETECT_WIDTH = 96
+_CB_LUT = [255 if 77 <= v <= 127 else 0 for v in range(256)]
+_CR_LUT = [255 if 133 <= v <= 173 else 0 for v in range(256)]
+# Skin coverage outside this fraction of the frame means the detector is
+# unreliable (no hand, or a skin-toned background) and we keep the full frame.
+_MIN_SKIN_FRACTION = 0.01
+_MAX_SKIN_FRACTION = 0.6
+
+
+def _decode_payload(payload: str | bytes) -> bytes:
+    """Return raw image bytes from a base64 string / data URI or raw bytes."""
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        if bytes(payload[:5]) != b"data:":
+            return bytes(payload)  # binary attachment, already raw image bytes
+        payload = bytes(payload).decode("ascii")
+
+    # Strip data URI prefix if present (e.g. "data:image/jpeg;base64,...").
+    # The prefix is short, so only look near the start, and slice once rather
+    # than split() into a list of two fresh strings.
+    comma = payload.find(",", 0, 256)
+    if comma != -1:
+        payload = payload[comma + 1:]
+    return base64.b64decode(payload)
+
+
+def find_hand_box(img: Image.Image, padding: float = 0.25) -> tuple[int, int, int, int] | None:
+    """Locate the hand with a cheap skin-colour mask and return a padded square box.
+
+    Returns None when the mask covers too little or too much of the frame.
+    Faces are skin too, so a sign held next to the face yields a box around
+    both; that still trims the background.
+    """
+    small = img.copy()
+    small.thumbnail((_DETECT_WIDTH, _DETECT_WIDTH))
+    _, cb, cr = small.convert("YCbCr").split()
+    mask = ImageChops.darker(cb.point(_CB_LUT), cr.point(_CR_LUT))
+    # Morphological opening drops isolated speckles before taking the bbox
+    mask = mask.filter(ImageFilter.MinFilter(3)).filter(ImageFilter.MaxFilter(3))
+
+    skin = mask.histogram()[255]
+    area = small.width * small.height
+    bbox = mask.getbbox()
+    if bbox is None or not (_MIN_SKIN_FRACTION * area <= skin <= _MAX_SKIN_FRACTION * area):
+        return None
+
+    scale_x, scale_y = img.width / small.width, img.height / small.height
+    left, top, right, bottom = bbox
+    cx, cy = (left + right) / 2 * scale_x, (top + bottom) / 2 * scale_y
+    side = max((right - left) * scale_x, (bottom - top) * scale_y) * (1 + 2 * padding)
+    side = min(side, img.width, img.height)
+
+    x0 = min(max(cx - side / 2, 0), img.width - side)
+    y0 = min(max(cy - side / 2, 0), img.height - side)
+    return round(x0), round(y0), round(x0 + side), round(y0 + side)
+
+
+def crop_hand_region(img: Image.Image, size: int | None = None) -> Image.Image | None:
+    """Return a *size*×*size* crop around the hand, or None to keep the full frame."""
+    box = find_hand_box(img)
+    if box is None:
+        return None
+    size = size or HAND_CROP_SIZE
+    return img.crop(box).resize((size, size), Image.BILINEAR)
+
+
+def preprocess_image(
+    base64_img: str | bytes,
+    max_size: tuple[int, int] | None = None,
+    crop_hand: bool | None = None,
+) -> bytes:
+    """Decode a base64 image string (or raw bytes) and return JPEG bytes for the classifier.
+
+    A JPEG that already fits within *max_size* (default MAX_IMAGE_SIZE) is
+    passed through untouched: only its header is parsed. Larger JPEGs are
+    decoded in draft mode, which lets libjpeg downscale by 1/2, 1/4 or 1/8
+    while decoding, then resized to fit. Other formats are converted.
+
+    With *crop_hand* (default ASL_HAND_CROP) only a fixed-size crop around
+    the detected hand is returned, falling back to the full frame when no
+    hand is found.
+    """
+    max_width, max_height = max_size or MAX_IMAGE_SIZE
+    crop_hand = HAND_CROP if crop_hand is None else crop_hand
+    image_bytes = _decode_payload(base64_img)
+
+    img = Image.open(io.BytesIO(image_bytes))  # lazy: reads the header only
+    is_jpeg = image_bytes[:3] == _JPEG_MAGIC and img.format == "JPEG"
+    fits = img.width <= max_width and img.height <= max_height
+    passthrough = is_jpeg and fits and img.mode in ("RGB", "L")
+    if passthrough and not crop_hand:
+        return image_bytes
+
+    if not fits:
+        # Target size keeping the aspect ratio; draft() never goes below it
+        scale = min(max_width / img.width, max_height / img.height)
+        target = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        if is_jpeg:
+            img.draft("RGB", target)
+        img = img.convert("RGB")
+        if img.size != target:
+            img = img.resize(target, Image.BILINEAR, reducing_gap=2.0)
+    else:
+        img = img.convert("RGB")
+
+    if crop_hand:
+        hand = crop_hand_region(img)
+        if hand is not None:
+            img = hand
+        elif passthrough:
+            return image_bytes
 
-    # Round-trip through PIL to normalise format → always return JPEG bytes
-    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
     buf = io.BytesIO()
     img.save(buf, format="JPEG", quality=85)
     return buf.getvalue()
@@ -0,0 +1,166 @@
+import asyncio
+import os
+import time
+from collections import deque
+
+# Lanes in priority order: a free slot always goes to the oldest waiter of the
+# highest lane first, so live duels are never stuck behind tutorial traffic.
+# "stream" holds StreamJudge samples of relayed frames: disposable, since a
+# newer frame follows shortly, hence the small queue and short deadline.
+LANES = ("duel", "stream", "tutorial")
+
+
+class ClassificationRejected(Exception):
+    """Raised when the scheduler sheds a request instead of running it.
+
+    *code* is a stable machine-readable reason sent to the client:
+        overloaded         the lane's wait queue is full
+        deadline_exceeded  the request could not finish before its deadline
+    """
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _known_lanes(settings: dict) -> dict:
+    unknown = set(settings) - set(LANES)
+    if unknown:
+        raise ValueError(f"Unknown classification lane(s): {', '.join(sorted(unknown))}")
+    return settings
+
+
+class _LaneStats:
+    __slots__ = ("admitted", "shed", "timed_out", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+
+class ClassificationScheduler:
+    """Concurrency cap, priority lanes and deadlines for classification work.
+
+    At most *max_concurrency* jobs run at once. Extra jobs wait in their
+    lane's FIFO; when a lane already holds its *max_queued* waiters, new
+    arrivals are rejected straight away. Every job has a deadline covering
+    both queueing and running time.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        max_queued: dict[str, int] | None = None,
+        deadlines: dict[str, float] | None = None,
+    ):
+        if max_concurrency is None:
+            max_concurrency = int(os.environ.get("ASL_MAX_CONCURRENT_CLASSIFICATIONS", "8"))
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        self._max_concurrency = max_concurrency
+        # Per-lane settings given here override the env defaults lane by lane
+        self._max_queued = {
+            "duel": int(os.environ.get("ASL_DUEL_MAX_QUEUED", "256")),
+            "stream": int(os.environ.get("ASL_STREAM_MAX_QUEUED", "64")),
+            "tutorial": int(os.environ.get("ASL_TUTORIAL_MAX_QUEUED", "32")),
+            **_known_lanes(max_queued or {}),
+        }
+        self._deadlines = {
+            "duel": float(os.environ.get("ASL_DUEL_DEADLINE_SECONDS", "15")),
+            "stream": float(os.environ.get("ASL_STREAM_DEADLINE_SECONDS", "2")),
+            "tutorial": float(os.environ.get("ASL_TUTORIAL_DEADLINE_SECONDS", "10")),
+            **_known_lanes(deadlines or {}),
+        }
+        self._active = 0
+        self._waiters: dict[str, deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._stats = {lane: _LaneStats() for lane in LANES}
+
+    def stats(self) -> dict:
+        return {
+            "active": self._active,
+            "max_concurrency": self._max_concurrency,
+            "lanes": {
+                lane: {
+                    "queued": len(self._waiters[lane]),
+                    "admitted": s.admitted,
+                    "shed": s.shed,
+                    "timed_out": s.timed_out,
+                    "mean_wait_ms": s.wait_total / s.admitted * 1000 if s.admitted else 0.0,
+                    "max_wait_ms": s.wait_max * 1000,
+                }
+                for lane, s in self._stats.items()
+            },
+        }
+
+    def _has_waiters(self) -> bool:
+        return any(self._waiters[lane] for lane in LANES)
+
+    async def _acquire(self, lane: str, timeout: float) -> None:
+        if self._active < self._max_concurrency and not self._has_waiters():
+            self._active += 1
+            return
+
+        stats = self._stats[lane]
+        waiters = self._waiters[lane]
+        if len(waiters) >= self._max_queued[lane]:
+            stats.shed += 1
+            raise ClassificationRejected("overloaded", "Classifier is overloaded, try again shortly")
+
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        try:
+            # _release hands its slot over by resolving the future
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                self._release()  # slot arrived as we timed out; pass it on
+            else:
+                waiters.remove(future)
+            stats.timed_out += 1
+            raise ClassificationRejected("deadline_exceeded", "Timed out waiting for the classifier")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()
+            elif future in waiters:
+                waiters.remove(future)
+            raise
+
+    def _release(self) -> None:
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters:
+                future = waiters.popleft()
+                if not future.done():
+                    future.set_result(None)  # slot transferred, _active unchanged
+                    return
+        self._active -= 1
+
+    async def run(self, lane: str, func, *args, deadline: float | None = None):
+        """Run ``await func(*args)`` in *lane* once a slot is free.
+
+        *deadline* is in seconds from now and defaults to the lane's deadline.
+        Raises ClassificationRejected when shed or out of time.
+        """
+        if lane not in self._waiters:
+            raise ValueError(f"Unknown classification lane '{lane}'")
+        budget = deadline if deadline is not None else self._deadlines[lane]
+        started = time.monotonic()
+
+        await self._acquire(lane, budget)
+        waited = time.monotonic() - started
+        stats = self._stats[lane]
+        stats.admitted += 1
+        stats.wait_total += waited
+        stats.wait_max = max(stats.wait_max, waited)
+
+        try:
+            return await asyncio.wait_for(func(*args), max(budget - waited, 0.0))
+        except asyncio.TimeoutError:
+            stats.timed_out += 1
+            raise ClassificationRejected("deadline_exceeded", "Classification did not finish in time")
+        finally:
+            self._release()
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+
+from .backend import ClassifierBackend
+
+logger = logging.getLogger(__name__)
+
+# Returned when no tier produced a verdict before the deadline
+FALLBACK_VERDICT = {"matches": False, "detected_sign": "UNKNOWN", "confidence": 0.0, "fallback": True}
+
+
+class _Tier:
+    """One backend plus its recent latencies (for the hedge delay) and counters."""
+
+    def __init__(self, name: str, backend: ClassifierBackend, window: int):
+        self.name = name
+        self.backend = backend
+        self.latencies: deque[float] = deque(maxlen=window)  # seconds, successful calls only
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def quantile(self, q: float) -> float:
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    async def timed_call(self, items: list[tuple[bytes, str]]) -> list[dict]:
+        started = time.monotonic()
+        results = await self.backend.classify_batch(items)
+        self.latencies.append(time.monotonic() - started)
+        return results
+
+
+class TieredClassifier(ClassifierBackend):
+    """Cheapest tier first, escalate on low confidence, hedge slow calls, never hang.
+
+    Every image goes to the first tier. Verdicts below *escalate_below*
+    confidence (and images whose tier failed) go on to the next tier, e.g.
+    local or gemini-2.5-flash, then gemini-2.5-pro. A later tier's verdict
+    replaces the earlier one.
+
+    A call still running after the tier's *hedge_quantile* latency (over
+    its last *latency_window* successful calls, once *hedge_min_samples*
+    are in) gets one identical backup request; the first to succeed wins
+    and the other is cancelled. At most one extra request per call, for
+    the slowest ~5%.
+
+    The whole call gets *deadline_ms*. When it runs out, images keep the
+    best verdict so far, or FALLBACK_VERDICT (no match, "fallback": True)
+    if no tier answered. Malformed replies count as tier failures.
+
+    Settings (env or constructor):
+        ASL_ESCALATE_BELOW         confidence below which to escalate (default 0.6)
+        ASL_CLASSIFY_DEADLINE_MS   budget for the whole call (default 8000)
+        ASL_HEDGE_QUANTILE         latency quantile that triggers a hedge (default 0.95, 0 = off)
+        ASL_HEDGE_MIN_SAMPLES      calls observed before hedging starts (default 20)
+    """
+
+    def __init__(
+        self,
+        tiers: list[tuple[str, ClassifierBackend]],
+        escalate_below: float | None = None,
+        deadline_ms: float | None = None,
+        hedge_quantile: float | None = None,
+        hedge_min_samples: int | None = None,
+        latency_window: int = 200,
+    ):
+        if not tiers:
+            raise ValueError("TieredClassifier needs at least one tier")
+        self._tiers = [_Tier(name, backend, latency_window) for name, backend in tiers]
+        self._escalate_below = (
+            escalate_below if escalate_below is not None else float(os.environ.get("ASL_ESCALATE_BELOW", "0.6"))
+        )
+        self._deadline = (
+            deadline_ms if deadline_ms is not None else float(os.environ.get("ASL_CLASSIFY_DEADLINE_MS", "8000"))
+        ) / 1000
+        self._hedge_quantile = (
+            hedge_quantile if hedge_quantile is not None else float(os.environ.get("ASL_HEDGE_QUANTILE", "0.95"))
+        )
+        self._hedge_min_samples = (
+            hedge_min_samples if hedge_min_samples is not None else int(os.environ.get("ASL_HEDGE_MIN_SAMPLES", "20"))
+        )
+        self.escalations = 0
+        self.fallbacks = 0
+
+    def stats(self) -> dict:
+        return {
+            "escalations": self.escalations,
+            "fallbacks": self.fallbacks,
+            "tiers": {
+                tier.name: {
+                    "calls": tier.calls,
+                    "errors": tier.errors,
+                    "timeouts": tier.timeouts,
+                    "hedges": tier.hedges,
+                    "hedge_wins": tier.hedge_wins,
+                    "hedge_after_ms": (self._hedge_delay(tier) or 0.0) * 1000,
+                }
+                for tier in self._tiers
+            },
+        }
+
+    def _hedge_delay(self, tier: _Tier) -> float | None:
+        if not self._hedge_quantile or len(tier.latencies) < self._hedge_min_samples:
+            return None
+        return tier.quantile(self._hedge_quantile)
+
+    async def _call_hedged(self, tier: _Tier, items: list[tuple[bytes, str]]) -> list[dict]:
+        tier.calls += 1
+        primary = asyncio.ensure_future(tier.timed_call(items))
+        tasks = {primary}
+        try:
+            delay = self._hedge_delay(tier)
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    tier.hedges += 1
+                    tasks.add(asyncio.ensure_future(tier.timed_call(items)))
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            tier.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def classify(self, image_bytes: bytes, target_sign: str) -> dict:
+        return (await self.classify_batch([(image_bytes, target_sign)]))[0]
+
+    async def classify_batch(self, items: list[tuple[bytes, str]]) -> list[dict]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._deadline
+        results: list[dict | None] = [None] * len(items)
+        todo = list(range(len(items)))
+
+        for number, tier in enumerate(self._tiers):
+            if number:
+                self.escalations += len(todo)
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                verdicts = await asyncio.wait_for(self._call_hedged(tier, [items[i] for i in todo]), remaining)
+            except asyncio.TimeoutError:
+                tier.timeouts += 1
+                logger.warning(f"Classifier tier {tier.name} missed the {self._deadline:.1f}s deadline")
+                break
+            except Exception as exc:
+                tier.errors += 1
+                logger.warning(f"Classifier tier {tier.name} failed: {exc}")
+                continue  # the next tier gets the same images
+            for i, verdict in zip(todo, verdicts):
+                results[i] = verdict
+            todo = [i for i in todo if results[i]["confidence"] < self._escalate_below]
+            if not todo:
+                break
+
+        missing = sum(result is None for result in results)
+        if missing:
+            self.fallbacks += missing
+            logger.warning(f"No classifier tier answered {missing} image(s) in time; using the fallback verdict")
+        return [result if result is not None else dict(FALLBACK_VERDICT) for result in results]
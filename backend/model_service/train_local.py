@@ -0,0 +1,81 @@
+"""Fit the small letter model used by LocalASLClassifier.
+
+Usage (from /backend directory):
+    python -m model_service.train_local --data path/to/letters --out model_service/models/asl_letters.npz
+
+The data directory holds one sub-directory per letter (A/, B/, ...) of
+hand-sign photos. Landmarks are extracted with the same MediaPipe pipeline the
+classifier uses at serving time, then a one-hidden-layer MLP is trained with
+plain full-batch gradient descent.
+"""
+
+import argparse
+import os
+
+import numpy as np
+from mediapipe.tasks.python.vision import HandLandmarker
+
+from .local_classifier import _DEFAULT_LANDMARKER_PATH, detect_landmarks, landmark_features
+
+
+def load_dataset(data_dir: str, landmarker) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    labels = sorted(d for d in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, d)))
+    features, targets = [], []
+    for index, label in enumerate(labels):
+        folder = os.path.join(data_dir, label)
+        for name in sorted(os.listdir(folder)):
+            with open(os.path.join(folder, name), "rb") as f:
+                detected = detect_landmarks(landmarker, f.read())
+            if detected is None:
+                continue
+            features.append(landmark_features(*detected))
+            targets.append(index)
+    return np.stack(features), np.array(targets), [label.upper() for label in labels]
+
+
+def train(x: np.ndarray, y: np.ndarray, classes: int, hidden: int, epochs: int, lr: float, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    W1 = rng.normal(0, np.sqrt(2 / x.shape[1]), (x.shape[1], hidden)).astype(np.float32)
+    b1 = np.zeros(hidden, dtype=np.float32)
+    W2 = rng.normal(0, np.sqrt(2 / hidden), (hidden, classes)).astype(np.float32)
+    b2 = np.zeros(classes, dtype=np.float32)
+    one_hot = np.eye(classes, dtype=np.float32)[y]
+
+    for epoch in range(epochs):
+        h = np.maximum(x @ W1 + b1, 0.0)
+        logits = h @ W2 + b2
+        probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+
+        grad_logits = (probs - one_hot) / len(x)
+        grad_h = (grad_logits @ W2.T) * (h > 0)
+        W2 -= lr * h.T @ grad_logits
+        b2 -= lr * grad_logits.sum(axis=0)
+        W1 -= lr * x.T @ grad_h
+        b1 -= lr * grad_h.sum(axis=0)
+
+        if epoch % 100 == 0:
+            loss = -np.log(probs[np.arange(len(y)), y] + 1e-9).mean()
+            accuracy = (probs.argmax(axis=1) == y).mean()
+            print(f"  epoch {epoch:5d}  loss={loss:.4f}  acc={accuracy:.3f}")
+
+    return {"W1": W1, "b1": b1, "W2": W2, "b2": b2}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the local ASL letter model")
+    parser.add_argument("--data", required=True, help="Directory with one sub-directory per letter")
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(__file__), "models", "asl_letters.npz"))
+    parser.add_argument("--landmarker", default=os.environ.get("ASL_HAND_LANDMARKER_PATH", _DEFAULT_LANDMARKER_PATH))
+    parser.add_argument("--hidden", type=int, default=64)
+    parser.add_argument("--epochs", type=int, default=2000)
+    parser.add_argument("--lr", type=float, default=0.5)
+    args = parser.parse_args()
+
+    x, y, labels = load_dataset(args.data, HandLandmarker.create_from_model_path(args.landmarker))
+    print(f"[INFO] {len(x)} samples across {len(labels)} letters")
+    weights = train(x, y, len(labels), args.hidden, args.epochs, args.lr)
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    np.savez(args.out, labels=np.array(labels), **weights)
+    print(f"[INFO] Saved model to {args.out}")
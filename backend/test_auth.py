@@ -0,0 +1,143 @@
+"""JWKSCache refresh behaviour and VerifiedTokenCache expiry.
+
+Usage (from /backend directory):
+    python -m pytest test_auth.py
+"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.auth import JWKSCache, TokenData, VerifiedTokenCache
+
+
+class StubJWKSCache(JWKSCache):
+    """Serves *key_sets* in turn instead of calling Auth0; counts fetches."""
+
+    def __init__(self, *key_sets: list, delay: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self._key_sets = list(key_sets)
+        self._delay = delay
+        self.fetches = 0
+
+    async def _fetch(self) -> dict:
+        self.fetches += 1
+        await asyncio.sleep(self._delay)
+        kids = self._key_sets[min(self.fetches, len(self._key_sets)) - 1]
+        self._jwks = {"keys": [{"kid": kid, "kty": "RSA"} for kid in kids]}
+        self._fetched_at = time.monotonic()
+        return self._jwks
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# ── JWKSCache ────────────────────────────────────────────────────────────────
+
+
+def test_concurrent_callers_share_one_refresh():
+    cache = StubJWKSCache(["k1"], delay=0.02)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_jwks() for _ in range(20)))
+
+    results = run(scenario())
+    assert cache.fetches == 1
+    assert all(jwks is results[0] for jwks in results)
+
+
+def test_jwks_is_refetched_after_ttl():
+    cache = StubJWKSCache(["k1"], ["k2"], ttl=0.05)
+
+    async def scenario():
+        await cache.get_jwks()
+        await cache.get_jwks()
+        assert cache.fetches == 1
+        await asyncio.sleep(0.06)
+        return await cache.get_jwks()
+
+    assert run(scenario())["keys"][0]["kid"] == "k2"
+    assert cache.fetches == 2
+
+
+def test_unknown_kid_refetches_for_key_rotation():
+    cache = StubJWKSCache(["k1"], ["k1", "k2"], min_refresh_interval=0.0)
+
+    async def scenario():
+        await cache.get_jwks()
+        return await cache.get_key("k2")
+
+    assert run(scenario())["kid"] == "k2"
+    assert cache.fetches == 2
+
+
+def test_unknown_kid_refetch_is_rate_limited():
+    cache = StubJWKSCache(["k1"], ["k1"], ["k1", "k2"], min_refresh_interval=0.05)
+
+    async def scenario():
+        await cache.get_jwks()
+        await asyncio.sleep(0.06)
+        with pytest.raises(HTTPException) as first:
+            await cache.get_key("bogus")  # allowed a refetch, still unknown
+        assert cache.fetches == 2
+        for _ in range(10):
+            with pytest.raises(HTTPException):
+                await cache.get_key("k2")  # fetched just now: no more refetches
+        assert cache.fetches == 2
+        await asyncio.sleep(0.06)
+        key = await cache.get_key("k2")
+        return first.value, key
+
+    error, key = run(scenario())
+    assert error.status_code == 401
+    assert key["kid"] == "k2"
+    assert cache.fetches == 3
+
+
+def test_known_kid_needs_no_refetch():
+    cache = StubJWKSCache(["k1"], min_refresh_interval=0.0)
+
+    async def scenario():
+        for _ in range(5):
+            await cache.get_key("k1")
+
+    run(scenario())
+    assert cache.fetches == 1
+
+
+# ── VerifiedTokenCache ───────────────────────────────────────────────────────
+
+
+def token_data(player_id: str) -> TokenData:
+    return TokenData(player_id=player_id, sub=player_id)
+
+
+def test_verified_token_is_served_until_exp():
+    cache = VerifiedTokenCache()
+    cache.put("token-a", token_data("alice"), expires_at=time.time() + 0.05)
+    assert cache.get("token-a").player_id == "alice"
+    assert cache.get("token-b") is None
+    time.sleep(0.06)
+    assert cache.get("token-a") is None
+    assert len(cache._entries) == 0  # dropped, not just skipped
+
+
+def test_token_already_past_exp_is_never_served():
+    cache = VerifiedTokenCache()
+    cache.put("token-a", token_data("alice"), expires_at=time.time())
+    assert cache.get("token-a") is None
+
+
+def test_verified_tokens_are_bounded_lru():
+    cache = VerifiedTokenCache(max_entries=2)
+    later = time.time() + 60
+    cache.put("token-a", token_data("alice"), later)
+    cache.put("token-b", token_data("bob"), later)
+    cache.get("token-a")  # alice is now the most recent
+    cache.put("token-c", token_data("carol"), later)
+    assert cache.get("token-b") is None
+    assert cache.get("token-a").player_id == "alice"
+    assert cache.get("token-c").player_id == "carol"
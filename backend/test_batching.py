@@ -0,0 +1,154 @@
+"""BatchingClassifier flushing, result routing and cancellation.
+
+Usage (from /backend directory):
+    python -m pytest test_batching.py
+"""
+
+import asyncio
+import time
+
+from model_service import BatchingClassifier, ClassifierBackend
+
+
+class RecordingBackend(ClassifierBackend):
+    """Echoes each image back as its verdict; records every batch it is sent."""
+
+    def __init__(self, delay: float = 0.0, error: Exception | None = None):
+        self.delay = delay
+        self.error = error
+        self.batches: list[list[tuple[bytes, str]]] = []
+        self.cancelled = 0
+
+    async def classify(self, image_bytes: bytes, target_sign: str) -> dict:
+        return (await self.classify_batch([(image_bytes, target_sign)]))[0]
+
+    async def classify_batch(self, items: list[tuple[bytes, str]]) -> list[dict]:
+        self.batches.append(items)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return [{"matches": True, "detected_sign": target, "image": image} for image, target in items]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_window_flush_sends_one_batch():
+    backend = RecordingBackend()
+    batching = BatchingClassifier(backend, max_batch_size=8, max_wait_ms=50)
+
+    async def scenario():
+        started = time.monotonic()
+        results = await asyncio.gather(batching.classify(b"one", "A"), batching.classify(b"two", "B"))
+        return results, time.monotonic() - started
+
+    results, elapsed = run(scenario())
+    assert backend.batches == [[(b"one", "A"), (b"two", "B")]]
+    assert elapsed >= 0.045  # waited out the window for more requests
+    assert batching.stats()["batches"] == 1
+
+
+def test_full_batch_flushes_without_waiting():
+    backend = RecordingBackend()
+    batching = BatchingClassifier(backend, max_batch_size=3, max_wait_ms=10_000)
+
+    async def scenario():
+        calls = [batching.classify(bytes([i]), "A") for i in range(4)]
+        done, pending = await asyncio.wait([asyncio.ensure_future(c) for c in calls], timeout=0.5)
+        for task in pending:
+            task.cancel()
+        return len(done)
+
+    assert run(scenario()) == 3
+    assert [len(batch) for batch in backend.batches] == [3]
+
+
+def test_results_go_to_their_own_callers():
+    backend = RecordingBackend(delay=0.01)
+    batching = BatchingClassifier(backend, max_batch_size=4, max_wait_ms=20)
+    requests = [(bytes([i]), sign) for i, sign in enumerate("ABCDEF")]
+
+    async def scenario():
+        return await asyncio.gather(*(batching.classify(image, sign) for image, sign in requests))
+
+    results = run(scenario())
+    assert [(r["image"], r["detected_sign"]) for r in results] == requests
+    assert [len(batch) for batch in backend.batches] == [4, 2]
+
+
+def test_failed_batch_fails_every_caller():
+    backend = RecordingBackend(error=ValueError("malformed reply"))
+    batching = BatchingClassifier(backend, max_batch_size=2, max_wait_ms=20)
+
+    async def scenario():
+        return await asyncio.gather(
+            batching.classify(b"one", "A"), batching.classify(b"two", "B"), return_exceptions=True
+        )
+
+    assert [type(r) for r in run(scenario())] == [ValueError, ValueError]
+
+
+def test_cancelled_caller_leaves_batch_before_dispatch():
+    backend = RecordingBackend()
+    batching = BatchingClassifier(backend, max_batch_size=8, max_wait_ms=50)
+
+    async def scenario():
+        keep = asyncio.ensure_future(batching.classify(b"keep", "A"))
+        drop = asyncio.ensure_future(batching.classify(b"drop", "B"))
+        await asyncio.sleep(0.01)
+        drop.cancel()
+        return await keep
+
+    assert run(scenario())["image"] == b"keep"
+    assert backend.batches == [[(b"keep", "A")]]
+
+
+def test_only_caller_cancelled_sends_nothing():
+    backend = RecordingBackend()
+    batching = BatchingClassifier(backend, max_batch_size=8, max_wait_ms=20)
+
+    async def scenario():
+        call = asyncio.ensure_future(batching.classify(b"drop", "A"))
+        await asyncio.sleep(0.005)
+        call.cancel()
+        await asyncio.sleep(0.05)  # past the window
+
+    run(scenario())
+    assert backend.batches == []
+
+
+def test_sent_batch_is_cancelled_once_all_callers_are():
+    backend = RecordingBackend(delay=1.0)
+    batching = BatchingClassifier(backend, max_batch_size=2, max_wait_ms=10)
+
+    async def scenario():
+        calls = [asyncio.ensure_future(batching.classify(bytes([i]), "A")) for i in range(2)]
+        await asyncio.sleep(0.05)  # batch is in flight
+        calls[0].cancel()
+        await asyncio.sleep(0.01)
+        assert backend.cancelled == 0  # one caller still waits for it
+        calls[1].cancel()
+        await asyncio.sleep(0.01)
+
+    run(scenario())
+    assert len(backend.batches) == 1
+    assert backend.cancelled == 1
+
+
+def test_batching_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("ASL_BATCH_MAX_SIZE", raising=False)
+    backend = RecordingBackend()
+    batching = BatchingClassifier(backend, max_wait_ms=10_000)
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(batching.classify(b"one", "A"), batching.classify(b"two", "B")), 0.5
+        )
+
+    run(scenario())
+    assert backend.batches == [[(b"one", "A")], [(b"two", "B")]]
@@ -0,0 +1,181 @@
+"""CachedClassifier near-duplicate hits, per-player scopes, LRU and TTL.
+
+Usage (from /backend directory):
+    python -m pytest test_cache.py
+"""
+
+import asyncio
+import io
+import time
+
+from PIL import Image, ImageDraw
+
+from model_service import CachedClassifier, ClassifierBackend
+from model_service.cache import dhash
+
+
+class CountingBackend(ClassifierBackend):
+    """Answers with a verdict numbered by call, so a cached one is recognisable."""
+
+    def __init__(self, fallback: bool = False):
+        self.calls = 0
+        self.fallback = fallback
+
+    async def classify(self, image_bytes: bytes, target_sign: str) -> dict:
+        self.calls += 1
+        verdict = {"matches": True, "detected_sign": target_sign, "confidence": 0.9, "call": self.calls}
+        if self.fallback:
+            verdict["fallback"] = True
+        return verdict
+
+
+def jpeg(shape: str, quality: int = 90) -> bytes:
+    """A 64x64 test frame: a light background with a dark shape."""
+    img = Image.new("L", (64, 64), 220)
+    draw = ImageDraw.Draw(img)
+    if shape == "fist":
+        draw.ellipse((16, 16, 48, 48), fill=30)
+    elif shape == "flat":
+        draw.rectangle((28, 4, 36, 60), fill=30)
+    else:
+        draw.polygon([(4, 60), (32, 4), (60, 60)], fill=30)
+    out = io.BytesIO()
+    img.convert("RGB").save(out, format="JPEG", quality=quality)
+    return out.getvalue()
+
+
+FIST = jpeg("fist")
+FIST_REENCODED = jpeg("fist", quality=60)  # other bytes, same picture
+FLAT = jpeg("flat")
+OTHER = jpeg("triangle")
+
+
+def distance(a: bytes, b: bytes) -> int:
+    return (dhash(a) ^ dhash(b)).bit_count()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_fixtures_have_the_intended_distances():
+    assert FIST != FIST_REENCODED
+    assert distance(FIST, FIST_REENCODED) <= 4
+    assert distance(FIST, FLAT) > 4
+    assert distance(FIST, OTHER) > 4
+
+
+def test_near_duplicate_hits_within_distance():
+    backend = CountingBackend()
+    cache = CachedClassifier(backend, max_entries=16, ttl_seconds=60, max_distance=4)
+
+    async def scenario():
+        first = await cache.classify(FIST, "A")
+        again = await cache.classify(FIST_REENCODED, "a ")  # target is normalised too
+        return first, again
+
+    first, again = run(scenario())
+    assert again == first
+    assert (backend.calls, cache.hits, cache.misses) == (1, 1, 1)
+
+
+def test_different_frame_or_target_misses():
+    backend = CountingBackend()
+    cache = CachedClassifier(backend, max_entries=16, ttl_seconds=60, max_distance=4)
+
+    async def scenario():
+        await cache.classify(FIST, "A")
+        await cache.classify(FLAT, "A")
+        await cache.classify(FIST, "B")
+
+    run(scenario())
+    assert (backend.calls, cache.hits) == (3, 0)
+
+
+def test_scoped_calls_hit_only_exact_bytes_of_the_same_player():
+    backend = CountingBackend()
+    cache = CachedClassifier(backend, max_entries=16, ttl_seconds=60, max_distance=4)
+
+    async def scenario():
+        alice = await cache.classify(FIST, "A", scope="alice")
+        alice_again = await cache.classify(FIST, "A", scope="alice")
+        bob = await cache.classify(FIST, "A", scope="bob")  # same bytes, other player
+        alice_near = await cache.classify(FIST_REENCODED, "A", scope="alice")  # near, not exact
+        return alice, alice_again, bob, alice_near
+
+    alice, alice_again, bob, alice_near = run(scenario())
+    assert alice_again == alice
+    assert bob["call"] != alice["call"]
+    assert alice_near["call"] not in (alice["call"], bob["call"])
+    assert (backend.calls, cache.hits) == (3, 1)
+
+
+def test_scoped_and_unscoped_entries_stay_apart():
+    backend = CountingBackend()
+    cache = CachedClassifier(backend, max_entries=16, ttl_seconds=60, max_distance=4)
+
+    async def scenario():
+        await cache.classify(FIST, "A")  # tutorial frame
+        await cache.classify(FIST, "A", scope="alice")
+        await cache.classify(FLAT, "A", scope="alice")
+        await cache.classify(FLAT, "A")
+
+    run(scenario())
+    assert (backend.calls, cache.hits) == (4, 0)
+
+
+def test_least_recently_used_entry_is_evicted():
+    backend = CountingBackend()
+    cache = CachedClassifier(backend, max_entries=2, ttl_seconds=60, max_distance=0)
+
+    async def scenario():
+        await cache.classify(FIST, "A")
+        await cache.classify(FLAT, "A")
+        await cache.classify(FIST, "A")  # hit: FIST is now the most recent
+        await cache.classify(OTHER, "A")  # evicts FLAT
+        await cache.classify(FIST, "A")
+        await cache.classify(FLAT, "A")
+
+    run(scenario())
+    assert cache.evictions == 2  # FLAT, then OTHER when FLAT came back
+    assert (backend.calls, cache.hits) == (4, 2)
+    assert cache.stats()["size"] == 2
+
+
+def test_entries_expire_after_ttl():
+    backend = CountingBackend()
+    cache = CachedClassifier(backend, max_entries=16, ttl_seconds=0.05, max_distance=4)
+
+    async def scenario():
+        await cache.classify(FIST, "A", scope="alice")
+        await cache.classify(FIST, "A", scope="alice")
+        await asyncio.sleep(0.06)
+        await cache.classify(FIST, "A", scope="alice")
+
+    run(scenario())
+    assert (backend.calls, cache.hits) == (2, 1)
+    assert cache.stats()["size"] == 1  # the expired entry was replaced, not kept
+
+
+def test_fallback_verdicts_are_not_cached():
+    backend = CountingBackend(fallback=True)
+    cache = CachedClassifier(backend, max_entries=16, ttl_seconds=60, max_distance=4)
+
+    async def scenario():
+        await cache.classify(FIST, "A")
+        await cache.classify(FIST, "A")
+
+    run(scenario())
+    assert (backend.calls, cache.hits, cache.stats()["size"]) == (2, 0, 0)
+
+
+def test_zero_size_disables_cache():
+    backend = CountingBackend()
+    cache = CachedClassifier(backend, max_entries=0, ttl_seconds=60, max_distance=4)
+
+    async def scenario():
+        await cache.classify(FIST, "A")
+        await cache.classify(FIST, "A")
+
+    run(scenario())
+    assert (backend.calls, cache.hits) == (2, 0)
@@ -0,0 +1,41 @@
+"""Objective of plan_pairs, the batch pairing in EloMatchmaker.
+
+Usage (from /backend directory):
+    python -m pytest test_elo_matchmaker.py
+"""
+
+from app.core.elo_matchmaker import plan_pairs
+
+
+def total_gap(elos, pairs):
+    return sum(elos[j] - elos[i] for i, j in pairs)
+
+
+def test_more_pairs_beat_a_smaller_total_gap():
+    elos = [0, 100, 120, 220]
+    pairs = plan_pairs(elos, [100] * 4)
+    # Minimising the gap alone would pick [(1, 2)] with a gap of 20
+    assert pairs == [(0, 1), (2, 3)]
+    assert total_gap(elos, pairs) == 200
+
+
+def test_smallest_gap_among_equally_many_pairs():
+    assert plan_pairs([0, 15, 20], [20] * 3) == [(1, 2)]
+    assert plan_pairs([0, 5, 20], [20] * 3) == [(0, 1)]
+
+
+def test_pair_fits_the_wider_range():
+    assert plan_pairs([1000, 1200], [50, 250]) == [(0, 1)]
+    assert plan_pairs([1000, 1200], [50, 150]) == []
+
+
+def test_only_neighbours_are_paired():
+    # (0, 120) + (100, 300) would make two pairs; only adjacent ones are tried
+    pairs = plan_pairs([0, 100, 120, 300], [300, 150, 150, 150])
+    assert len(pairs) == 1
+    assert all(j == i + 1 for i, j in pairs)
+
+
+def test_empty_and_single_queue():
+    assert plan_pairs([], []) == []
+    assert plan_pairs([1000], [150]) == []
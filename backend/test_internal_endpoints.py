@@ -0,0 +1,48 @@
+"""Operator endpoints stay off the public app unless enabled.
+
+Usage (from /backend directory):
+    python -m pytest test_internal_endpoints.py
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers.internal import internal_endpoints_enabled, router as internal_router
+
+INTERNAL_PATHS = ("/metrics", "/traces/rounds", "/traces/rounds/summary")
+
+
+def internal_client() -> TestClient:
+    internal_app = FastAPI()
+    internal_app.include_router(internal_router)
+    return TestClient(internal_app)
+
+
+def test_public_app_does_not_serve_internal_endpoints():
+    assert not internal_endpoints_enabled()
+    client = TestClient(app)
+    for path in INTERNAL_PATHS:
+        assert client.get(path).status_code == 404
+    assert client.get("/rankings").status_code == 200
+
+
+def test_enabled_by_env(monkeypatch):
+    monkeypatch.setenv("ASL_INTERNAL_ENDPOINTS", "true")
+    assert internal_endpoints_enabled()
+
+
+def test_open_without_a_token(monkeypatch):
+    monkeypatch.delenv("ASL_INTERNAL_TOKEN", raising=False)
+    client = internal_client()
+    for path in INTERNAL_PATHS:
+        assert client.get(path).status_code == 200
+
+
+def test_token_is_required_when_set(monkeypatch):
+    monkeypatch.setenv("ASL_INTERNAL_TOKEN", "s3cret")
+    client = internal_client()
+    for path in INTERNAL_PATHS:
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers={"Authorization": "Bearer wrong"}).status_code == 401
+        assert client.get(path, headers={"Authorization": "Bearer s3cret"}).status_code == 200
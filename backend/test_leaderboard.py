@@ -0,0 +1,115 @@
+"""Leaderboard ordering, rank lookups and pagination, in memory and on Redis.
+
+Usage (from /backend directory, the Redis cases need fakeredis and lupa):
+    python -m pytest test_leaderboard.py
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.leaderboard import MemoryLeaderboard, RedisLeaderboard
+from app.models.showdown_state import PlayerElo as PlayerStats
+
+
+@pytest.fixture(params=["memory", "redis"])
+def leaderboard(request):
+    if request.param == "memory":
+        return MemoryLeaderboard()
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisLeaderboard(client=fakeredis.FakeAsyncRedis(decode_responses=True))
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def stats(player_id: str, elo: int, wins: int = 0, losses: int = 0) -> PlayerStats:
+    return PlayerStats(player_id=player_id, elo=elo, wins=wins, losses=losses)
+
+
+PLAYERS = [
+    stats("dave", 1100, 3, 1),
+    stats("alice", 1300, 5, 2),
+    stats("carol", 1200, 4, 4),
+    stats("bob", 1200, 6, 1),  # same elo as carol, more wins
+    stats("erin", 1200, 4, 0),  # same elo and wins as carol: player_id decides
+]
+
+
+def test_rank_of(leaderboard):
+    async def scenario():
+        await leaderboard.load(PLAYERS)
+        assert await leaderboard.size() == 5
+        assert await leaderboard.rank_of("alice") == {
+            "rank": 1, "player_id": "alice", "elo": 1300, "wins": 5, "losses": 2,
+        }
+        assert (await leaderboard.rank_of("dave"))["rank"] == 5
+        assert await leaderboard.rank_of("nobody") is None
+
+    run(scenario())
+
+
+def test_ties_break_on_wins_then_player_id(leaderboard):
+    async def scenario():
+        await leaderboard.load(PLAYERS)
+        return [entry["player_id"] for entry in await leaderboard.top()]
+
+    assert run(scenario()) == ["alice", "bob", "carol", "erin", "dave"]
+
+
+def test_pagination(leaderboard):
+    async def scenario():
+        await leaderboard.load(PLAYERS)
+        first = await leaderboard.top(0, 2)
+        second = await leaderboard.top(2, 2)
+        last = await leaderboard.top(4, 2)
+        past_end = await leaderboard.top(10, 2)
+        return first, second, last, past_end
+
+    first, second, last, past_end = run(scenario())
+    assert [(e["rank"], e["player_id"]) for e in first] == [(1, "alice"), (2, "bob")]
+    assert [(e["rank"], e["player_id"]) for e in second] == [(3, "carol"), (4, "erin")]
+    assert [(e["rank"], e["player_id"]) for e in last] == [(5, "dave")]
+    assert past_end == []
+
+
+def test_update_moves_player(leaderboard):
+    async def scenario():
+        await leaderboard.load(PLAYERS)
+        await leaderboard.update(stats("dave", 1350, 4, 1))
+        await leaderboard.update(stats("frank", 1000, 0, 1))
+        return await leaderboard.rank_of("dave"), await leaderboard.rank_of("alice"), await leaderboard.size()
+
+    dave, alice, size = run(scenario())
+    assert (dave["rank"], dave["elo"], dave["wins"]) == (1, 1350, 4)
+    assert alice["rank"] == 2
+    assert size == 6
+
+
+def test_load_replaces_entries(leaderboard):
+    async def scenario():
+        await leaderboard.load(PLAYERS)
+        await leaderboard.load([stats("zoe", 900)])
+        return await leaderboard.size(), await leaderboard.rank_of("alice"), await leaderboard.top()
+
+    size, alice, entries = run(scenario())
+    assert size == 1
+    assert alice is None
+    assert [e["player_id"] for e in entries] == ["zoe"]
+
+
+def test_redis_workers_share_rankings():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    worker1 = RedisLeaderboard(client=fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+    worker2 = RedisLeaderboard(client=fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+
+    async def scenario():
+        await worker1.load(PLAYERS)
+        await worker2.update(stats("dave", 1400, 4, 1))  # a match finished on the other worker
+        return await worker1.rank_of("dave"), await worker1.top(0, 1)
+
+    dave, top = run(scenario())
+    assert dave["rank"] == 1
+    assert top[0]["player_id"] == "dave"
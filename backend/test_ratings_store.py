@@ -0,0 +1,171 @@
+"""RatingsStore match recording and write-behind sync, with a stub Auth0.
+
+Usage (from /backend directory):
+    python -m pytest test_ratings_store.py
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.duel_engine import DuelEngine
+from app.core.leaderboard import MemoryLeaderboard
+from app.core.state_backend import MemoryStateBackend
+from app.models.showdown_state import PlayerElo as PlayerStats
+from app.services.ratings_store import DEFAULT_ELO, RatingsStore
+
+
+class StubAuth0:
+    """Remote stats per player; reads and writes fail while *up* is False."""
+
+    def __init__(self, remote: dict[str, PlayerStats] | None = None):
+        self.remote = remote or {}
+        self.up = True
+        self.pushes: list[PlayerStats] = []
+
+    async def get_user_stats(self, player_id: str) -> PlayerStats:
+        if not self.up:
+            raise ConnectionError("Auth0 unreachable")
+        return self.remote.get(player_id, PlayerStats(player_id=player_id, elo=DEFAULT_ELO))
+
+    async def update_user_stats(self, player_id: str, stats: PlayerStats) -> None:
+        if not self.up:
+            raise ConnectionError("Auth0 unreachable")
+        self.pushes.append(stats)
+        self.remote[player_id] = stats
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path}/ratings.db"
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def make_store(auth0, database_url, **kwargs) -> RatingsStore:
+    return RatingsStore(auth0, database_url=database_url, flush_interval=1, **kwargs)
+
+
+def test_concurrent_matches_on_two_workers_are_not_lost(database_url):
+    auth0 = StubAuth0()
+    # Two stores on one database, as two workers would be
+    engines = [DuelEngine(MemoryStateBackend(), make_store(auth0, database_url)) for _ in range(2)]
+
+    async def scenario():
+        await asyncio.gather(*(engine._apply_match_result("a", "b") for engine in engines for _ in range(20)))
+        store = engines[0]._ratings_store
+        return await store.get_stats("a"), await store.get_stats("b")
+
+    a, b = run(scenario())
+    assert (a.wins, b.losses) == (40, 40)
+    assert a.elo + b.elo == 2 * DEFAULT_ELO  # every update moved both ratings by the same amount
+
+
+def test_flush_coalesces_matches_into_one_push_per_player(database_url):
+    auth0 = StubAuth0()
+    store = make_store(auth0, database_url)
+    engine = DuelEngine(MemoryStateBackend(), store)
+
+    async def scenario():
+        for _ in range(3):
+            await engine._apply_match_result("a", "b")
+        assert store.pending_sync() == 2
+        pushed = await store.flush()
+        return pushed, await store.get_stats("a")
+
+    pushed, a = run(scenario())
+    assert pushed == 2
+    assert sorted(stats.player_id for stats in auth0.pushes) == ["a", "b"]
+    assert auth0.remote["a"].wins == 3 and auth0.remote["a"].elo == a.elo
+    assert store.pending_sync() == 0
+
+
+def test_failed_push_backs_off_then_retries(database_url):
+    auth0 = StubAuth0()
+    store = make_store(auth0, database_url, max_backoff=300)
+    engine = DuelEngine(MemoryStateBackend(), store)
+
+    async def scenario():
+        await engine._apply_match_result("a", "b")
+        auth0.up = False
+
+        assert await store.flush() == 0
+        first_delay = store._retry_at["a"] - time.monotonic()
+        assert await store.flush() == 0  # not due yet: nothing attempted
+        assert store._failures["a"] == 1
+
+        store._retry_at = {player_id: 0.0 for player_id in store._retry_at}  # make them due
+        assert await store.flush() == 0
+        second_delay = store._retry_at["a"] - time.monotonic()
+
+        auth0.up = True
+        store._retry_at = {player_id: 0.0 for player_id in store._retry_at}
+        return first_delay, second_delay, await store.flush()
+
+    first_delay, second_delay, pushed = run(scenario())
+    assert 1.5 < first_delay <= 2  # flush_interval * 2^1
+    assert 3.5 < second_delay <= 4  # doubled
+    assert pushed == 2
+    assert store.pending_sync() == 0
+    assert not store._failures and not store._retry_at
+
+
+def test_dirty_players_survive_restart(database_url):
+    auth0 = StubAuth0()
+
+    async def scenario():
+        store = make_store(auth0, database_url)
+        await DuelEngine(MemoryStateBackend(), store)._apply_match_result("a", "b")
+        return make_store(auth0, database_url).pending_sync()
+
+    assert run(scenario()) == 2
+
+
+def test_provisional_player_is_rebased_onto_auth0_stats(database_url):
+    auth0 = StubAuth0({"a": PlayerStats(player_id="a", elo=1500, wins=10, losses=2)})
+    leaderboard = MemoryLeaderboard()
+    store = make_store(auth0, database_url, leaderboard=leaderboard)
+    engine = DuelEngine(MemoryStateBackend(), store, leaderboard)
+
+    async def scenario():
+        auth0.up = False  # both players are seeded with provisional defaults
+        winner, _ = await engine._apply_match_result("a", "b")
+        auth0.up = True
+        await store.flush()
+        return winner, await store.get_stats("a"), await leaderboard.rank_of("a")
+
+    winner, a, ranked = run(scenario())
+    gained = winner.elo - DEFAULT_ELO
+    # Local changes on top of the remote stats, not the defaults
+    assert (a.elo, a.wins, a.losses) == (1500 + gained, 11, 2)
+    assert auth0.remote["a"] == a
+    assert (ranked["elo"], ranked["wins"]) == (a.elo, 11)
+
+    async def later_match():
+        await engine._apply_match_result("a", "b")
+        await store.flush()
+        return await store.get_stats("a")
+
+    a = run(later_match())
+    assert a.wins == 12  # rebased once only
+    assert auth0.remote["a"].wins == 12
+
+
+def test_failed_record_reports_stored_stats(database_url):
+    auth0 = StubAuth0()
+    store = make_store(auth0, database_url)
+    engine = DuelEngine(MemoryStateBackend(), store)
+
+    async def broken(*_):
+        raise RuntimeError("database down")
+
+    async def scenario():
+        await engine._apply_match_result("a", "b")
+        store.record_match = broken
+        return await engine._apply_match_result("a", "b")
+
+    winner, loser = run(scenario())
+    assert (winner.wins, loser.losses, winner.elo_delta) == (1, 1, 0)
@@ -0,0 +1,144 @@
+"""RoomReaper disconnect handling and TTL sweeps.
+
+Runs against MemoryStateBackend and RedisStateBackend on fakeredis.
+
+Usage (from /backend directory, needs pytest, fakeredis and lupa):
+    python -m pytest test_room_reaper.py
+"""
+
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from app.core.room_reaper import RoomReaper
+from app.core.state_backend import MemoryStateBackend, RedisStateBackend
+from app.models.live_state import LiveRoom
+
+
+class RecordingSio:
+    """Stands in for the Socket.IO server; records emits and closed rooms."""
+
+    def __init__(self):
+        self.emitted = []
+        self.closed = []
+
+    async def emit(self, event, data, room=None, skip_sid=None):
+        self.emitted.append((event, data, room, skip_sid))
+
+    async def close_room(self, room):
+        self.closed.append(room)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def state(request):
+    if request.param == "memory":
+        return MemoryStateBackend()
+    return RedisStateBackend(client=fakeredis.FakeAsyncRedis(decode_responses=True))
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def room(name: str) -> LiveRoom:
+    return LiveRoom(f"{name}-p1", f"{name}-p2", f"{name}-sid1", f"{name}-sid2", room_id=name)
+
+
+def reaper_for(state, **ttls) -> tuple[RoomReaper, RecordingSio]:
+    sio = RecordingSio()
+    settings = {"idle_ttl": 60.0, "abandoned_ttl": 60.0, "sweep_interval": 60.0, **ttls}
+    return RoomReaper(sio, state, **settings), sio
+
+
+def test_disconnect_abandons_room_and_tells_opponent(state):
+    reaper, sio = reaper_for(state)
+
+    async def scenario():
+        await state.save_room(room("r1"))
+        await reaper.handle_disconnect("r1-sid1")
+        return await state.load_room("r1")
+
+    assert run(scenario()).status == "abandoned"
+    assert sio.emitted == [("room_closed", {"room_id": "r1", "reason": "opponent_left"}, "r1", "r1-sid1")]
+
+
+def test_disconnect_outside_an_active_room_is_ignored(state):
+    reaper, sio = reaper_for(state)
+
+    async def scenario():
+        await reaper.handle_disconnect("nobody")
+        await state.save_room(room("r1"))
+        await reaper.handle_disconnect("r1-sid1")
+        await reaper.handle_disconnect("r1-sid2")  # already abandoned: no second notice
+
+    run(scenario())
+    assert len(sio.emitted) == 1
+
+
+def test_sweep_keeps_fresh_rooms(state):
+    reaper, sio = reaper_for(state)
+
+    async def scenario():
+        await state.save_room(room("r1"))
+        return await reaper.sweep()
+
+    assert run(scenario()) == 0
+    assert sio.emitted == [] and sio.closed == []
+    assert reaper.metrics["live_rooms"] == 1
+
+
+def test_abandoned_room_is_reaped_after_its_ttl(state):
+    reaper, sio = reaper_for(state, idle_ttl=60.0, abandoned_ttl=0.05)
+
+    async def scenario():
+        await state.save_room(room("left"))
+        await state.save_room(room("playing"))
+        await reaper.handle_disconnect("left-sid1")
+        assert await reaper.sweep() == 0  # in-flight work still gets its grace period
+        await asyncio.sleep(0.06)
+        reaped = await reaper.sweep()
+        return reaped, await state.load_room("left"), await state.room_for_sid("left-sid2")
+
+    reaped, left, sid_room = run(scenario())
+    assert reaped == 1
+    assert left is None and sid_room is None
+    assert sio.closed == ["left"]
+    assert len(sio.emitted) == 1  # only the disconnect notice, no idle notice
+    assert reaper.metrics["live_rooms"] == 1
+    assert reaper.metrics["rooms_reaped_total"] == 1
+    assert reaper.metrics["reclaimed_bytes_total"] > 0
+
+
+def test_idle_room_is_closed_and_reaped(state):
+    reaper, sio = reaper_for(state, idle_ttl=0.05, abandoned_ttl=60.0)
+
+    async def scenario():
+        await state.save_room(room("idle"))
+        await asyncio.sleep(0.06)
+        await state.save_room(room("busy"))  # saved just now
+        reaped = await reaper.sweep()
+        return reaped, await state.load_room("idle"), await state.load_room("busy")
+
+    reaped, idle, busy = run(scenario())
+    assert reaped == 1
+    assert idle is None and busy is not None
+    assert sio.emitted == [("room_closed", {"room_id": "idle", "reason": "idle"}, "idle", None)]
+    assert sio.closed == ["idle"]
+    assert reaper.metrics["stale_rooms"] == 1
+
+
+def test_saving_a_room_resets_its_idle_clock(state):
+    reaper, _ = reaper_for(state, idle_ttl=0.1)
+
+    async def scenario():
+        r = room("r1")
+        await state.save_room(r)
+        await asyncio.sleep(0.06)
+        await state.save_room(r)  # a round was played
+        await asyncio.sleep(0.06)
+        return await reaper.sweep()
+
+    assert run(scenario()) == 0
@@ -0,0 +1,153 @@
+"""ClassificationScheduler shedding, lane priority and deadlines.
+
+Usage (from /backend directory):
+    python -m pytest test_scheduler.py
+"""
+
+import asyncio
+
+import pytest
+
+from model_service.scheduler import ClassificationRejected, ClassificationScheduler
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def hold(gate: asyncio.Event, value=None):
+    await gate.wait()
+    return value
+
+
+async def settle():
+    """Let freshly created tasks reach their first await."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_explicit_settings_are_kept_and_merged_over_defaults():
+    scheduler = ClassificationScheduler(max_concurrency=3, max_queued={"duel": 4}, deadlines={"stream": 0.5})
+    stats = scheduler.stats()
+    assert stats["max_concurrency"] == 3
+    assert scheduler._max_queued["duel"] == 4
+    assert set(scheduler._max_queued) == {"duel", "stream", "tutorial"}
+    assert scheduler._deadlines["stream"] == 0.5
+    assert set(scheduler._deadlines) == {"duel", "stream", "tutorial"}
+
+
+def test_invalid_settings_are_rejected():
+    with pytest.raises(ValueError):
+        ClassificationScheduler(max_concurrency=0)
+    with pytest.raises(ValueError):
+        ClassificationScheduler(max_queued={"dule": 4})
+    with pytest.raises(ValueError):
+        run(ClassificationScheduler(max_concurrency=1).run("nope", hold, asyncio.Event()))
+
+
+def test_full_lane_sheds_new_arrivals():
+    async def scenario():
+        scheduler = ClassificationScheduler(max_concurrency=1, max_queued={"tutorial": 1})
+        gate = asyncio.Event()
+        running = asyncio.create_task(scheduler.run("tutorial", hold, gate))
+        queued = asyncio.create_task(scheduler.run("tutorial", hold, gate))
+        await settle()
+
+        with pytest.raises(ClassificationRejected) as rejected:
+            await scheduler.run("tutorial", hold, gate)
+        assert rejected.value.code == "overloaded"
+        # Another lane still has room
+        duel = asyncio.create_task(scheduler.run("duel", hold, gate, "duel"))
+        await settle()
+        assert scheduler.stats()["lanes"]["duel"]["queued"] == 1
+
+        gate.set()
+        await asyncio.gather(running, queued, duel)
+        return scheduler.stats()
+
+    stats = run(scenario())
+    assert stats["lanes"]["tutorial"]["shed"] == 1
+    assert stats["lanes"]["tutorial"]["admitted"] == 2
+    assert stats["active"] == 0
+
+
+def test_free_slot_goes_to_highest_lane_first():
+    async def scenario():
+        scheduler = ClassificationScheduler(max_concurrency=1)
+        order = []
+
+        async def job(name):
+            order.append(name)
+
+        gate = asyncio.Event()
+        blocker = asyncio.create_task(scheduler.run("duel", hold, gate))
+        await settle()
+        # Queued lowest priority first; each lane stays FIFO
+        waiting = [
+            asyncio.create_task(scheduler.run(lane, job, name))
+            for lane, name in (
+                ("tutorial", "tutorial-1"), ("stream", "stream-1"), ("duel", "duel-1"),
+                ("tutorial", "tutorial-2"), ("duel", "duel-2"),
+            )
+        ]
+        await settle()
+        gate.set()
+        await asyncio.gather(blocker, *waiting)
+        return order
+
+    assert run(scenario()) == ["duel-1", "duel-2", "stream-1", "tutorial-1", "tutorial-2"]
+
+
+def test_deadline_expires_while_queued():
+    async def scenario():
+        scheduler = ClassificationScheduler(max_concurrency=1)
+        gate = asyncio.Event()
+        blocker = asyncio.create_task(scheduler.run("duel", hold, gate))
+        await settle()
+
+        with pytest.raises(ClassificationRejected) as rejected:
+            await scheduler.run("tutorial", hold, gate, deadline=0.05)
+        assert rejected.value.code == "deadline_exceeded"
+        assert scheduler.stats()["lanes"]["tutorial"]["queued"] == 0  # gave up its place
+
+        gate.set()
+        await blocker
+        return scheduler.stats()
+
+    stats = run(scenario())
+    assert stats["lanes"]["tutorial"]["timed_out"] == 1
+    assert stats["lanes"]["tutorial"]["admitted"] == 0
+    assert stats["active"] == 0
+
+
+def test_deadline_expires_while_running():
+    async def scenario():
+        scheduler = ClassificationScheduler(max_concurrency=1, deadlines={"stream": 0.05})
+        with pytest.raises(ClassificationRejected) as rejected:
+            await scheduler.run("stream", hold, asyncio.Event())
+        assert rejected.value.code == "deadline_exceeded"
+        # The slot was released: the next job runs straight away
+        assert await scheduler.run("stream", asyncio.sleep, 0, "next") == "next"
+        return scheduler.stats()
+
+    stats = run(scenario())
+    assert stats["lanes"]["stream"]["timed_out"] == 1
+    assert stats["active"] == 0
+
+
+def test_cancelled_waiter_frees_its_place():
+    async def scenario():
+        scheduler = ClassificationScheduler(max_concurrency=1)
+        gate = asyncio.Event()
+        blocker = asyncio.create_task(scheduler.run("duel", hold, gate))
+        await settle()
+        waiter = asyncio.create_task(scheduler.run("duel", hold, gate))
+        await settle()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.stats()["lanes"]["duel"]["queued"] == 0
+        gate.set()
+        await blocker
+        return scheduler.stats()
+
+    assert run(scenario())["active"] == 0
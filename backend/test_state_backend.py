@@ -0,0 +1,237 @@
+"""Parity tests for the two StateBackend implementations.
+
+Every scenario runs against MemoryStateBackend and against RedisStateBackend
+on fakeredis, so the Lua scripts are checked against the in-process logic.
+
+Usage (from /backend directory, needs pytest, fakeredis and lupa):
+    python -m pytest test_state_backend.py
+"""
+
+import asyncio
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")  # fakeredis runs Lua scripts through lupa
+
+from app.core.elo_matchmaker import EloMatchmaker
+from app.core.state_backend import MemoryStateBackend, RedisStateBackend
+from app.models.live_state import LiveTicket
+
+
+@pytest.fixture(params=["memory", "redis"])
+def state(request):
+    if request.param == "memory":
+        return MemoryStateBackend()
+    return RedisStateBackend(client=fakeredis.FakeAsyncRedis(decode_responses=True))
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def ticket(player_id: str, elo: int, waited: float = 0.0) -> LiveTicket:
+    return LiveTicket(player_id, f"sid-{player_id}", elo, time.time() - waited)
+
+
+def ids(pair) -> set:
+    return {t.player_id for t in pair}
+
+
+# ── Queue and matchmaking ────────────────────────────────────────────────────
+
+
+def test_enqueue_is_idempotent(state):
+    async def scenario():
+        assert await state.enqueue(ticket("alice", 1000))
+        assert not await state.enqueue(ticket("alice", 1300))
+        assert await state.is_queued("alice")
+        assert await state.queue_size() == 1
+        await state.dequeue("alice")
+        assert not await state.is_queued("alice")
+        assert await state.queue_size() == 0
+
+    run(scenario())
+
+
+def test_find_match_takes_nearest_in_range(state):
+    async def scenario():
+        for t in (ticket("alice", 1000, waited=2), ticket("bob", 1120, waited=1), ticket("carol", 1060)):
+            await state.enqueue(t)
+        pair = await state.find_match("carol")
+        assert ids(pair) == {"alice", "carol"}
+        assert pair[0].player_id == "carol"  # the seeker comes first
+        assert await state.queue_size() == 1
+        assert await state.find_match("bob") is None  # nobody left in range
+        assert await state.find_match("nobody") is None
+
+    run(scenario())
+
+
+def test_find_match_ties_go_to_longest_wait(state):
+    async def scenario():
+        # Same elo: the longest-waiting ticket wins, though Redis sorts it last by name
+        for t in (ticket("zed", 1050, waited=5), ticket("bea", 1050, waited=3), ticket("abe", 1050, waited=1)):
+            await state.enqueue(t)
+        await state.enqueue(ticket("seeker", 1000))
+        pair = await state.find_match("seeker")
+        assert pair[1].player_id == "zed"
+
+    run(scenario())
+
+
+def test_find_match_ties_across_sides_go_to_longest_wait(state):
+    async def scenario():
+        await state.enqueue(ticket("above", 1050, waited=5))
+        await state.enqueue(ticket("below", 950, waited=2))
+        await state.enqueue(ticket("seeker", 1000))
+        first = await state.find_match("seeker")
+
+        await state.enqueue(ticket("above2", 1050, waited=2))
+        await state.enqueue(ticket("seeker2", 1000))
+        second = await state.find_match("seeker2")
+        return first[1].player_id, second[1].player_id
+
+    assert run(scenario()) == ("above", "below")
+
+
+def test_dynamic_range_honours_explicit_zero_now():
+    ticket_at_epoch = LiveTicket("alice", "sid-alice", 1000, joined_at=-25.0)
+    # Waited 25s at now=0: two expansions on top of the base range
+    assert EloMatchmaker()._dynamic_range(ticket_at_epoch, now=0.0) == 250
+
+
+def test_find_match_respects_range(state):
+    async def scenario():
+        await state.enqueue(ticket("alice", 1000))
+        await state.enqueue(ticket("bob", 1400))
+        assert await state.find_match("alice") is None
+        assert await state.queue_size() == 2
+
+    run(scenario())
+
+
+def test_pair_all_claims_each_player_once(state):
+    async def scenario():
+        for player_id, elo in (("a", 1000), ("b", 1040), ("c", 1500), ("d", 1530), ("e", 2200)):
+            await state.enqueue(ticket(player_id, elo))
+        # Two overlapping ticks, as from two workers: nobody is paired twice
+        first, second = await asyncio.gather(state.pair_all(), state.pair_all())
+        pairs = [ids(pair) for pair in first + second]
+        assert sorted(pairs, key=sorted) == [{"a", "b"}, {"c", "d"}]
+        assert await state.queue_size() == 1
+        assert await state.is_queued("e")
+
+    run(scenario())
+
+
+# ── Ready handshake and pending results ──────────────────────────────────────
+
+
+def test_mark_ready_fires_once_per_round(state):
+    async def scenario():
+        assert not await state.mark_ready("room", "alice")
+        assert not await state.mark_ready("room", "alice")
+        assert await state.mark_ready("room", "bob")
+        # The next round starts from nobody ready
+        assert not await state.mark_ready("room", "bob")
+        assert await state.mark_ready("room", "alice")
+
+    run(scenario())
+
+
+def test_add_pending_result_completes_once(state):
+    async def scenario():
+        hit = {"matches": True, "detected_sign": "A", "confidence": 0.9}
+        miss = {"matches": False, "detected_sign": "B", "confidence": 0.4}
+        assert await state.add_pending_result("room", "alice", hit) is None
+        assert await state.has_pending_result("room", "alice")
+        assert await state.add_pending_result("room", "alice", miss) is None  # first result stands
+        assert await state.pending_result_count() == 1
+        assert await state.add_pending_result("room", "bob", miss) == {"alice": hit, "bob": miss}
+        assert await state.pending_result_count() == 0
+        assert not await state.has_pending_result("room", "alice")
+
+    run(scenario())
+
+
+# ── Early resolution ─────────────────────────────────────────────────────────
+
+HIT = {"matches": True, "detected_sign": "A", "confidence": 0.95}
+WEAK_HIT = {"matches": True, "detected_sign": "A", "confidence": 0.5}
+MISS = {"matches": False, "detected_sign": "B", "confidence": 0.9}
+
+
+def test_claim_submission_once_per_round(state):
+    async def scenario():
+        assert await state.claim_submission("room", 1, "alice", 10.0)
+        assert not await state.claim_submission("room", 1, "alice", 11.0)
+        # A new round forgets the old claims
+        assert await state.claim_submission("room", 2, "alice", 20.0)
+
+    run(scenario())
+
+
+def test_earliest_confident_hit_wins_at_once(state):
+    async def scenario():
+        await state.claim_submission("room", 1, "alice", 10.0)
+        await state.claim_submission("room", 1, "bob", 11.0)
+        assert await state.add_early_result("room", 1, "alice", HIT, True) == ("alice", {"alice": HIT})
+        # Decided: later results and claims for the round are ignored
+        assert await state.add_early_result("room", 1, "bob", HIT, True) is None
+        assert not await state.claim_submission("room", 1, "carol", 12.0)
+
+    run(scenario())
+
+
+def test_later_hit_waits_for_earlier_submission(state):
+    async def scenario():
+        await state.claim_submission("room", 1, "alice", 10.0)
+        await state.claim_submission("room", 1, "bob", 11.0)
+        assert await state.add_early_result("room", 1, "bob", HIT, True) is None
+        assert await state.add_early_result("room", 1, "alice", MISS, False) == ("bob", {"alice": MISS, "bob": HIT})
+
+    run(scenario())
+
+
+def test_low_confidence_hits_score_on_matches(state):
+    async def scenario():
+        await state.claim_submission("room", 1, "alice", 10.0)
+        await state.claim_submission("room", 1, "bob", 11.0)
+        assert await state.add_early_result("room", 1, "alice", WEAK_HIT, False) is None
+        assert await state.add_early_result("room", 1, "bob", MISS, False) == (None, {"alice": WEAK_HIT, "bob": MISS})
+
+    run(scenario())
+
+
+def test_released_submission_unblocks_later_hit(state):
+    async def scenario():
+        await state.claim_submission("room", 1, "alice", 10.0)
+        await state.claim_submission("room", 1, "bob", 11.0)
+        assert await state.add_early_result("room", 1, "bob", HIT, True) is None
+        # alice's classification failed: bob no longer waits on her
+        assert await state.release_submission("room", 1, "alice") == ("bob", {"bob": HIT})
+        assert await state.release_submission("room", 1, "alice") is None
+
+    run(scenario())
+
+
+def test_released_player_may_resubmit(state):
+    async def scenario():
+        await state.claim_submission("room", 1, "alice", 10.0)
+        assert await state.release_submission("room", 1, "alice") is None
+        assert await state.claim_submission("room", 1, "alice", 12.0)
+        assert await state.add_early_result("room", 1, "alice", HIT, True) == ("alice", {"alice": HIT})
+
+    run(scenario())
+
+
+def test_stale_round_is_ignored(state):
+    async def scenario():
+        await state.claim_submission("room", 2, "alice", 10.0)
+        assert await state.add_early_result("room", 1, "alice", HIT, True) is None
+        assert await state.release_submission("room", 1, "alice") is None
+        assert not await state.claim_submission("room", 2, "alice", 11.0)
+
+    run(scenario())
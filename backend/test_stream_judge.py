@@ -0,0 +1,147 @@
+"""StreamJudge first-correct decisions on relayed frames, with a scripted backend.
+
+Usage (from /backend directory):
+    python -m pytest test_stream_judge.py
+"""
+
+import asyncio
+import io
+
+from PIL import Image
+
+import model_service
+from app.models.live_state import LiveRoom
+from app.services.stream_judge import StreamJudge
+from model_service import ClassificationScheduler, ClassifierBackend
+
+HIT = {"matches": True, "detected_sign": "A", "confidence": 0.95}
+MISS = {"matches": False, "detected_sign": "B", "confidence": 0.9}
+
+
+def frame(shade: int) -> bytes:
+    """A tiny JPEG; small enough that preprocess_image passes it through as is."""
+    out = io.BytesIO()
+    Image.new("RGB", (8, 8), (shade, shade, shade)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+class ScriptedBackend(ClassifierBackend):
+    """Answers each frame with its scripted (delay, verdict)."""
+
+    def __init__(self, script: dict[bytes, tuple[float, dict]]):
+        self._script = script
+
+    async def classify(self, image_bytes: bytes, target_sign: str) -> dict:
+        delay, verdict = self._script[image_bytes]
+        await asyncio.sleep(delay)
+        return dict(verdict)
+
+
+def room() -> LiveRoom:
+    room = LiveRoom("alice", "bob", "sid-alice", "sid-bob")
+    room.target_sign = "A"
+    return room
+
+
+async def judge_round(script, offers, sample_interval=0.2):
+    """Open a round, offer (delay, sid, frame) in order, return the decided results."""
+    decided = asyncio.get_running_loop().create_future()
+
+    async def on_decided(room_id, round_number, results):
+        decided.set_result(results)
+
+    judge = StreamJudge(
+        on_decided,
+        backend=ScriptedBackend(script),
+        scheduler=ClassificationScheduler(max_concurrency=4),
+        sample_interval=sample_interval,
+        window_seconds=2,
+        countdown=0,
+    )
+    duel = room()
+    judge.open(duel)
+    for delay, sid, image in offers:
+        await asyncio.sleep(delay)
+        judge.offer(duel.room_id, sid, image)
+    return await asyncio.wait_for(decided, 3)
+
+
+def winner(results: dict) -> str | None:
+    return next((player_id for player_id, result in results.items() if result["matches"]), None)
+
+
+def test_default_backend_is_main_classifier_uncached(monkeypatch):
+    monkeypatch.delenv("ASL_STREAM_CLASSIFIER_BACKEND", raising=False)
+
+    async def on_decided(*_):
+        pass
+
+    judge = StreamJudge(on_decided)
+    assert judge._backend is model_service.uncached_classifier
+
+
+def test_first_correct_frame_wins():
+    alice_hit, bob_hit = frame(10), frame(20)
+    script = {alice_hit: (0.01, HIT), bob_hit: (0.01, HIT)}
+    results = asyncio.run(judge_round(script, [(0, "sid-alice", alice_hit), (0.05, "sid-bob", bob_hit)]))
+    assert winner(results) == "alice"
+
+
+def test_waits_for_earlier_frame_in_flight():
+    # alice's frame arrives first but takes longer to classify
+    alice_hit, bob_hit = frame(10), frame(20)
+    script = {alice_hit: (0.15, HIT), bob_hit: (0.01, HIT)}
+    results = asyncio.run(judge_round(script, [(0, "sid-alice", alice_hit), (0.02, "sid-bob", bob_hit)]))
+    assert winner(results) == "alice"
+
+
+def test_waits_for_earlier_frame_waiting_for_its_sample():
+    # alice's first sample misses; her next frame arrives before bob's
+    # correct one but has to wait out the sample interval
+    alice_miss, alice_hit, bob_hit = frame(10), frame(30), frame(20)
+    script = {alice_miss: (0.01, MISS), alice_hit: (0.01, HIT), bob_hit: (0.01, HIT)}
+    offers = [(0, "sid-alice", alice_miss), (0.05, "sid-alice", alice_hit), (0.02, "sid-bob", bob_hit)]
+    results = asyncio.run(judge_round(script, offers, sample_interval=0.2))
+    assert winner(results) == "alice"
+
+
+def test_later_pending_frame_does_not_block():
+    alice_miss, alice_late, bob_hit = frame(10), frame(30), frame(20)
+    script = {alice_miss: (0.01, MISS), alice_late: (0.01, HIT), bob_hit: (0.01, HIT)}
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        results = await judge_round(
+            script, [(0, "sid-alice", alice_miss), (0.03, "sid-bob", bob_hit), (0.01, "sid-alice", alice_late)],
+            sample_interval=0.5,
+        )
+        return results, asyncio.get_running_loop().time() - started
+
+    results, elapsed = asyncio.run(scenario())
+    assert winner(results) == "bob"
+    assert elapsed < 0.3  # decided without waiting for alice's next sample
+
+
+def test_nobody_correct_is_a_replay():
+    alice_miss, bob_miss = frame(10), frame(20)
+    script = {alice_miss: (0.01, MISS), bob_miss: (0.01, MISS)}
+
+    async def scenario():
+        decided = asyncio.get_running_loop().create_future()
+
+        async def on_decided(room_id, round_number, results):
+            decided.set_result(results)
+
+        judge = StreamJudge(
+            on_decided, backend=ScriptedBackend(script), scheduler=ClassificationScheduler(max_concurrency=4),
+            sample_interval=0.05, window_seconds=0.2, countdown=0,
+        )
+        duel = room()
+        judge.open(duel)
+        judge.offer(duel.room_id, "sid-alice", alice_miss)
+        judge.offer(duel.room_id, "sid-bob", bob_miss)
+        return await asyncio.wait_for(decided, 3)
+
+    results = asyncio.run(scenario())
+    assert winner(results) is None
+    assert results["bob"]["detected_sign"] == "B"
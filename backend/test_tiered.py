@@ -0,0 +1,124 @@
+"""TieredClassifier routing, hedging and deadlines against FakeClassifier tiers.
+
+Usage (from /backend directory):
+    python -m pytest test_tiered.py
+"""
+
+import asyncio
+import time
+
+from model_service.fake_classifier import FakeClassifier
+from model_service.tiered import FALLBACK_VERDICT, TieredClassifier
+
+IMAGE = b"jpeg"
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def tier(latency_ms: float = 1, **kwargs) -> FakeClassifier:
+    return FakeClassifier(latency_ms=latency_ms, jitter_ms=0, seed=0, **kwargs)
+
+
+class ScriptedFake(FakeClassifier):
+    """FakeClassifier whose calls take the given delays, in order."""
+
+    def __init__(self, delays: list[float]):
+        super().__init__(latency_ms=0, jitter_ms=0, accuracy=1.0, seed=0)
+        self._delays = list(delays)
+
+    def _delay(self) -> float:
+        return self._delays.pop(0)
+
+
+def test_confident_verdict_stays_on_first_tier():
+    fast, strong = tier(accuracy=1.0), tier(accuracy=1.0)
+    classifier = TieredClassifier([("fast", fast), ("strong", strong)], escalate_below=0.6, hedge_quantile=0)
+
+    verdict = run(classifier.classify(IMAGE, "a"))
+
+    assert verdict == {"matches": True, "detected_sign": "A", "confidence": 0.95}
+    assert (fast.calls, strong.calls, classifier.escalations) == (1, 0, 0)
+
+
+def test_low_confidence_escalates_to_next_tier():
+    fast = tier(accuracy=1.0, low_confidence_rate=1.0)  # every verdict at confidence 0.5
+    strong = tier(accuracy=0.0)
+    classifier = TieredClassifier([("fast", fast), ("strong", strong)], escalate_below=0.6, hedge_quantile=0)
+
+    verdicts = run(classifier.classify_batch([(IMAGE, "A"), (IMAGE, "B")]))
+
+    # The later tier's verdict replaces the low-confidence one
+    assert [v["matches"] for v in verdicts] == [False, False]
+    assert [v["confidence"] for v in verdicts] == [0.6, 0.6]
+    assert (fast.calls, strong.calls, classifier.escalations) == (2, 2, 2)
+
+
+def test_failed_tier_escalates_its_images():
+    broken, strong = tier(error_rate=1.0), tier(accuracy=1.0)
+    classifier = TieredClassifier([("broken", broken), ("strong", strong)], hedge_quantile=0)
+
+    verdict = run(classifier.classify(IMAGE, "C"))
+
+    assert verdict["detected_sign"] == "C"
+    assert classifier.stats()["tiers"]["broken"]["errors"] == 1
+
+
+def test_slow_call_is_hedged_after_quantile_delay():
+    # Five 10ms calls set the p95, then a 1s primary races a 10ms backup
+    backend = ScriptedFake([0.01] * 5 + [1.0, 0.01])
+    classifier = TieredClassifier(
+        [("strong", backend)], hedge_quantile=0.95, hedge_min_samples=5, deadline_ms=5000
+    )
+
+    async def scenario():
+        for _ in range(5):
+            await classifier.classify(IMAGE, "A")
+        assert classifier.stats()["tiers"]["strong"]["hedges"] == 0
+        started = time.monotonic()
+        verdict = await classifier.classify(IMAGE, "A")
+        return verdict, time.monotonic() - started
+
+    verdict, elapsed = run(scenario())
+
+    assert verdict["matches"]
+    assert elapsed < 0.5  # answered by the backup, not the 1s primary
+    stats = classifier.stats()["tiers"]["strong"]
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+    assert backend.calls == 7
+
+
+def test_no_hedge_before_min_samples():
+    backend = ScriptedFake([0.05])
+    classifier = TieredClassifier([("strong", backend)], hedge_quantile=0.95, hedge_min_samples=5)
+
+    run(classifier.classify(IMAGE, "A"))
+
+    assert classifier.stats()["tiers"]["strong"]["hedges"] == 0
+    assert backend.calls == 1
+
+
+def test_deadline_returns_fallback_verdict():
+    slow = tier(latency_ms=2000, accuracy=1.0)
+    classifier = TieredClassifier([("slow", slow)], deadline_ms=50, hedge_quantile=0)
+
+    started = time.monotonic()
+    verdicts = run(classifier.classify_batch([(IMAGE, "A"), (IMAGE, "B")]))
+
+    assert time.monotonic() - started < 1.0
+    assert verdicts == [FALLBACK_VERDICT, FALLBACK_VERDICT]
+    assert verdicts[0] is not FALLBACK_VERDICT  # callers get their own copy
+    assert classifier.fallbacks == 2
+    assert classifier.stats()["tiers"]["slow"]["timeouts"] == 1
+
+
+def test_deadline_keeps_best_verdict_so_far():
+    fast = tier(accuracy=1.0, low_confidence_rate=1.0)
+    slow = tier(latency_ms=2000, accuracy=0.0)
+    classifier = TieredClassifier([("fast", fast), ("slow", slow)], deadline_ms=200, hedge_quantile=0)
+
+    verdict = run(classifier.classify(IMAGE, "A"))
+
+    assert verdict == {"matches": True, "detected_sign": "A", "confidence": 0.5}
+    assert classifier.fallbacks == 0
@@ -36,16 +36,17 @@ export const MatchPage: React.FC<MatchPageProps> = ({
   const [frozenOpponentFrame, setFrozenOpponentFrame] = useState<string | null>(null);
 
   const { socket } = useDuelSocket();
-  const { localVideoRef, remoteImgRef, initializeMedia, startFrameStream, stopFrameStream, captureSnapshot } =
-    useQuickDraw(socket, {
-      onConnectionLost: () => alert('Partner disconnected!'),
-    });
+  // No onConnectionLost alert here: room_closed (below) already reports a departed opponent.
+  const { localVideoRef, remoteImgRef, initializeMedia, startFrameStream, stopFrameStream, captureSnapshot, captureRemoteFrame } =
+    useQuickDraw(socket);
 
   // Refs so timer callbacks always read the latest values without stale closures.
   const targetSignRef = useRef<string | null>(null);
   targetSignRef.current = targetSign;
   const roundPhaseRef = useRef<RoundPhase>('waiting');
   roundPhaseRef.current = roundPhase;
+  // 'stream': the server judges our relayed video, so no snapshot upload.
+  const resolutionRef = useRef<'snapshot' | 'stream'>('snapshot');
 
   const drawTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
   const countdownTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
@@ -65,16 +66,23 @@ export const MatchPage: React.FC<MatchPageProps> = ({
     };
   }, [roomId, initializeMedia, startFrameStream, stopFrameStream]);
 
+  // Freeze both feeds on the frame the round was judged on.
+  const freezeFrames = useCallback((): string | null => {
+    const snapshot = captureSnapshot();
+    if (snapshot) setFrozenFrame(snapshot);
+    const opponentSrc = captureRemoteFrame();
+    if (opponentSrc) setFrozenOpponentFrame(opponentSrc);
+    return snapshot;
+  }, [captureSnapshot, captureRemoteFrame]);
+
   // Show DRAW! immediately, then capture a snapshot after DRAW_DELAY_MS.
   const scheduleSnapshot = useCallback(() => {
     if (drawTimerRef.current) clearTimeout(drawTimerRef.current);
     drawTimerRef.current = setTimeout(() => {
       if (roundPhaseRef.current !== 'drawing') return;
-      const snapshot = captureSnapshot();
-      if (snapshot) setFrozenFrame(snapshot);
-      // Freeze opponent's last received frame at the same instant
-      const opponentSrc = remoteImgRef.current?.src ?? '';
-      if (opponentSrc.startsWith('data:')) setFrozenOpponentFrame(opponentSrc);
+      // Stream rounds usually resolve before this; keep signing until they do
+      if (resolutionRef.current === 'stream') return;
+      const snapshot = freezeFrames();
       const sign = targetSignRef.current;
       if (snapshot && sign && socket) {
         socket.emit('draw_made', {
@@ -86,15 +94,16 @@ export const MatchPage: React.FC<MatchPageProps> = ({
       }
       setRoundPhase('analyzing');
     }, DRAW_DELAY_MS);
-  }, [captureSnapshot, roomId, playerId, socket]);
+  }, [freezeFrames, roomId, playerId, socket]);
 
   // Socket event listeners — registered once on mount.
   useEffect(() => {
     if (!socket) return;
 
-    const onRoundStart = (data: { round_number: number; target_sign: string }) => {
+    const onRoundStart = (data: { round_number: number; target_sign: string; resolution?: 'snapshot' | 'stream' }) => {
       if (drawTimerRef.current) clearTimeout(drawTimerRef.current);
       if (countdownTimerRef.current) clearTimeout(countdownTimerRef.current);
+      resolutionRef.current = data.resolution ?? 'snapshot';
 
       setRoundNumber(data.round_number);
       setTargetSign(data.target_sign);
@@ -126,6 +135,7 @@ export const MatchPage: React.FC<MatchPageProps> = ({
       scores: Record<string, number>;
       is_replay: boolean;
     }) => {
+      if (roundPhaseRef.current === 'drawing') freezeFrames();
       setPlayerScore(data.scores[playerId] ?? 0);
       setOpponentScore(data.scores[opponentId] ?? 0);
       setRoundResult({
@@ -159,18 +169,28 @@ export const MatchPage: React.FC<MatchPageProps> = ({
       onMatchEnd(won, eloChange);
     };
 
+    // Server closed the room: the opponent left, or nobody played for too long.
+    // No Elo changes; an opponent leaving counts as a forfeit win on screen.
+    const onRoomClosed = (data: { room_id: string; reason: 'opponent_left' | 'idle' }) => {
+      if (data.room_id !== roomId) return;
+      alert(data.reason === 'opponent_left' ? 'Partner disconnected!' : 'Duel closed after inactivity.');
+      onMatchEnd(data.reason === 'opponent_left', 0);
+    };
+
     socket.on('round_start', onRoundStart);
     socket.on('round_result', onRoundResult);
     socket.on('match_complete', onMatchComplete);
+    socket.on('room_closed', onRoomClosed);
 
     return () => {
       socket.off('round_start', onRoundStart);
       socket.off('round_result', onRoundResult);
       socket.off('match_complete', onMatchComplete);
+      socket.off('room_closed', onRoomClosed);
       if (drawTimerRef.current) clearTimeout(drawTimerRef.current);
       if (countdownTimerRef.current) clearTimeout(countdownTimerRef.current);
     };
-  }, [socket, playerId, opponentId, onMatchEnd, scheduleSnapshot]);
+  }, [socket, roomId, playerId, opponentId, onMatchEnd, scheduleSnapshot, freezeFrames]);
 
   const handleContinue = useCallback(() => {
     setIsReadyPressed(true);
@@ -20,8 +20,13 @@ export const useQuickDraw = (
 ) => {
     const [localStream, setLocalStream] = useState<MediaStream | null>(null);
     const localVideoRef = useRef<HTMLVideoElement>(null);
-    // Opponent frames arrive as JPEG data-URLs and are painted into an <img>.
+    // Opponent frames arrive as raw JPEG bytes (or data-URLs from older
+    // clients) and are painted into an <img>.
     const remoteImgRef = useRef<HTMLImageElement>(null);
+    // Object URL currently shown for the opponent, revoked when replaced.
+    const remoteUrlRef = useRef<string | null>(null);
+    // Object URL handed out by captureRemoteFrame(); kept alive until the next capture.
+    const retainedUrlRef = useRef<string | null>(null);
     const intervalRef = useRef<ReturnType<typeof setInterval> | null>(null);
     // Reuse one off-screen canvas across frames to avoid repeated allocation.
     const canvasRef = useRef<HTMLCanvasElement | null>(null);
@@ -44,8 +49,19 @@ export const useQuickDraw = (
     // Paint incoming opponent frames into the <img> element.
     useEffect(() => {
         if (!socket) return;
-        const handleFrame = ({ frame }: { frame: string }) => {
-            if (remoteImgRef.current) remoteImgRef.current.src = frame;
+        const handleFrame = ({ frame }: { frame: string | ArrayBuffer }) => {
+            const img = remoteImgRef.current;
+            if (!img) return;
+            const previous = remoteUrlRef.current;
+            if (typeof frame === "string") {
+                img.src = frame;
+                remoteUrlRef.current = null;
+            } else {
+                const url = URL.createObjectURL(new Blob([frame], { type: "image/jpeg" }));
+                img.src = url;
+                remoteUrlRef.current = url;
+            }
+            if (previous && previous !== retainedUrlRef.current) URL.revokeObjectURL(previous);
         };
         socket.on("video_frame", handleFrame);
         return () => {
@@ -58,6 +74,8 @@ export const useQuickDraw = (
         return () => {
             if (intervalRef.current) clearInterval(intervalRef.current);
             localStream?.getTracks().forEach((t) => t.stop());
+            if (remoteUrlRef.current) URL.revokeObjectURL(remoteUrlRef.current);
+            if (retainedUrlRef.current) URL.revokeObjectURL(retainedUrlRef.current);
         };
     }, []); // eslint-disable-line react-hooks/exhaustive-deps
 
@@ -102,8 +120,18 @@ export const useQuickDraw = (
             // readyState >= 2 (HAVE_CURRENT_DATA) means there's a frame to draw.
             if (!video || !sock || video.readyState < 2) return;
             ctx.drawImage(video, 0, 0, FRAME_WIDTH, FRAME_HEIGHT);
-            const frame = canvas.toDataURL("image/jpeg", JPEG_QUALITY);
-            sock.emit("video_frame", { room_id: roomId, frame });
+            // Send raw JPEG bytes as a Socket.IO binary attachment: no base64
+            // inflation, and the server relays the buffer untouched.
+            canvas.toBlob(
+                (blob) => {
+                    if (!blob) return;
+                    blob.arrayBuffer().then((frame) => {
+                        sock.emit("video_frame", { room_id: roomId, frame });
+                    });
+                },
+                "image/jpeg",
+                JPEG_QUALITY,
+            );
         }, FRAME_INTERVAL_MS);
     }, []);
 
@@ -129,6 +157,19 @@ export const useQuickDraw = (
         return snap.toDataURL("image/jpeg", 0.85);
     }, []);
 
+    // Return a URL for the opponent frame currently on screen that stays valid
+    // after newer frames arrive (used to freeze the opponent's mugshot).
+    const captureRemoteFrame = useCallback((): string | null => {
+        const src = remoteImgRef.current?.src;
+        if (!src) return null;
+        if (src.startsWith("blob:")) {
+            const previous = retainedUrlRef.current;
+            if (previous && previous !== src) URL.revokeObjectURL(previous);
+            retainedUrlRef.current = src;
+        }
+        return src;
+    }, []);
+
     return {
         localVideoRef,
         remoteImgRef,
@@ -137,5 +178,6 @@ export const useQuickDraw = (
         startFrameStream,
         stopFrameStream,
         captureSnapshot,
+        captureRemoteFrame,
     };
 };
\ No newline at end of file